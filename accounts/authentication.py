@@ -1,7 +1,35 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import exceptions
 
-class CookieJWTAuthentication(JWTAuthentication):
+from . import tokens
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """Authorization-header JWTs, checked against the user's token_version."""
+
+    def get_user(self, validated_token):
+        """
+        Resolve the user from the auth user cache (accounts/tokens.py) instead
+        of a SELECT per request, rejecting tokens from an older token_version.
+        """
+        if validated_token.get("is_active") is False:
+            raise exceptions.AuthenticationFailed("User is inactive.", code="user_inactive")
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise exceptions.AuthenticationFailed("Token contained no recognizable user identification.")
+
+        user = tokens.cached_user(user_id)
+        if user is None:
+            raise exceptions.AuthenticationFailed("User not found.", code="user_not_found")
+        if user.token_version != tokens.token_version(validated_token):
+            raise exceptions.AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User is inactive.", code="user_inactive")
+        return user
+
+
+class CookieJWTAuthentication(VersionedJWTAuthentication):
     """
     Extract JWT from HttpOnly cookies instead of Authorization header.
     """
@@ -0,0 +1,33 @@
+# accounts/middleware.py
+from channels.auth import CookieMiddleware
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+
+from .authentication import CookieJWTAuthentication
+
+
+@database_sync_to_async
+def get_user_from_token(raw_token):
+    authentication = CookieJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except Exception:
+        return AnonymousUser()
+
+
+class CookieJWTAuthMiddleware(BaseMiddleware):
+    """
+    WebSocket counterpart of CookieJWTAuthentication: reads the same
+    `access_token` HttpOnly cookie and puts the user on scope['user'].
+    """
+
+    async def __call__(self, scope, receive, send):
+        raw_token = scope.get("cookies", {}).get("access_token")
+        scope = dict(scope, user=await get_user_from_token(raw_token) if raw_token else AnonymousUser())
+        return await super().__call__(scope, receive, send)
+
+
+def CookieJWTAuthMiddlewareStack(inner):
+    return CookieMiddleware(CookieJWTAuthMiddleware(inner))
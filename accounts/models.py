@@ -3,6 +3,8 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseU
 from django.utils import timezone
 import uuid
 
+from publications.tracking import FieldTrackerMixin
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, agreement=False, full_name=None, role='reader', **extra_fields):
@@ -50,7 +52,7 @@ class UserManager(BaseUserManager):
     
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(FieldTrackerMixin, AbstractBaseUser, PermissionsMixin):
     ROLE_CHOICES = (
         ('admin', 'Admin'),
         ('publisher', 'Publisher'),
@@ -69,6 +71,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_scholar = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Bumped to revoke every JWT issued so far (accounts/tokens.py)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     objects = UserManager()
 
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import User
+from . import tokens
+
+
+# Changes that make every issued token wrong: its claims, or who may hold it
+REVOKING_FIELDS = ("role", "is_active", "password")
+
+
+@receiver(pre_save, sender=User)
+def detect_token_revocation(sender, instance, update_fields=None, **kwargs):
+    """A changed role, active flag or password revokes the user's tokens after saving."""
+    if instance._state.adding:
+        return
+    fields = REVOKING_FIELDS if update_fields is None else [f for f in REVOKING_FIELDS if f in update_fields]
+    instance._revoke_tokens = any(instance.has_changed(field) for field in fields)
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_user(sender, instance, **kwargs):
+    if getattr(instance, "_revoke_tokens", False):
+        instance._revoke_tokens = False
+        tokens.revoke_tokens(instance)
+    else:
+        tokens.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    tokens.forget_user(instance.pk)
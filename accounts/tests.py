@@ -1,3 +1,122 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import tokens
+from .models import User
+
+
+class LoginMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="member@example.org", password="Secret#123", agreement=True, full_name="Mem Ber"
+        )
+        self.admin = User.objects.create_user(
+            email="root@example.org", password="Secret#123", agreement=True, full_name="Root", role="admin"
+        )
+        self.client = APIClient()
+
+    def login(self, email="member@example.org"):
+        client = APIClient()
+        response = client.post("/api/login/", {"email": email, "password": "Secret#123"}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return client
+
+
+class TokenVersionTests(LoginMixin, TestCase):
+    """Revoked token versions are refused, whichever worker revoked them."""
+
+    def test_revocation_in_another_worker_is_seen(self):
+        client = self.login()
+        self.assertEqual(client.get("/api/me/").status_code, 200)
+        # Another worker revokes the tokens; its per-process cache is not ours
+        User.objects.filter(pk=self.user.pk).update(token_version=F("token_version") + 1)
+        LocMemCache("other-worker", {}).delete(tokens._key(self.user.pk))
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+
+    def test_block_and_role_change_revoke_tokens(self):
+        client = self.login()
+        admin = self.login("root@example.org")
+        self.assertEqual(admin.patch(f"/api/admin/users/{self.user.pk}/block/").status_code, 200)
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+        self.assertEqual(client.post("/api/token/refresh/").status_code, 401)
+
+        admin.patch(f"/api/admin/users/{self.user.pk}/unblock/")
+        client = self.login()
+        self.user.refresh_from_db()
+        self.user.role = "publisher"
+        self.user.save()
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+
+    def test_password_change_revokes_tokens(self):
+        client = self.login()
+        self.user.refresh_from_db()
+        self.user.set_password("Changed#456")
+        self.user.save()
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+        self.assertEqual(client.post("/api/token/refresh/").status_code, 401)
+
+    def test_logout_ends_only_this_session(self):
+        client = self.login()
+        other_device = self.login()
+        # The same tokens held by another tab
+        tab = APIClient()
+        tab.cookies.load({name: morsel.value for name, morsel in client.cookies.items()})
+
+        client.post("/api/logout/")
+        self.assertEqual(tab.post("/api/token/refresh/").status_code, 401)
+        self.assertEqual(other_device.get("/api/me/").status_code, 200)
+        self.assertEqual(other_device.post("/api/token/refresh/").status_code, 200)
+
+    def test_saving_a_loaded_user_reads_nothing_back(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.full_name = "Renamed"
+        with self.assertNumQueries(1):
+            user.save(update_fields=["full_name"])
+        user.role = "editor"
+        with self.assertNumQueries(3):  # UPDATE, version bump, version read-back
+            user.save()
+        self.assertEqual(user.token_version, 1)
+
+
+class SharedUserCacheTests(LoginMixin, TestCase):
+    """With a cache shared by all workers the user is served from it."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        shared = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": self.cache_dir},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+        super().setUp()
+
+    def test_revocation_in_another_worker_is_seen(self):
+        client = self.login()
+        self.assertEqual(client.get("/api/me/").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            tokens.revoke_tokens(User.objects.get(pk=self.user.pk))
+        # The key is gone for every process reading the shared cache
+        self.assertIsNone(FileBasedCache(self.cache_dir, {}).get(tokens._key(self.user.pk)))
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+
+    def test_cached_user_needs_no_queries(self):
+        client = self.login()
+        self.assertEqual(client.get("/api/me/").data["email"], "member@example.org")
+        with self.assertNumQueries(0):
+            response = client.get("/api/me/")
+        self.assertEqual(response.data["role"], "reader")
+
+        # Saving the user drops the cached copy once the save commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.full_name = "Renamed"
+            self.user.save()
+        self.assertEqual(client.get("/api/me/").data["full_name"], "Renamed")
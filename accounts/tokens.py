@@ -0,0 +1,92 @@
+# accounts/tokens.py
+"""
+Versioned JWTs and the authentication user cache.
+
+Every token carries the user's `token_version` in the "ver" claim. Bumping
+the version (revoke_tokens) invalidates every access and refresh token the
+user holds: when a user is blocked or unblocked, and when their role or
+password changes (accounts/signals.py). Logout only blacklists the refresh
+token of the session it ends. With settings.JWT_EMBED_USER_CLAIMS the tokens
+also carry role/is_active, so a blocked user's tokens are refused without a
+lookup; no profile data (email, name) is put in them.
+
+CookieJWTAuthentication resolves the user through `cached_user()`: with a
+cache shared by all workers (config/caching.py) the User row is kept under
+the user id for AUTH_USER_CACHE_TTL seconds and dropped once a save of the
+row commits, so authenticating a request normally runs no query at all. With
+a per-process cache a revocation would not reach the other workers, so the
+row is read from the database on every request instead. Either way a token
+whose "ver" no longer matches is rejected.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config.caching import is_shared
+from .models import User
+
+VERSION_CLAIM = "ver"
+USER_CLAIMS = ("role", "is_active")
+
+
+def _key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _ttl():
+    return getattr(settings, "AUTH_USER_CACHE_TTL", 300)
+
+
+def embed_user_claims():
+    return getattr(settings, "JWT_EMBED_USER_CLAIMS", False)
+
+
+class VersionedRefreshToken(RefreshToken):
+    """RefreshToken whose claims (and those of its access tokens) include the token version."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[VERSION_CLAIM] = user.token_version
+        if embed_user_claims():
+            for claim in USER_CLAIMS:
+                token[claim] = getattr(user, claim)
+        return token
+
+
+def token_version(token):
+    # Tokens issued before versioning count as version 0
+    return token.get(VERSION_CLAIM, 0)
+
+
+def cached_user(user_id):
+    """The User with `user_id` from the cache, loading and caching it on a miss; None if it does not exist."""
+    if not is_shared():
+        return User.objects.filter(pk=user_id).first()
+    key = _key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, _ttl())
+    return user
+
+
+def forget_user(user_id):
+    # After commit, so a concurrent request cannot cache the row as it was before the change
+    transaction.on_commit(lambda: cache.delete(_key(user_id)))
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to `user` so far."""
+    User.objects.filter(pk=user.pk).update(token_version=F("token_version") + 1)
+    user.token_version = User.objects.filter(pk=user.pk).values_list("token_version", flat=True).first()
+    forget_user(user.pk)
+
+
+def current_version(user_id):
+    """(token_version, is_active) straight from the database, for refresh-time checks."""
+    return User.objects.filter(pk=user_id).values_list("token_version", "is_active").first()
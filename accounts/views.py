@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions, status, views
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.views import APIView
 from .models import User, Passcode
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
@@ -12,6 +13,8 @@ from rest_framework.exceptions import Throttled
 from django.conf import settings
 from rest_framework_simplejwt.views import TokenRefreshView
 from accounts.authentication import CookieJWTAuthentication
+from accounts.tokens import VersionedRefreshToken
+from accounts import tokens
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
@@ -71,7 +74,7 @@ class UserListCreateView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = VersionedRefreshToken.for_user(user)
         access_token = str(refresh.access_token)
 
         response = Response({
@@ -122,7 +125,7 @@ class LoginView(generics.GenericAPIView):
         if not user.is_active:
             return Response({"error": "This account is inactive."}, status=403)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = VersionedRefreshToken.for_user(user)
         access_token = str(refresh.access_token)
 
         # Create response with role at top level (matching frontend expectations)
@@ -203,6 +206,15 @@ class CookieTokenRefreshView(TokenRefreshView):
         if not refresh_token:
             return Response({"detail": "No refresh token"}, status=401)
 
+        # Tokens of a revoked token_version (block, role or password change) cannot be refreshed
+        try:
+            token = RefreshToken(refresh_token)
+            user_id = token[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return Response({"detail": "Refresh token expired"}, status=401)
+        if tokens.current_version(user_id) != (tokens.token_version(token), True):
+            return Response({"detail": "Refresh token revoked"}, status=401)
+
         # Inject refresh token into request.data for SimpleJWT
         data = request.data.copy()
         data["refresh"] = refresh_token
@@ -258,6 +270,15 @@ class LogoutView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        # Ends this session only: the refresh token it presented can no longer be used,
+        # the user's other devices stay logged in
+        refresh_token = request.COOKIES.get("refresh_token")
+        if refresh_token:
+            try:
+                RefreshToken(refresh_token).blacklist()
+            except TokenError:
+                pass  # Already expired or blacklisted
+
         response = Response({"message": "Logged out"}, status=200)
 
         domain = getattr(settings, 'SESSION_COOKIE_DOMAIN', None)
@@ -6,4 +6,5 @@ python manage.py collectstatic --no-input
 
 python manage.py migrate
 
-
+# Publications saved before the search index existed (or whose indexing failed)
+python manage.py rebuild_search_index --missing
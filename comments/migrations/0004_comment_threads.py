@@ -0,0 +1,74 @@
+# Generated by Django 5.2 on 2026-10-17 06:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def _segment(comment):
+    # Same format as comments.tree.segment(), inlined so the migration stays stable
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    number, encoded = int(comment.created_at.timestamp() * 1_000_000), ''
+    while number:
+        number, remainder = divmod(number, 36)
+        encoded = digits[remainder] + encoded
+    return f"{encoded.rjust(11, '0')}{comment.id.hex[:4]}/"
+
+
+def backfill_paths(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    # Like Comment.save(): replies below the deepest allowed level (bounded by the
+    # 255-character path, 16 characters per level) join that level instead
+    max_depth = min(getattr(settings, 'COMMENT_MAX_DEPTH', 5), 255 // 16 - 1)
+    level = list(Comment.objects.filter(parent__isnull=True))
+    placed = {}  # pk -> (path, depth, parent_id) as backfilled
+    while level:
+        for comment in level:
+            parent = placed.get(comment.parent_id)
+            if parent is not None and parent[1] >= max_depth:
+                comment.parent_id = parent[2]
+                parent = placed[comment.parent_id]
+            comment.path = (parent[0] if parent else '') + _segment(comment)
+            comment.depth = parent[1] + 1 if parent else 0
+            placed[comment.pk] = (comment.path, comment.depth, comment.parent_id)
+        Comment.objects.bulk_update(level, ['parent', 'path', 'depth'], batch_size=500)
+        level = list(Comment.objects.filter(parent_id__in=[comment.pk for comment in level]))
+
+    for row in Comment.objects.filter(replies__isnull=False).values('pk').annotate(replies_total=Count('replies')):
+        Comment.objects.filter(pk=row['pk']).update(reply_count=row['replies_total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_comment_reactions_comment_user_reactions'),
+        ('publications', '0021_publication_downloads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['publication', 'path'], name='comment_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['publication', 'depth', 'path'], name='comment_toplevel_idx'),
+        ),
+    ]
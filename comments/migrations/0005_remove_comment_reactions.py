@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 06:38
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_comment_threads'),
+        ('emoji', '0003_reaction_counts'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='comment',
+            name='reactions',
+        ),
+        migrations.RemoveField(
+            model_name='comment',
+            name='user_reactions',
+        ),
+    ]
@@ -4,6 +4,9 @@ from accounts.models import User
 from publications.models import Publication  # adjust path if needed
 import uuid
 from cloudinary_storage.storage import RawMediaCloudinaryStorage
+from django.db.models import F
+
+from . import tree
 
 class Comment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -12,9 +15,38 @@ class Comment(models.Model):
     text = models.TextField(blank=True)
     audio = models.FileField(upload_to='comments/audio/', blank=True, null=True, storage=RawMediaCloudinaryStorage())
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name="replies")
+    # Materialized path of the thread (comments/tree.py), set on creation
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)  # direct replies
     created_at = models.DateTimeField(default=timezone.now)
-    reactions = models.JSONField(default=dict, blank=True)      # counts
-    user_reactions = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["publication", "path"], name="comment_thread_idx"),
+            models.Index(fields=["publication", "depth", "path"], name="comment_toplevel_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        creating = self._state.adding and not self.path
+        if creating:
+            if self.parent_id:
+                parent = self.parent
+                if parent.depth >= tree.max_depth():
+                    # Too deep: reply to the deepest allowed ancestor instead
+                    parent = Comment.objects.get(
+                        publication_id=parent.publication_id,
+                        path=tree.ancestor_path(parent.path, tree.max_depth() - 1),
+                    )
+                    self.parent = parent
+                self.path = parent.path + tree.segment(self)
+                self.depth = parent.depth + 1
+            else:
+                self.path = tree.segment(self)
+                self.depth = 0
+        super().save(*args, **kwargs)
+        if creating and self.parent_id:
+            Comment.objects.filter(pk=self.parent_id).update(reply_count=F("reply_count") + 1)
 
     def __str__(self):
         return f"Comment by {self.author.get_full_name()} on {self.publication.title[:30]}"
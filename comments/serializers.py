@@ -1,12 +1,17 @@
 # comments/serializers.py
+from django.urls import reverse
 from rest_framework import serializers
+from rest_framework.utils.urls import replace_query_param
 from .models import Comment
+from publications.pagination import KeysetPagination
 from accounts.models import User
+from emoji import summaries
+from emoji.models import CommentReaction
 
 class CommentSerializer(serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
     is_current_user = serializers.SerializerMethodField()
-    reactions = serializers.JSONField(required=False)
+    reactions = serializers.SerializerMethodField()
     audio_url = serializers.SerializerMethodField()
     user_reaction = serializers.SerializerMethodField()
 
@@ -15,15 +20,29 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = [
             "id", "text", "audio", "audio_url",
             "author_name", "is_current_user",
+            "parent", "depth", "reply_count",
             "created_at", "reactions", "user_reaction",
         ]
+        read_only_fields = ["depth", "reply_count"]
 
     def get_author_name(self, obj):
+        # Views load comments with select_related("author")
         return obj.author.get_full_name() or obj.author.email
 
     def get_is_current_user(self, obj):
         request = self.context.get("request")
-        return request and request.user.is_authenticated and obj.author == request.user
+        return request and request.user.is_authenticated and obj.author_id == request.user.pk
+
+    def validate_parent(self, value):
+        publication_id = self.context.get("publication_id")
+        if value is not None and publication_id is not None and value.publication_id != publication_id:
+            raise serializers.ValidationError("You can only reply to comments on the same publication.")
+        return value
+
+    def update(self, instance, validated_data):
+        # A comment's place in its thread (path) is fixed at creation
+        validated_data.pop("parent", None)
+        return super().update(instance, validated_data)
 
     def get_audio_url(self, obj):
         request = self.context.get("request")
@@ -32,16 +51,40 @@ class CommentSerializer(serializers.ModelSerializer):
         return None
 
 
+    def get_reactions(self, obj):
+        # List views set reaction_summary for a whole page (emoji.summaries.annotate)
+        if hasattr(obj, "reaction_summary"):
+            return obj.reaction_summary
+        return summaries.counts_for([obj.pk])[obj.pk]
+
     def get_user_reaction(self, obj):
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return None
+        if hasattr(obj, "viewer_reaction"):
+            return obj.viewer_reaction
+        # Single comment: one lookup on the (comment, user) unique index
+        return CommentReaction.objects.filter(comment=obj, user=request.user).values_list("emoji", flat=True).first()
+
 
-        user_id = str(request.user.id)
+class ThreadedCommentSerializer(CommentSerializer):
+    """A comment with the replies loaded by comments.tree.attach_replies() nested under it."""
+    replies = serializers.SerializerMethodField()
+    more_replies = serializers.SerializerMethodField()
 
-        # FIX: user_reactions stored inside reactions?
-        if hasattr(obj, "user_reactions") and obj.user_reactions:
-            return obj.user_reactions.get(user_id)
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ["replies", "more_replies"]
 
-        # fallback: user reaction stored inside reactions?
-        return obj.reactions.get("user", {}).get(user_id)
+    def get_replies(self, obj):
+        return ThreadedCommentSerializer(getattr(obj, "loaded_replies", []), many=True, context=self.context).data
+
+    def get_more_replies(self, obj):
+        """URL of the next page of direct replies, or None when all are shown."""
+        loaded = getattr(obj, "loaded_replies", [])
+        if obj.reply_count <= len(loaded):
+            return None
+        request = self.context.get("request")
+        url = reverse("comment-replies", kwargs={"pk": obj.publication_id, "comment_id": obj.pk})
+        if loaded:
+            url = replace_query_param(url, "cursor", KeysetPagination(("path",)).encode_cursor([loaded[-1].path]))
+        return request.build_absolute_uri(url) if request else url
@@ -1,8 +1,10 @@
 # comments/signals.py
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Comment
-from publications.models import Notification
+from publications.notifications import notify
+from publications import direct_uploads
 
 @receiver(post_save, sender=Comment)
 def notify_publication_author(sender, instance, created, **kwargs):
@@ -12,8 +14,23 @@ def notify_publication_author(sender, instance, created, **kwargs):
 
         # Avoid notifying the comment author themselves
         if instance.author != author:
-            Notification.objects.create(
-                user=author,
-                message=f"{instance.author.get_full_name() or instance.author.email} commented on your publication '{publication.title}'.",
-                related_publication=publication
+            notify(
+                author,
+                f"{instance.author.get_full_name() or instance.author.email} commented on your publication '{publication.title}'.",
+                kind="comment",
+                publication=publication,
             )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_reply_count(sender, instance, **kwargs):
+    # A no-op when the parent is being deleted in the same cascade
+    if instance.parent_id:
+        Comment.objects.filter(pk=instance.parent_id, reply_count__gt=0).update(reply_count=F("reply_count") - 1)
+
+
+# Voice comments can be uploaded straight to storage by their author
+direct_uploads.register_target(
+    'comment.audio', Comment, 'audio',
+    lambda user, comment: comment.author_id == user.pk,
+)
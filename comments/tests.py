@@ -1,3 +1,140 @@
-from django.test import TestCase
+from importlib import import_module
 
-# Create your tests here.
+from django.apps import apps
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from publications.models import Publication
+from . import tree
+from .models import Comment
+
+
+@override_settings(COMMENT_MAX_DEPTH=3, COMMENT_THREAD_DEPTH=2, COMMENT_REPLIES_PER_NODE=2)
+class CommentThreadTests(TestCase):
+    """Comment threads are stored as materialized paths and loaded page by page."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="commenter@example.org",
+            password="Secret#123",
+            agreement=True,
+            full_name="Thread Starter",
+        )
+        self.publication = Publication.objects.create(
+            title="Discussed at length",
+            abstract="a" * 250,
+            author=self.user,
+            status="approved",
+        )
+        self.url = f"/api/publications/{self.publication.pk}/comments/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(publication=self.publication, author=self.user, text=text, parent=parent)
+
+    def test_paths_and_depth_limit(self):
+        root = self.comment("root")
+        reply = self.comment("reply", root)
+        self.assertTrue(reply.path.startswith(root.path))
+        self.assertEqual(reply.depth, 1)
+
+        deepest = self.comment("level 3", self.comment("level 2", reply))
+        self.assertEqual(deepest.depth, 3)
+        # Replies below COMMENT_MAX_DEPTH join the deepest allowed level
+        too_deep = self.comment("level 4", deepest)
+        self.assertEqual(too_deep.depth, 3)
+        self.assertEqual(too_deep.parent_id, deepest.parent_id)
+
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
+        reply.delete()
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 0)
+
+    def test_threaded_pages_with_more_replies(self):
+        first = self.comment("first thread")
+        replies = [self.comment(f"reply {i}", first) for i in range(3)]
+        self.comment("nested", replies[0])
+        self.comment("second thread")
+
+        # The page of threads, all of their replies, then reaction counts
+        # (cold cache) and the viewer's reactions for every comment shown
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {"pagination": "cursor", "page_size": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data["next"])
+        thread = response.data["results"][0]
+        self.assertEqual(thread["text"], "first thread")
+        self.assertEqual([r["text"] for r in thread["replies"]], ["reply 0", "reply 1"])
+        self.assertEqual(thread["replies"][0]["replies"][0]["text"], "nested")
+        self.assertIsNotNone(thread["more_replies"])
+
+        more = self.client.get(thread["more_replies"])
+        self.assertEqual([r["text"] for r in more.data["results"]], ["reply 2"])
+
+        second_page = self.client.get(response.data["next"])
+        self.assertEqual([t["text"] for t in second_page.data["results"]], ["second thread"])
+
+    @override_settings(COMMENT_TREE_MAX_NODES=4)
+    def test_oversized_thread_does_not_starve_the_next(self):
+        first = self.comment("busy thread")
+        for i in range(6):
+            reply = self.comment(f"reply {i}", first)
+            for j in range(3):
+                self.comment(f"nested {i}.{j}", reply)
+        second = self.comment("quiet thread")
+        self.comment("only reply", second)
+
+        roots = list(Comment.objects.filter(depth=0).order_by("path"))
+        with self.assertNumQueries(1):
+            tree.attach_replies(roots, Comment.objects.all())
+        busy, quiet = roots
+        # Two replies with two nested each would be six; the thread stops at four
+        self.assertEqual([r.text for r in busy.loaded_replies], ["reply 0", "reply 1"])
+        self.assertEqual([r.text for r in busy.loaded_replies[0].loaded_replies], ["nested 0.0", "nested 0.1"])
+        self.assertEqual([r.text for r in busy.loaded_replies[1].loaded_replies], [])
+        self.assertEqual([r.text for r in quiet.loaded_replies], ["only reply"])
+
+    def test_reply_through_api(self):
+        root = self.comment("root")
+        response = self.client.post(self.url, {"text": "answer", "parent": str(root.pk)}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["depth"], 1)
+
+        other = Publication.objects.create(title="Elsewhere", abstract="a" * 250, author=self.user)
+        foreign = Comment.objects.create(publication=other, author=self.user, text="elsewhere")
+        response = self.client.post(self.url, {"text": "wrong thread", "parent": str(foreign.pk)}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_flat_list_is_paginated(self):
+        for i in range(8):
+            self.comment(f"comment {i}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 8)
+        self.assertEqual([c["text"] for c in response.data["results"]], [f"comment {i}" for i in range(6)])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_malformed_comment_id_is_not_found(self):
+        self.assertEqual(self.client.get(f"{self.url}not-a-uuid/replies/").status_code, 404)
+
+    @override_settings(COMMENT_MAX_DEPTH=50)
+    def test_depth_is_bounded_by_the_path_column(self):
+        self.assertEqual(tree.max_depth(), 14)
+
+    def test_backfill_caps_deep_chains(self):
+        # Comments from before threading: no path yet, any nesting depth
+        parent = None
+        for i in range(20):
+            parent = Comment.objects.create(
+                publication=self.publication, author=self.user, text=f"level {i}", parent=parent, path="-"
+            )
+        import_module("comments.migrations.0004_comment_threads").backfill_paths(apps, None)
+
+        comments = list(Comment.objects.order_by("created_at"))
+        self.assertEqual(max(comment.depth for comment in comments), 3)
+        self.assertTrue(all(len(comment.path) == (comment.depth + 1) * tree.SEGMENT_WIDTH for comment in comments))
+        # Everything below the deepest level replies to the level above it, as Comment.save() does
+        self.assertEqual({comment.parent_id for comment in comments[4:]}, {comments[2].pk})
+        self.assertEqual(Comment.objects.get(pk=comments[2].pk).reply_count, 17)
@@ -0,0 +1,124 @@
+# comments/tree.py
+"""
+Materialized-path comment threads.
+
+Every Comment stores `path`, the concatenated segments of its ancestors and
+itself, and `depth` (0 for top-level comments):
+
+    0mj8n1k2x3a4b7f1/                   top-level comment
+    0mj8n1k2x3a4b7f1/0mj8n3q9w0e2c09d/  reply to it
+
+A segment is the creation time in microseconds (base 36, fixed width) plus
+four hex digits of the comment id, so ordering by path lists a thread
+depth-first with siblings in chronological order, and a whole subtree is one
+`path__startswith` range scan on the (publication, path) index.
+
+Replies deeper than COMMENT_MAX_DEPTH are attached to the deepest allowed
+ancestor instead. When loading threads, `attach_replies()` fetches every
+descendant of a page of comments in one query, down to COMMENT_THREAD_DEPTH
+levels, keeps at most COMMENT_REPLIES_PER_NODE replies under each comment
+and leaves the rest for the "load more replies" endpoint (`reply_count`
+tells the client how many exist). Both limits are applied in the database
+with window functions: the first replies of every parent, and at most
+COMMENT_TREE_MAX_NODES rows per thread, so one busy thread cannot crowd the
+others on the page out of the result.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber, Substr
+
+TIME_WIDTH = 11  # base-36 microseconds since the epoch; enough until the year 5000+
+SEGMENT_WIDTH = TIME_WIDTH + 4 + 1  # + id digits + '/'
+PATH_LENGTH = 255  # max_length of Comment.path
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def max_depth():
+    """Deepest allowed `depth` (0-based) for new comments."""
+    # Comment.path holds at most PATH_LENGTH // SEGMENT_WIDTH segments
+    return min(getattr(settings, 'COMMENT_MAX_DEPTH', 5), PATH_LENGTH // SEGMENT_WIDTH - 1)
+
+
+def thread_depth():
+    """Reply levels loaded under each comment in one request."""
+    return getattr(settings, 'COMMENT_THREAD_DEPTH', 3)
+
+
+def replies_per_node():
+    return getattr(settings, 'COMMENT_REPLIES_PER_NODE', 5)
+
+
+def max_nodes():
+    """Upper bound on replies fetched under one comment of a page."""
+    return getattr(settings, 'COMMENT_TREE_MAX_NODES', 500)
+
+
+def _base36(number):
+    digits = ''
+    while number:
+        number, remainder = divmod(number, 36)
+        digits = _DIGITS[remainder] + digits
+    return digits.rjust(TIME_WIDTH, '0')
+
+
+def segment(comment):
+    micros = int(comment.created_at.timestamp() * 1_000_000)
+    return f"{_base36(micros)}{comment.id.hex[:4]}/"
+
+
+def parent_path(path):
+    return path[:-SEGMENT_WIDTH]
+
+
+def ancestor_path(path, depth):
+    """Path of the ancestor at `depth` (0-based) of the comment with `path`."""
+    return path[:(depth + 1) * SEGMENT_WIDTH]
+
+
+def attach_replies(comments, queryset, depth=None, per_node=None):
+    """
+    Load the replies of `comments` - siblings, or top-level comments, so all at
+    the same depth - with one query on `queryset`, and set `loaded_replies` on
+    every node. Returns `comments`.
+    """
+    depth = thread_depth() if depth is None else depth
+    per_node = replies_per_node() if per_node is None else per_node
+    for comment in comments:
+        comment.loaded_replies = []
+    if not comments or depth <= 0:
+        return comments
+
+    base_depth = comments[0].depth
+    # The first `per_node` replies of every parent...
+    first_replies = queryset.filter(
+        reduce(or_, (Q(path__startswith=comment.path) for comment in comments)),
+        depth__gt=base_depth,
+        depth__lte=base_depth + depth,
+    ).annotate(
+        sibling_rank=Window(RowNumber(), partition_by=F('parent_id'), order_by=F('path').asc()),
+    ).filter(sibling_rank__lte=per_node)
+    # ...and of those, the first max_nodes() under each comment of the page
+    descendants = queryset.filter(
+        pk__in=first_replies.values('pk'),
+    ).annotate(
+        thread_rank=Window(
+            RowNumber(),
+            partition_by=Substr('path', 1, (base_depth + 1) * SEGMENT_WIDTH),
+            order_by=F('path').asc(),
+        ),
+    ).filter(thread_rank__lte=max_nodes()).order_by('path')
+
+    nodes = {comment.path: comment for comment in comments}
+    for reply in descendants:
+        parent = nodes.get(parent_path(reply.path))
+        # The parent itself was left out
+        if parent is None:
+            continue
+        reply.loaded_replies = []
+        parent.loaded_replies.append(reply)
+        nodes[reply.path] = reply
+    return comments
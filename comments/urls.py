@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CommentListCreateView, CommentDetailView
+from .views import CommentListCreateView, CommentDetailView, CommentRepliesView
 
 urlpatterns = [
     path("publications/<str:pk>/comments/", CommentListCreateView.as_view(), name="publication-comments"),
-    path("publications/<str:pk>/comments/<str:comment_id>/", CommentDetailView.as_view(), name="comment-detail"),
+    path("publications/<str:pk>/comments/<uuid:comment_id>/", CommentDetailView.as_view(), name="comment-detail"),
+    path("publications/<str:pk>/comments/<uuid:comment_id>/replies/", CommentRepliesView.as_view(), name="comment-replies"),
 ]
@@ -5,22 +5,52 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
 from .models import Comment
-from .serializers import CommentSerializer
+from .serializers import CommentSerializer, ThreadedCommentSerializer
+from . import tree
+from emoji import summaries
 from publications.models import Publication
+from publications.pagination import KeysetPagination, KeysetPaginationMixin, StandardResultsPagination
 
 logger = logging.getLogger(__name__)
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+def requested_depth(request):
+    """?depth= reply levels to nest (comments/tree.py), bounded by COMMENT_MAX_DEPTH."""
+    try:
+        depth = int(request.query_params.get("depth", tree.thread_depth()))
+    except ValueError:
+        depth = tree.thread_depth()
+    return max(0, min(depth, tree.max_depth()))
+
+
+class CommentListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """
+    Pages of the flat, chronological comment list by default. With
+    ?pagination=cursor, returns pages of top-level threads with their first
+    replies nested (see comments/tree.py).
+    """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # keep this
+    pagination_class = StandardResultsPagination
+    keyset_ordering = ("path",)
 
     def get_queryset(self):
         publication_id = self.kwargs["pk"]
         return Comment.objects.filter(
             publication__id=publication_id
-        ).order_by("created_at")
+        ).select_related("author").order_by("created_at")
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_keyset_pagination():
+            comments = summaries.annotate(self.paginate_queryset(self.filter_queryset(self.get_queryset())), request.user)
+            return self.get_paginated_response(self.get_serializer(comments, many=True).data)
+
+        queryset = self.get_queryset()
+        threads = self.paginate_queryset(queryset.filter(depth=0))
+        tree.attach_replies(threads, queryset, depth=requested_depth(request))
+        summaries.annotate(threads, request.user)
+        serializer = ThreadedCommentSerializer(threads, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         logger.info("Comment create called")
@@ -61,7 +91,33 @@ class CommentListCreateView(generics.ListCreateAPIView):
         serializer.save(author=self.request.user, publication=publication)
 
     def get_serializer_context(self):
-        return {"request": self.request}
+        return {"request": self.request, "publication_id": self.kwargs["pk"]}
+
+
+class CommentRepliesView(generics.ListAPIView):
+    """'Load more replies': pages of a comment's direct replies, each with its own first replies."""
+    serializer_class = ThreadedCommentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            self._paginator = KeysetPagination(("path",), page_size=tree.replies_per_node() * 2)
+        return self._paginator
+
+    def get_queryset(self):
+        return Comment.objects.filter(publication__id=self.kwargs["pk"]).select_related("author")
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        parent = get_object_or_404(
+            Comment.objects.only("pk"), pk=self.kwargs["comment_id"], publication__id=self.kwargs["pk"]
+        )
+        replies = self.paginate_queryset(queryset.filter(parent=parent))
+        tree.attach_replies(replies, queryset, depth=requested_depth(request) - 1)
+        summaries.annotate(replies, request.user)
+        serializer = self.get_serializer(replies, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
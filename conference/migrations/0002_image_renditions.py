@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conference', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conference',
+            name='banner_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -60,6 +60,8 @@ class Conference(models.Model):
         null=True,
         storage=MediaCloudinaryStorage()
     )
+    # WebP/AVIF thumbnails of banner (config/renditions.py)
+    banner_renditions = models.JSONField(default=dict, blank=True)
 
     organizer = models.ForeignKey(
         User,
@@ -14,6 +14,7 @@ class ConferenceSerializer(serializers.ModelSerializer):
         model = Conference
         fields = [
             "id", "name", "slug", "description", "type", "mode", "status",
-            "start_date", "end_date", "location", "website", "banner",
+            "start_date", "end_date", "location", "website", "banner", "banner_renditions",
             "organizer", "tags", "created_at", "updated_at", "publications"
         ]
+        read_only_fields = ["banner_renditions"]
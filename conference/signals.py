@@ -0,0 +1,6 @@
+# conference/signals.py
+from config import renditions
+from .models import Conference
+
+# Regenerate banner thumbnails whenever the banner changes
+renditions.register(Conference, 'banner', 'banner_renditions', renditions.COVER_SIZES)
@@ -18,4 +18,18 @@ settings_module = (
 )
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", 'config.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+
+from accounts.middleware import CookieJWTAuthMiddlewareStack
+from publications.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter({
+    "http": django_asgi_app,
+    "websocket": AllowedHostsOriginValidator(
+        CookieJWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
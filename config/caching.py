@@ -0,0 +1,16 @@
+# config/caching.py
+"""
+Whether the default cache is shared between worker processes.
+
+LocMemCache (what settings fall back to without REDIS_URL) lives inside one
+process, so deleting a key there only reaches the worker that handled the
+request. Caches whose correctness depends on invalidation check
+`is_shared()` and read the database instead when it is False.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared(alias="default"):
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
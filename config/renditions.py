@@ -0,0 +1,172 @@
+# config/renditions.py
+"""
+Fixed-size image derivatives ("renditions") for uploaded images.
+
+Listing pages only need small thumbnails, but cover images, conference
+banners and profile pictures are stored at upload resolution. `register()`
+ties an image field to a JSONField that holds derivative URLs; whenever the
+image changes, the derivatives are regenerated with Pillow on the background
+queue (config/workers.py) after the transaction commits:
+
+    publication.cover_image_renditions == {
+        "source": "covers/2026/10/cover.jpg",
+        "thumb": {"webp": "https://.../thumb.webp", "avif": "..."},
+        "card": {"webp": "..."},
+    }
+
+WebP is always produced; AVIF only where Pillow was built with AVIF support.
+Files go to settings.RENDITION_STORAGE (Cloudinary in production, the local
+filesystem in tests). `generate_renditions` backfills existing images.
+"""
+import logging
+from io import BytesIO
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps, features
+
+from config.workers import default_queue
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height); images are centre-cropped to exactly this size
+COVER_SIZES = {
+    'thumb': (320, 180),
+    'card': (640, 360),
+    'large': (1280, 720),
+}
+AVATAR_SIZES = {
+    'small': (64, 64),
+    'medium': (256, 256),
+}
+
+QUALITY = {'webp': 80, 'avif': 60}
+
+# (model, image field) -> (renditions field, sizes)
+_registry = {}
+_storage = None
+
+
+def output_formats():
+    return ['webp'] + (['avif'] if features.check('avif') else [])
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        config = getattr(settings, 'RENDITION_STORAGE', None) or {
+            'BACKEND': 'cloudinary_storage.storage.MediaCloudinaryStorage',
+        }
+        _storage = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _storage
+
+
+def reset_storage():
+    """Forget the cached storage, e.g. after overriding RENDITION_STORAGE in tests."""
+    global _storage
+    _storage = None
+
+
+def registered():
+    """[((model, image field), (renditions field, sizes)), ...]"""
+    return list(_registry.items())
+
+
+def register(model, image_field, renditions_field, sizes):
+    _registry[(model, image_field)] = (renditions_field, sizes)
+    post_save.connect(_image_saved, sender=model, dispatch_uid=f"renditions:{model._meta.label}.{image_field}")
+
+
+def source_name(value):
+    # FieldFile (ImageField) or CloudinaryResource (CloudinaryField)
+    if not value:
+        return ''
+    return str(getattr(value, 'name', None) or getattr(value, 'public_id', None) or value)
+
+
+def _image_saved(sender, instance, **kwargs):
+    for (model, image_field), (renditions_field, _) in _registry.items():
+        if model is not sender:
+            continue
+        source = source_name(getattr(instance, image_field))
+        current = getattr(instance, renditions_field) or {}
+        if source == current.get('source', ''):
+            continue
+        if not source:
+            # Image removed: drop the stale derivatives
+            sender.objects.filter(pk=instance.pk).update(**{renditions_field: {}})
+            setattr(instance, renditions_field, {})
+            continue
+        schedule(sender, instance.pk, image_field)
+
+
+def schedule(model, pk, image_field):
+    transaction.on_commit(lambda: default_queue.submit(generate, model, pk, image_field))
+
+
+def _read_source(value):
+    if hasattr(value, 'open'):
+        with value.open('rb') as source:
+            return source.read()
+    # CloudinaryField values have a URL but no storage-backed file
+    response = requests.get(value.url, timeout=getattr(settings, 'RENDITION_FETCH_TIMEOUT', 15))
+    response.raise_for_status()
+    return response.content
+
+
+def render(data, sizes, formats=None):
+    """{name: {format: bytes}} for every size in `sizes` from the image bytes in `data`."""
+    formats = formats or output_formats()
+    image = Image.open(BytesIO(data))
+    # Let JPEG decode at reduced scale when the largest rendition is much smaller
+    largest = max(sizes.values())
+    image.draft('RGB', largest)
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    output = {}
+    for name, size in sizes.items():
+        resized = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        output[name] = {}
+        for fmt in formats:
+            buffer = BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=QUALITY[fmt])
+            output[name][fmt] = buffer.getvalue()
+    return output
+
+
+def generate(model, pk, image_field):
+    """Build and store the renditions for one object; returns the saved mapping (or None)."""
+    renditions_field, sizes = _registry[(model, image_field)]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return None
+    value = getattr(instance, image_field)
+    source = source_name(value)
+    if not source:
+        return None
+
+    try:
+        rendered = render(_read_source(value), sizes)
+    except Exception as e:
+        logger.error(f"Could not render {model._meta.label} {pk} {image_field}: {str(e)}")
+        return None
+
+    storage = get_storage()
+    renditions = {'source': source}
+    for name, files in rendered.items():
+        renditions[name] = {}
+        for fmt, content in files.items():
+            path = f"renditions/{model._meta.label_lower}/{pk}/{image_field}-{name}.{fmt}"
+            if storage.exists(path):
+                storage.delete(path)
+            saved = storage.save(path, ContentFile(content))
+            renditions[name][fmt] = storage.url(saved)
+
+    # Only store the result if the image was not replaced while we were rendering
+    model.objects.filter(pk=pk, **{image_field: value}).update(**{renditions_field: renditions})
+    return renditions
@@ -25,6 +25,19 @@ PAYSTACK_SECRET_KEY = config("PAYSTACK_SECRET_KEY", default="")
 if not PAYSTACK_SECRET_KEY or not PAYSTACK_PUBLIC_KEY:
     raise ValueError("PAYSTACK keys missing in .env")
 
+# Paystack client (payments/paystack.py)
+PAYSTACK_BASE_URL = config("PAYSTACK_BASE_URL", default="https://api.paystack.co")
+PAYSTACK_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+PAYSTACK_MAX_RETRIES = 2  # only for idempotent calls such as verify
+PAYSTACK_RETRY_BACKOFF = 0.5
+PAYSTACK_POOL_SIZE = 10
+PAYSTACK_CIRCUIT_FAILURE_THRESHOLD = 5
+PAYSTACK_CIRCUIT_RESET_TIMEOUT = 30
+# reconcile_payments: pending payments older than this are marked expired
+PAYMENT_PENDING_EXPIRY_HOURS = 24
+# Seconds a user's "paid publications" set (payments/utils.py) stays cached
+PAID_PUBLICATIONS_CACHE_TTL = 300
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -38,6 +51,7 @@ INSTALLED_APPS = [
 
     'rest_framework',
     'corsheaders',
+    'channels',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
 
@@ -161,10 +175,15 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_SAMESITE": COOKIE_SAMESITE,              # Required for cross-site
 }
 
+# Authentication user cache and token claims (accounts/tokens.py).
+# The user cache is only used with a cache shared by all workers (REDIS_URL).
+AUTH_USER_CACHE_TTL = 300
+JWT_EMBED_USER_CLAIMS = os.getenv("JWT_EMBED_USER_CLAIMS", "False") == "True"
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "accounts.authentication.CookieJWTAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.VersionedJWTAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -186,6 +205,7 @@ REST_FRAMEWORK = {
 }
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 DATABASES = {
     "default": dj_database_url.config(
@@ -222,8 +242,92 @@ CLOUDINARY_STORAGE = {
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
+# Image derivatives (config/renditions.py)
+RENDITION_STORAGE = {"BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage"}
+RENDITION_FETCH_TIMEOUT = 15
+
+# Manuscript text extraction and previews (publications/ingestion.py)
+MANUSCRIPT_EXTRACTION_WORKERS = int(os.getenv("MANUSCRIPT_EXTRACTION_WORKERS", "1"))
+MANUSCRIPT_EXTRACTION_TIMEOUT = 60  # seconds per document; the extraction process is killed after this
+MANUSCRIPT_MAX_TEXT_CHARS = 1_000_000
+
+# Resumable chunked uploads (publications/uploads.py)
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", "")  # defaults to <tmp>/panel-uploads
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 5 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Direct-to-storage uploads (publications/direct_uploads.py); use
+# publications.direct_uploads.LocalDirectUploadBackend for offline development
+DIRECT_UPLOAD_BACKEND = os.getenv("DIRECT_UPLOAD_BACKEND", "publications.direct_uploads.CloudinaryDirectUploadBackend")
+DIRECT_UPLOAD_TICKET_TTL = 900  # seconds to upload and confirm
+
+# Lifetime of signed download URLs handed out by PublicationDownloadView
+DOWNLOAD_URL_TTL = 300
+
+# Threaded comments (comments/tree.py)
+COMMENT_MAX_DEPTH = 5  # deepest reply level; at most 14 fits the 255-character path
+COMMENT_THREAD_DEPTH = 3  # reply levels nested per request (?depth= up to COMMENT_MAX_DEPTH)
+COMMENT_REPLIES_PER_NODE = 5  # replies shown under a comment before "more_replies"
+COMMENT_TREE_MAX_NODES = 500  # replies fetched per thread of a page
+REACTION_SUMMARY_CACHE_TTL = 600  # seconds a comment's reaction counts stay cached (emoji/summaries.py)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Shared cache (Redis when REDIS_URL is set, per-process memory otherwise)
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# WebSocket notification push (publications/consumers.py)
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+
+# Seconds the editor dashboard totals (publications/stats.py) are served from cache
+STATS_CACHE_TTL = 30
+
+# Publication full-text search (see publications/search.py).
+# Leave the backend empty to pick PostgreSQL tsvector or SQLite FTS5 from the database vendor.
+PUBLICATION_SEARCH_BACKEND = os.getenv("PUBLICATION_SEARCH_BACKEND") or None
+PUBLICATION_SEARCH_CONFIG = "english"
+PUBLICATION_SEARCH_MAX_RESULTS = 500
+
+# Seconds between write-behind flushes of buffered counters (publication views, downloads).
+# 0 writes every increment immediately.
+COUNTER_FLUSH_INTERVAL = int(os.getenv("COUNTER_FLUSH_INTERVAL", "10"))
+
+# In-process background queue (config/workers.py). Eager mode runs jobs inline.
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+
+# Seconds between refreshes of a changed author leaderboard (publications/leaderboard.py)
+LEADERBOARD_REFRESH_INTERVAL = 300
+
+# Notification fan-out (publications/notifications.py)
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATIONS_ASYNC = os.getenv("NOTIFICATIONS_ASYNC", "False") == "True"
+# Seconds a per-user unread notification count stays cached (only with a shared cache; writes invalidate it)
+UNREAD_COUNT_CACHE_TTL = 3600
+
 # ✅ Import deployment settings if they exist (but they shouldn't override cookie settings)
 try:
     from .deployment_settings import *
@@ -0,0 +1,74 @@
+# config/workers.py
+"""
+In-process background queue.
+
+Small jobs that should not hold up the request thread (notification fan-out,
+webhook processing, file post-processing) are handed to a BackgroundQueue.
+Jobs run on a per-process thread pool, so nothing extra has to be deployed;
+anything submitted right before a worker is killed hard can be lost, so jobs
+must be safe to re-run from their source data.
+
+With settings.BACKGROUND_TASKS_EAGER = True every job runs inline, which is
+what tests and management commands want.
+"""
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundQueue:
+    def __init__(self, name, workers=None):
+        self.name = name
+        self._workers = workers
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    @property
+    def workers(self):
+        if self._workers is not None:
+            return self._workers
+        return getattr(settings, "BACKGROUND_WORKERS", 2)
+
+    def submit(self, func, *args, **kwargs):
+        if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+            return func(*args, **kwargs)
+        return self._get_executor().submit(self._run, func, args, kwargs)
+
+    def _run(self, func, args, kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Background job {getattr(func, '__name__', func)} on '{self.name}' failed: {str(e)}")
+        finally:
+            close_old_connections()
+
+    def _get_executor(self):
+        # Executors do not survive fork(), so each worker process builds its own
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"{self.name}-worker",
+                )
+        return self._executor
+
+    def shutdown(self, wait=True):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+default_queue = BackgroundQueue("default")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EmojiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'emoji'
+
+    def ready(self):
+        import emoji.signals  # noqa
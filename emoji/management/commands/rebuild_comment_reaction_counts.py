@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from emoji.models import CommentReaction, ReactionCount
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-emoji comment reaction counters from CommentReaction rows and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report counters that drifted, do not fix them.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actual = {
+                (row["comment_id"], row["emoji"]): row["total"]
+                for row in CommentReaction.objects.order_by().values("comment_id", "emoji").annotate(total=Count("id"))
+            }
+            stored = {
+                (comment_id, emoji): (pk, count)
+                for pk, comment_id, emoji, count in ReactionCount.objects.values_list("pk", "comment_id", "emoji", "count")
+            }
+
+            drifted = []
+            for key in sorted(set(actual) | set(stored), key=str):
+                pk, count = stored.get(key, (None, 0))
+                if count != actual.get(key, 0):
+                    drifted.append((key, pk, count, actual.get(key, 0)))
+                    self.stdout.write(f"{key[0]} {key[1]}: {count} -> {actual.get(key, 0)}")
+
+            if options["dry_run"]:
+                self.stdout.write(f"{len(drifted)} counters drifted (dry run, nothing changed).")
+                return
+
+            for (comment_id, emoji), pk, _, count in drifted:
+                if pk is None:
+                    ReactionCount.objects.create(comment_id=comment_id, emoji=emoji, count=count)
+                else:
+                    ReactionCount.objects.filter(pk=pk).update(count=count)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(drifted)} counters."))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 06:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    # CommentReaction rows are the source of truth; the old JSON counters on Comment could drift
+    CommentReaction = apps.get_model('emoji', 'CommentReaction')
+    ReactionCount = apps.get_model('emoji', 'ReactionCount')
+    rows = CommentReaction.objects.values('comment_id', 'emoji').annotate(total=Count('id')).order_by()
+    ReactionCount.objects.bulk_create(
+        [ReactionCount(comment_id=row['comment_id'], emoji=row['emoji'], count=row['total']) for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_comment_threads'),
+        ('emoji', '0002_alter_commentreaction_comment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReactionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('emoji', models.CharField(choices=[('like', 'Like'), ('love', 'Love'), ('haha', 'Haha'), ('wow', 'Wow'), ('sad', 'Sad'), ('angry', 'Angry'), ('care', 'Care'), ('confused', 'Confused'), ('party', 'Party')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reaction_counts', to='comments.comment')),
+            ],
+            options={
+                'unique_together': {('comment', 'emoji')},
+            },
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
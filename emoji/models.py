@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from accounts.models import User
 from comments.models import Comment
 from django.utils import timezone
@@ -29,3 +30,75 @@ class CommentReaction(models.Model):
 
     def __str__(self):
         return f"{self.user.get_full_name()} reacted {self.emoji} on comment {self.comment.id}"
+
+    @classmethod
+    def react(cls, comment_id, user, emoji):
+        """
+        Set `user`'s reaction on a comment (emoji=None removes it) and move the
+        per-emoji counters by the difference. The user's reaction row is locked
+        for the whole transaction, so concurrent requests from the same user
+        are applied one after the other and never count twice.
+        Returns the previous emoji, or None.
+        """
+        from .summaries import invalidate
+
+        with transaction.atomic():
+            # Drops the cached summary once the outermost transaction commits, even on early returns
+            invalidate(comment_id)
+            reaction = cls.objects.select_for_update().filter(comment_id=comment_id, user=user).first()
+            if reaction is None:
+                if emoji is None:
+                    return None
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(comment_id=comment_id, user=user, emoji=emoji)
+                except IntegrityError:
+                    # A concurrent request created the row first: wait for it and change it instead
+                    reaction = cls.objects.select_for_update().get(comment_id=comment_id, user=user)
+                else:
+                    ReactionCount.apply(comment_id, {emoji: 1})
+                    return None
+
+            previous = reaction.emoji
+            if previous == emoji:
+                return previous
+            if emoji is None:
+                # The post_delete receiver (emoji/signals.py) takes it off the counters
+                cls.objects.filter(pk=reaction.pk).delete()
+            else:
+                cls.objects.filter(pk=reaction.pk).update(emoji=emoji)
+                ReactionCount.apply(comment_id, {previous: -1, emoji: 1})
+            return previous
+
+
+class ReactionCount(models.Model):
+    """Number of CommentReaction rows per comment and emoji, kept by CommentReaction.react()."""
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="reaction_counts")
+    emoji = models.CharField(max_length=10, choices=CommentReaction.EMOJI_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("comment", "emoji")
+
+    def __str__(self):
+        return f"{self.emoji}: {self.count} on comment {self.comment_id}"
+
+    @classmethod
+    def apply(cls, comment_id, deltas):
+        """
+        Add {emoji: delta} to a comment's counters with single UPDATE ... SET
+        count = count + delta statements. Rows are touched in emoji order so two
+        transactions swapping reactions cannot deadlock, and decrements only
+        apply while the counter is large enough to take them.
+        """
+        for emoji, delta in sorted(deltas.items()):
+            rows = cls.objects.filter(comment_id=comment_id, emoji=emoji)
+            if delta < 0:
+                rows.filter(count__gte=-delta).update(count=F("count") + delta)
+            elif delta > 0 and not rows.update(count=F("count") + delta):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(comment_id=comment_id, emoji=emoji, count=delta)
+                except IntegrityError:
+                    # Created concurrently; it exists now
+                    rows.update(count=F("count") + delta)
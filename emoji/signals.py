@@ -0,0 +1,20 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from comments.models import Comment
+from publications.models import Publication
+from .models import CommentReaction, ReactionCount
+from .summaries import invalidate
+
+
+@receiver(post_delete, sender=CommentReaction)
+def uncount_reaction(sender, instance, origin=None, **kwargs):
+    # Runs inside the delete's transaction, for reactions removed directly or
+    # along with their user. Reactions removed with their comment (or its
+    # publication) are not uncounted one by one: the counters cascade too.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and origin_model in (Comment, Publication):
+        return
+    ReactionCount.apply(instance.comment_id, {instance.emoji: -1})
+    invalidate(instance.comment_id)
@@ -0,0 +1,95 @@
+# emoji/summaries.py
+"""
+Reaction summaries for pages of comments.
+
+`annotate(comments, user)` sets on every comment of a page, including the
+replies nested under it by comments.tree.attach_replies():
+
+    * reaction_summary - {emoji: count}, read from the cache with one
+      get_many(); comments missing there are loaded from ReactionCount in
+      one query and cached,
+    * viewer_reaction  - the requesting user's emoji or None, one query on
+      the (comment, user) index for the whole page,
+
+so a page of comments costs at most two queries on top of loading it, however
+many comments it holds. Summaries are only ever deleted, never written back
+with a fresh value: CommentReaction.react() and the post_delete receiver in
+emoji/signals.py call invalidate(), which drops the entry once the transaction
+commits, and the next read reloads it. Entries also expire after
+REACTION_SUMMARY_CACHE_TTL seconds. A per-process cache (LocMem) is not used
+at all, as a delete would only reach the worker that made it.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from config.caching import is_shared
+
+from .models import CommentReaction, ReactionCount
+
+
+def _key(comment_id):
+    return f"comment_reactions:{comment_id}"
+
+
+def _ttl():
+    return getattr(settings, 'REACTION_SUMMARY_CACHE_TTL', 600)
+
+
+def _load(comment_ids):
+    summaries = {comment_id: {} for comment_id in comment_ids}
+    rows = ReactionCount.objects.filter(comment_id__in=comment_ids, count__gt=0).order_by('emoji')
+    for comment_id, emoji, count in rows.values_list('comment_id', 'emoji', 'count'):
+        summaries[comment_id][emoji] = count
+    return summaries
+
+
+def counts_for(comment_ids):
+    """{comment_id: {emoji: count}} for every id in `comment_ids`."""
+    if not is_shared():
+        return _load(comment_ids)
+    keys = {_key(comment_id): comment_id for comment_id in comment_ids}
+    summaries = {keys[key]: summary for key, summary in cache.get_many(list(keys)).items()}
+    missing = [comment_id for comment_id in keys.values() if comment_id not in summaries]
+    if missing:
+        loaded = _load(missing)
+        for comment_id, summary in loaded.items():
+            # add() so a summary loaded meanwhile by another request is kept
+            cache.add(_key(comment_id), summary, _ttl())
+        summaries.update(loaded)
+    return summaries
+
+
+def invalidate(comment_id):
+    """Drop one comment's cached summary once the current transaction commits."""
+    if is_shared():
+        transaction.on_commit(lambda: cache.delete(_key(comment_id)))
+
+
+def viewer_reactions(comment_ids, user):
+    """{comment_id: emoji} of `user`'s reactions among `comment_ids`."""
+    if not user.is_authenticated or not comment_ids:
+        return {}
+    return dict(
+        CommentReaction.objects.filter(user=user, comment_id__in=comment_ids).values_list('comment_id', 'emoji')
+    )
+
+
+def _walk(comments):
+    stack = list(comments)
+    while stack:
+        comment = stack.pop()
+        yield comment
+        stack.extend(getattr(comment, 'loaded_replies', ()))
+
+
+def annotate(comments, user):
+    """Set reaction_summary and viewer_reaction on `comments` and their loaded replies. Returns `comments`."""
+    nodes = list(_walk(comments))
+    comment_ids = [comment.pk for comment in nodes]
+    counts = counts_for(comment_ids)
+    mine = viewer_reactions(comment_ids, user)
+    for comment in nodes:
+        comment.reaction_summary = counts[comment.pk]
+        comment.viewer_reaction = mine.get(comment.pk)
+    return comments
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from comments.models import Comment
+from publications.models import Publication
+from . import summaries
+from .models import CommentReaction, ReactionCount
+
+
+class ReactionMixin:
+    url = "/api/comment/react/"
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                email=f"reader{i}@example.org", password="Secret#123", agreement=True, full_name=f"Reader {i}"
+            )
+            for i in range(2)
+        ]
+        publication = Publication.objects.create(
+            title="Worth a reaction", abstract="a" * 250, author=self.users[0], status="approved"
+        )
+        self.comment = Comment.objects.create(publication=publication, author=self.users[0], text="hello")
+        self.client = APIClient()
+
+    def react(self, user, emoji):
+        self.client.force_authenticate(user)
+        return self.client.post(self.url, {"comment_id": str(self.comment.pk), "emoji": emoji}, format="json")
+
+    def counts(self):
+        return dict(ReactionCount.objects.filter(comment=self.comment, count__gt=0).values_list("emoji", "count"))
+
+
+class ReactionCountTests(ReactionMixin, TestCase):
+    """Reactions are CommentReaction rows with per-emoji counters moved by F() updates."""
+
+    def test_react_change_and_repeat(self):
+        first, second = self.users
+        response = self.react(first, "like")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {"reactions": {"like": 1}, "user_reaction": "like"})
+
+        self.react(second, "like")
+        # Repeating a reaction does not count it again
+        self.react(second, "like")
+        self.assertEqual(self.counts(), {"like": 2})
+
+        response = self.react(second, "love")
+        self.assertEqual(response.data["reactions"], {"like": 1, "love": 1})
+        self.assertEqual(CommentReaction.objects.filter(comment=self.comment).count(), 2)
+
+        self.assertEqual(CommentReaction.react(self.comment.pk, first, None), "like")
+        self.assertEqual(self.counts(), {"love": 1})
+
+    def test_deleting_a_user_uncounts_their_reactions(self):
+        first, second = self.users
+        other = Comment.objects.create(publication=self.comment.publication, author=first, text="other")
+        CommentReaction.react(self.comment.pk, first, "like")
+        CommentReaction.react(self.comment.pk, second, "like")
+        CommentReaction.react(other.pk, second, "sad")
+
+        second.delete()
+        self.assertEqual(self.counts(), {"like": 1})
+        self.assertEqual(ReactionCount.objects.get(comment=other, emoji="sad").count, 0)
+        # Removing a comment takes its counters along
+        other.delete()
+        self.assertFalse(ReactionCount.objects.filter(comment_id=other.pk).exists())
+
+    def test_rebuild_comment_reaction_counts(self):
+        CommentReaction.react(self.comment.pk, self.users[0], "wow")
+        CommentReaction.react(self.comment.pk, self.users[1], "wow")
+        ReactionCount.objects.filter(comment=self.comment).update(count=7)
+        ReactionCount.objects.create(comment=self.comment, emoji="sad", count=2)
+
+        out = StringIO()
+        call_command("rebuild_comment_reaction_counts", "--dry-run", stdout=out)
+        self.assertIn("2 counters drifted", out.getvalue())
+        self.assertEqual(self.counts(), {"wow": 7, "sad": 2})
+
+        call_command("rebuild_comment_reaction_counts", stdout=StringIO())
+        self.assertEqual(self.counts(), {"wow": 2})
+
+    def test_comment_list_shows_counts_and_own_reaction(self):
+        first, second = self.users
+        self.react(first, "haha")
+        self.react(second, "wow")
+
+        self.client.force_authenticate(first)
+        response = self.client.get(f"/api/publications/{self.comment.publication_id}/comments/")
+        self.assertEqual(response.status_code, 200)
+        comment = response.data["results"][0]
+        self.assertEqual(comment["reactions"], {"haha": 1, "wow": 1})
+        self.assertEqual(comment["user_reaction"], "haha")
+
+    def test_per_process_cache_is_not_used(self):
+        CommentReaction.react(self.comment.pk, self.users[1], "care")
+        self.client.force_authenticate(self.users[1])
+        url = f"/api/publications/{self.comment.publication_id}/comments/"
+        # Count, comments, reaction counts, the viewer's reactions - on every request
+        for _ in range(2):
+            with self.assertNumQueries(4):
+                response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["reactions"], {"care": 1})
+
+
+class SharedSummaryCacheTests(ReactionMixin, TestCase):
+    """With a shared cache, summaries are cached and dropped when reactions change."""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        shared = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+        super().setUp()
+        self.list_url = f"/api/publications/{self.comment.publication_id}/comments/"
+
+    def listed(self):
+        self.client.force_authenticate(self.users[0])
+        return self.client.get(self.list_url).data["results"][0]["reactions"]
+
+    def test_comment_list_queries_do_not_grow_with_size(self):
+        publication = self.comment.publication
+        comments = [self.comment] + [
+            Comment.objects.create(publication=publication, author=self.users[1], text=f"comment {i}")
+            for i in range(20)
+        ]
+        for comment in comments[::2]:
+            CommentReaction.react(comment.pk, self.users[1], "care")
+
+        self.client.force_authenticate(self.users[1])
+        url = f"/api/publications/{publication.pk}/comments/?page_size=21"
+        # Count, comments, reaction counts (cold cache), the viewer's reactions
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        results = response.data["results"]
+        self.assertEqual(len(results), 21)
+        self.assertEqual(sum(1 for c in results if c["reactions"] == {"care": 1}), 11)
+        # Counts are cached per comment now
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_reacting_drops_cached_summary(self):
+        self.assertEqual(self.listed(), {})
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.react(self.users[1], "party")
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(cache.get(summaries._key(self.comment.pk)))
+        self.assertEqual(self.listed(), {"party": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentReaction.react(self.comment.pk, self.users[1], "sad")
+        self.assertEqual(self.listed(), {"sad": 1})
+
+    def test_deleting_a_user_drops_cached_summary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CommentReaction.react(self.comment.pk, self.users[1], "wow")
+        self.assertEqual(self.listed(), {"wow": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[1].delete()
+        self.assertEqual(self.listed(), {})
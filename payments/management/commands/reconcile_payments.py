@@ -0,0 +1,131 @@
+"""
+Settle pending payments from Paystack's transaction listing.
+
+Payments normally leave 'pending' through VerifyPaymentView, the callback or
+the webhook. This command catches the rest: it loads the references of every
+pending payment in the window, pages through GET /transaction for the same
+period and matches by reference. Successful charges go through the shared
+processor (payments.processing), failed ones are marked in batched UPDATEs,
+and pending payments older than PAYMENT_PENDING_EXPIRY_HOURS that Paystack
+never settled are marked 'expired'.
+
+It runs hourly as the panel-reconcile-payments cron job in render.yaml; on
+other hosts use the equivalent crontab entry:
+
+    0 * * * *  python manage.py reconcile_payments
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.models import Payment
+from payments.paystack import PaystackError, get_client
+from payments.processing import apply_charge_success
+
+# Paystack transaction statuses that will never turn into a successful charge
+FAILED_STATUSES = {"failed", "reversed"}
+
+
+def update_in_batches(references, batch_size, **changes):
+    """UPDATE still-pending payments matching `references`, `batch_size` rows per statement."""
+    references = list(references)
+    updated = 0
+    for start in range(0, len(references), batch_size):
+        updated += Payment.objects.filter(
+            reference__in=references[start:start + batch_size],
+            status="pending",
+        ).update(**changes)
+    return updated
+
+
+class Command(BaseCommand):
+    help = "Match pending payments against Paystack's transaction list and settle or expire them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=7,
+            help="Only reconcile payments created in the last N days.",
+        )
+        parser.add_argument(
+            "--per-page",
+            type=int,
+            default=100,
+            help="Transactions requested per Paystack page.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="References per UPDATE statement.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        since = now - timedelta(days=options["days"])
+        expire_before = now - timedelta(hours=getattr(settings, "PAYMENT_PENDING_EXPIRY_HOURS", 24))
+
+        pending = set(
+            Payment.objects.filter(status="pending", created_at__gte=since)
+            .values_list("reference", flat=True)
+        )
+        self.stdout.write(f"{len(pending)} pending payments since {since:%Y-%m-%d %H:%M}.")
+
+        succeeded, failed = {}, set()
+        if pending:
+            remaining = set(pending)
+            try:
+                for txn in get_client().iter_transactions(
+                    per_page=options["per_page"],
+                    **{"from": since.isoformat()},
+                ):
+                    reference = txn.get("reference")
+                    if reference not in remaining:
+                        continue
+                    if txn.get("status") == "success":
+                        succeeded[reference] = txn
+                    elif txn.get("status") in FAILED_STATUSES:
+                        failed.add(reference)
+                    else:
+                        continue  # abandoned/ongoing: leave for a later run or expiry
+                    remaining.discard(reference)
+                    if not remaining:
+                        break
+            except PaystackError as e:
+                raise CommandError(f"Could not list Paystack transactions: {str(e)}")
+
+        if options["dry_run"]:
+            expiring = Payment.objects.filter(status="pending", created_at__lt=expire_before)\
+                .exclude(reference__in=set(succeeded) | failed).count()
+            self.stdout.write(
+                f"Would settle {len(succeeded)}, fail {len(failed)} and expire {expiring} payments (dry run)."
+            )
+            return
+
+        # Successful charges carry side effects (publication status, free reviews,
+        # notifications), so they go through the shared row-locked processor
+        settled = 0
+        for reference, txn in succeeded.items():
+            try:
+                apply_charge_success(reference, txn)
+                settled += 1
+            except Exception as e:
+                self.stderr.write(f"{reference}: {str(e)}")
+
+        marked_failed = update_in_batches(failed, options["batch_size"], status="failed")
+
+        stale = Payment.objects.filter(status="pending", created_at__lt=expire_before)\
+            .values_list("reference", flat=True)
+        expired = update_in_batches(stale, options["batch_size"], status="expired")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Settled {settled}, failed {marked_failed}, expired {expired} payments."
+        ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from payments.models import PaystackEvent
+from payments.processing import process_event
+
+
+class Command(BaseCommand):
+    help = "Re-apply stored Paystack webhook events (failed or never processed by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event-id",
+            action="append",
+            default=[],
+            help="Only replay this event_id (can be repeated).",
+        )
+        parser.add_argument(
+            "--reference",
+            help="Only replay events for this payment reference.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Also replay processed/ignored events (safe: payments are only settled once).",
+        )
+
+    def handle(self, *args, **options):
+        events = PaystackEvent.objects.order_by("received_at", "pk")
+        if options["event_id"]:
+            events = events.filter(event_id__in=options["event_id"])
+        if options["reference"]:
+            events = events.filter(reference=options["reference"])
+        if not options["force"]:
+            events = events.filter(status__in=["received", "failed"])
+
+        pks = list(events.values_list("pk", flat=True))
+        if options["force"]:
+            PaystackEvent.objects.filter(pk__in=pks).update(status="received")
+
+        processed = failed = 0
+        for pk in pks:
+            if process_event(pk) is None:
+                failed += 1
+            else:
+                processed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Replayed {processed} events, {failed} failed."))
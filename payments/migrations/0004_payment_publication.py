@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-17 06:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_payment_publication(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    Publication = apps.get_model('publications', 'Publication')
+
+    existing = set(Publication.objects.values_list('id', flat=True))
+    batch = []
+    for payment in Payment.objects.filter(publication__isnull=True).only('id', 'metadata').iterator(chunk_size=2000):
+        publication_id = str((payment.metadata or {}).get('publication_id') or '')
+        if publication_id in existing:
+            payment.publication_id = publication_id
+            batch.append(payment)
+        if len(batch) >= 1000:
+            Payment.objects.bulk_update(batch, ['publication'])
+            batch = []
+    if batch:
+        Payment.objects.bulk_update(batch, ['publication'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_expired_status'),
+        ('publications', '0016_notification_unread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='publication',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments', to='publications.publication'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', 'payment_type', 'status', 'publication'], name='payments_pa_user_id_30e5da_idx'),
+        ),
+        migrations.RunPython(backfill_payment_publication, migrations.RunPython.noop),
+    ]
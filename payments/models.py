@@ -1,14 +1,16 @@
 # File: payments/models.py
 from django.db import models
 from accounts.models import User
+from publications.tracking import FieldTrackerMixin
 from django.utils import timezone
 
-class Payment(models.Model):
+class Payment(FieldTrackerMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('success', 'Success'),
         ('failed', 'Failed'),
         ('refund_requested', 'Refund Requested'),
+        ('expired', 'Expired'),
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -20,10 +22,36 @@ class Payment(models.Model):
     metadata = models.JSONField(default=dict)
     created_at = models.DateTimeField(default=timezone.now)
     used = models.BooleanField(default=False)  # Added to track if used for submission
+    # Indexed replacement for metadata['publication_id'] lookups (kept in sync in save())
+    publication = models.ForeignKey(
+        'publications.Publication',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='payments',
+    )
+
+    class Meta:
+        indexes = [
+            # reconcile_payments scans pending rows by age
+            models.Index(fields=['status', 'created_at']),
+            # "has this user paid fee X for publication Y" checks
+            models.Index(fields=['user', 'payment_type', 'status', 'publication']),
+        ]
 
     def __str__(self):
         return f"{self.reference} - {self.payment_type} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        publication_id = (self.metadata or {}).get('publication_id')
+        if self.publication_id is None and publication_id:
+            Publication = self._meta.get_field('publication').related_model
+            if Publication.objects.filter(pk=str(publication_id)).exists():
+                self.publication_id = str(publication_id)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'publication'}
+        super().save(*args, **kwargs)
+
 class Subscription(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     free_reviews_used = models.IntegerField(default=0)
@@ -37,4 +65,35 @@ class Subscription(models.Model):
             self.free_reviews_used += 1
             self.save()
             return True
-        return False
\ No newline at end of file
+        return False
+
+class PaystackEvent(models.Model):
+    """
+    Inbox of verified Paystack webhook deliveries. Rows are written before the
+    webhook is acknowledged and applied afterwards by payments.processing, so
+    a redelivered event (same event_id) is stored and processed only once.
+    """
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=150, unique=True)
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100, blank=True, db_index=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.reference or self.event_id} - {self.status}"
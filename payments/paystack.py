@@ -0,0 +1,209 @@
+# payments/paystack.py
+"""
+Shared Paystack API client.
+
+All payment views talk to Paystack through `get_client()` instead of bare
+requests.get/post calls:
+
+    * one pooled requests.Session per process (keep-alive, no TLS handshake per call),
+    * (connect, read) timeouts on every request (settings.PAYSTACK_TIMEOUT),
+    * jittered exponential-backoff retries for idempotent GETs such as
+      transaction verification (settings.PAYSTACK_MAX_RETRIES) - initialising a
+      transaction is never retried because it would create a second charge,
+    * a circuit breaker that fails fast for PAYSTACK_CIRCUIT_RESET_TIMEOUT seconds
+      after PAYSTACK_CIRCUIT_FAILURE_THRESHOLD consecutive gateway failures.
+
+Errors are raised as PaystackError, a requests.RequestException subclass, so
+existing `except requests.RequestException` handlers keep working.
+
+settings.PAYSTACK_BASE_URL points the client at a local stub server in tests.
+"""
+import logging
+import random
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class PaystackError(requests.RequestException):
+    """A failed Paystack call; `response` is set when Paystack answered."""
+
+
+class CircuitOpenError(PaystackError):
+    """Raised without contacting Paystack while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. After `failure_threshold` failures the circuit
+    opens and calls fail immediately; once `reset_timeout` seconds have passed a
+    single trial call is let through (half-open) and its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def end_trial(self):
+        """Let the next call through as a new trial if this one ended without a verdict."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Paystack circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+class PaystackClient:
+    # Statuses worth retrying; everything else in 4xx is a definitive answer
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, secret_key=None, base_url=None, timeout=None, max_retries=None,
+                 backoff=None, pool_size=None, breaker=None):
+        self.secret_key = secret_key if secret_key is not None else settings.PAYSTACK_SECRET_KEY
+        self.base_url = (base_url or getattr(settings, "PAYSTACK_BASE_URL", "https://api.paystack.co")).rstrip("/")
+        self.timeout = timeout or getattr(settings, "PAYSTACK_TIMEOUT", (3.05, 10))
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, "PAYSTACK_MAX_RETRIES", 2)
+        self.backoff = backoff if backoff is not None else getattr(settings, "PAYSTACK_RETRY_BACKOFF", 0.5)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=getattr(settings, "PAYSTACK_CIRCUIT_FAILURE_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "PAYSTACK_CIRCUIT_RESET_TIMEOUT", 30),
+        )
+
+        pool_size = pool_size or getattr(settings, "PAYSTACK_POOL_SIZE", 10)
+        self.session = requests.Session()
+        # Retries are handled below so they can be limited to idempotent calls
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.secret_key}",
+            "Content-Type": "application/json",
+        })
+
+    # ── API ───────────────────────────────────────────────────────
+    def initialize_transaction(self, payload):
+        return self.request("POST", "/transaction/initialize", json=payload)
+
+    def verify_transaction(self, reference):
+        return self.request("GET", f"/transaction/verify/{quote(str(reference), safe='')}", retry=True)
+
+    def list_transactions(self, **params):
+        """One page of GET /transaction (params: perPage, page, from, to, status)."""
+        return self.request("GET", "/transaction", retry=True, params=params)
+
+    def iter_transactions(self, per_page=100, **params):
+        """Yield every transaction matching `params`, following Paystack's page meta."""
+        page = 1
+        while True:
+            resp_data = self.list_transactions(perPage=per_page, page=page, **params)
+            yield from resp_data.get("data") or []
+            meta = resp_data.get("meta") or {}
+            if page >= int(meta.get("pageCount") or 0) or not resp_data.get("data"):
+                return
+            page += 1
+
+    # ── transport ─────────────────────────────────────────────────
+    def request(self, method, path, retry=False, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError("Payment gateway temporarily unavailable.")
+        try:
+            return self._send(method, path, retry, **kwargs)
+        finally:
+            # A half-open trial must never stay "running": that would keep the circuit open for good
+            self.breaker.end_trial()
+
+    def _send(self, method, path, retry, **kwargs):
+        attempts = 1 + (self.max_retries if retry else 0)
+        url = f"{self.base_url}{path}"
+        for attempt in range(attempts):
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = PaystackError(f"Paystack {method} {path} failed: {str(e)}")
+            except requests.RequestException as e:
+                # Broken responses, redirect loops, bad URLs: counted, but not worth retrying
+                self.breaker.record_failure()
+                raise PaystackError(f"Paystack {method} {path} failed: {str(e)}") from e
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    # Paystack answered; a 4xx is its verdict, not an outage
+                    self.breaker.record_success()
+                    if response.status_code >= 400:
+                        raise PaystackError(
+                            f"Paystack {method} {path} returned {response.status_code}",
+                            response=response,
+                        )
+                    return response.json()
+                error = PaystackError(
+                    f"Paystack {method} {path} returned {response.status_code}",
+                    response=response,
+                )
+
+            self.breaker.record_failure()
+            if attempt + 1 >= attempts or self.breaker.is_open:
+                raise error
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+            logger.warning(f"{str(error)}; retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client (its session and circuit breaker are shared)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PaystackClient()
+    return _client
+
+
+def reset_client():
+    """Drop the shared client, e.g. after overriding PAYSTACK_* settings in tests."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,156 @@
+# payments/processing.py
+"""
+The one place where a Paystack outcome is applied to our data.
+
+VerifyPaymentView, PaystackCallbackView and the webhook inbox can all learn
+about the same charge at nearly the same time. Each of them calls
+`apply_charge_success()` / `apply_charge_failure()`, which lock the Payment
+row with select_for_update, so the first caller applies the side effects
+(publication moved to review, free reviews granted, user notified) and every
+later caller sees the payment already settled and does nothing.
+
+Webhook deliveries are stored as PaystackEvent rows first (`record_event()`)
+and applied with `process_event()`, either on the background queue or from
+the `replay_paystack_events` command.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.workers import default_queue
+from publications.models import Publication
+from publications.notifications import notify
+
+from .models import Payment, PaystackEvent, Subscription
+
+logger = logging.getLogger(__name__)
+
+# Outcomes returned by apply_charge_success / apply_charge_failure
+SUCCEEDED = 'succeeded'
+ALREADY_SUCCEEDED = 'already_succeeded'
+AMOUNT_MISMATCH = 'amount_mismatch'
+FAILED = 'failed'
+UNCHANGED = 'unchanged'
+
+
+@transaction.atomic
+def apply_charge_success(reference, data):
+    """
+    Settle a charge Paystack reports as successful. `data` is the transaction
+    object from the verify endpoint or the webhook. Returns (payment, outcome).
+    Raises Payment.DoesNotExist for unknown references.
+    """
+    payment = Payment.objects.select_for_update().get(reference=reference)
+    if payment.status == 'success':
+        return payment, ALREADY_SUCCEEDED
+
+    if data.get('amount') != payment.amount * 100:  # Paystack amounts are in kobo
+        logger.error(f"Payment amount mismatch for reference {reference}: expected {payment.amount * 100}, got {data.get('amount')}")
+        payment.status = 'failed'
+        payment.save()
+        return payment, AMOUNT_MISMATCH
+
+    payment.status = 'success'
+    payment.paystack_data = data
+    payment.used = True
+    if isinstance(data.get('metadata'), dict):
+        payment.metadata.update(data['metadata'])
+    payment.save()
+
+    publication = None
+    if payment.publication_id:
+        publication = Publication.objects.select_for_update()\
+            .filter(id=payment.publication_id, author=payment.user).first()
+        if publication is not None:
+            publication.status = 'under_review'
+            publication.save()
+
+        # Grant free reviews for publication_fee
+        if payment.payment_type == 'publication_fee':
+            subscription, _ = Subscription.objects.select_for_update().get_or_create(user=payment.user)
+            if not subscription.free_reviews_granted:
+                subscription.free_reviews_granted = True
+                subscription.save()
+
+    if publication is not None:
+        notify(
+            payment.user_id,
+            f"Payment {payment.reference} successful. Publication {publication.title} is now under review.",
+            publication=publication,
+        )
+    return payment, SUCCEEDED
+
+
+@transaction.atomic
+def apply_charge_failure(reference):
+    """Mark a still-pending payment as failed; settled payments are left alone."""
+    payment = Payment.objects.select_for_update().get(reference=reference)
+    if payment.status != 'pending':
+        return payment, UNCHANGED
+    payment.status = 'failed'
+    payment.save()
+    return payment, FAILED
+
+
+# ── Webhook inbox ─────────────────────────────────────────────
+
+def event_key(body):
+    """Paystack sends no delivery id; the event name plus transaction id (or reference) identifies it."""
+    data = body.get('data') or {}
+    identifier = data.get('id') or data.get('reference') or ''
+    return f"{body.get('event', '')}:{identifier}"
+
+
+def record_event(body):
+    """Store a verified webhook body; returns (event, created)."""
+    data = body.get('data') or {}
+    return PaystackEvent.objects.get_or_create(
+        event_id=event_key(body),
+        defaults={
+            'event': body.get('event') or '',
+            'reference': data.get('reference') or '',
+            'payload': body,
+        },
+    )
+
+
+def enqueue_event(event_pk):
+    transaction.on_commit(lambda: default_queue.submit(process_event, event_pk))
+
+
+def _handle_charge_success(data):
+    apply_charge_success(data.get('reference'), data)
+
+
+EVENT_HANDLERS = {
+    'charge.success': _handle_charge_success,
+}
+
+
+def process_event(event_pk):
+    """Apply a stored event once. Failures are recorded on the row for replay."""
+    try:
+        with transaction.atomic():
+            event = PaystackEvent.objects.select_for_update().get(pk=event_pk)
+            if event.status in ('processed', 'ignored'):
+                return event
+
+            handler = EVENT_HANDLERS.get(event.event)
+            if handler is not None:
+                handler(event.payload.get('data') or {})
+            event.status = 'processed' if handler is not None else 'ignored'
+            event.attempts += 1
+            event.error = ''
+            event.processed_at = timezone.now()
+            event.save()
+            return event
+    except Exception as e:
+        logger.error(f"Failed to process Paystack event {event_pk}: {str(e)}")
+        PaystackEvent.objects.filter(pk=event_pk).update(
+            status='failed',
+            attempts=F('attempts') + 1,
+            error=str(e),
+        )
+        return None
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import StringIO
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from publications.models import Publication
+from .models import Payment, PaystackEvent
+from .paystack import CircuitBreaker, CircuitOpenError, PaystackClient, PaystackError, reset_client
+from .processing import ALREADY_SUCCEEDED, SUCCEEDED, apply_charge_success, process_event, record_event
+from .utils import paid_publication_ids
+
+
+class StubPaystackHandler(BaseHTTPRequestHandler):
+    """Replies with the next scripted (status, body) pair and records each request."""
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.server.requests.append((self.command, self.path, self.rfile.read(length)))
+        status, body = self.server.responses.pop(0)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = handle_request
+
+    def log_message(self, *args):
+        pass
+
+
+class StubPaystackMixin:
+    def start_stub_server(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPaystackHandler)
+        self.server.requests = []
+        self.server.responses = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+
+class PaystackClientTests(StubPaystackMixin, SimpleTestCase):
+    def setUp(self):
+        self.start_stub_server()
+
+    def paystack(self, **kwargs):
+        client = PaystackClient(
+            secret_key="sk_test",
+            base_url=f"http://127.0.0.1:{self.server.server_port}",
+            timeout=(1, 1),
+            backoff=0,
+            **kwargs,
+        )
+        self.addCleanup(client.close)
+        return client
+
+    def test_verify_retries_gateway_errors(self):
+        self.server.responses = [
+            (503, {"status": False}),
+            (200, {"status": True, "data": {"status": "success", "amount": 300000}}),
+        ]
+        data = self.paystack(max_retries=2).verify_transaction("ref/1")
+        self.assertEqual(data["data"]["amount"], 300000)
+        self.assertEqual([r[1] for r in self.server.requests], ["/transaction/verify/ref%2F1"] * 2)
+
+    def test_initialize_is_not_retried(self):
+        self.server.responses = [(502, {"status": False})]
+        with self.assertRaises(PaystackError):
+            self.paystack(max_retries=2).initialize_transaction({"amount": 100, "email": "a@b.c"})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_client_errors_are_raised_without_retry(self):
+        self.server.responses = [(400, {"status": False, "message": "Transaction reference not found"})]
+        with self.assertRaises(PaystackError) as ctx:
+            self.paystack(max_retries=2).verify_transaction("missing")
+        self.assertEqual(ctx.exception.response.status_code, 400)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        self.server.responses = [(500, {"status": False})] * 2
+        client = self.paystack(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with self.assertRaises(PaystackError):
+                client.verify_transaction("ref")
+        with self.assertRaises(CircuitOpenError):
+            client.verify_transaction("ref")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_every_trial_outcome_is_recorded(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client = self.paystack(max_retries=2, breaker=breaker)
+        for error in (requests.exceptions.ChunkedEncodingError("cut off"), RuntimeError("bug")):
+            with self.subTest(error=type(error).__name__):
+                breaker.record_failure()
+                with mock.patch.object(client.session, "request", side_effect=error) as sent:
+                    with self.assertRaises((PaystackError, RuntimeError)):
+                        client.verify_transaction("ref")
+                # Not retried, and the next call is allowed through as a new trial
+                self.assertEqual(sent.call_count, 1)
+                self.assertTrue(breaker.allow())
+                breaker.end_trial()
+
+        self.server.responses = [(200, {"status": True, "data": {}})]
+        client.verify_transaction("ref")
+        self.assertFalse(breaker.is_open)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class PaymentProcessingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="payer@example.org",
+            password="Secret#123",
+            agreement=True,
+            full_name="Paying Author",
+        )
+        self.publication = Publication.objects.create(
+            title="Paid publication",
+            abstract="a" * 250,
+            author=self.user,
+            status="rejected",
+        )
+        Payment.objects.create(
+            user=self.user,
+            reference="ref-1",
+            payment_type="review_fee",
+            amount=3000,
+            metadata={"publication_id": self.publication.pk},
+        )
+        self.charge = {"id": 1, "reference": "ref-1", "amount": 300000, "status": "success"}
+
+    def test_charge_is_applied_once(self):
+        _, first = apply_charge_success("ref-1", self.charge)
+        _, second = apply_charge_success("ref-1", self.charge)
+        self.assertEqual((first, second), (SUCCEEDED, ALREADY_SUCCEEDED))
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.status, "under_review")
+
+    def test_redelivered_webhook_is_stored_once(self):
+        body = {"event": "charge.success", "data": self.charge}
+        event, created = record_event(body)
+        _, created_again = record_event(body)
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+
+        process_event(event.pk)
+        process_event(event.pk)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ("processed", 1))
+        self.assertEqual(PaystackEvent.objects.count(), 1)
+
+
+class PaidPublicationCacheTests(TestCase):
+    """A user's paid set is cached only in a shared cache, and dropped when their payments commit."""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        shared = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.user = User.objects.create_user(
+            email="cached-payer@example.org", password="Secret#123", agreement=True, full_name="Cached Payer"
+        )
+        self.publication = Publication.objects.create(title="Paid later", abstract="a" * 250, author=self.user)
+
+    def pay(self):
+        return Payment.objects.create(
+            user=self.user, reference="ref-cached", payment_type="review_fee", amount=3000,
+            status="success", publication=self.publication,
+        )
+
+    def test_cached_miss_becomes_a_hit_once_the_payment_commits(self):
+        self.assertEqual(paid_publication_ids(self.user), set())
+        with self.assertNumQueries(0):
+            self.assertEqual(paid_publication_ids(self.user), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pay()
+        self.assertEqual(paid_publication_ids(self.user, [self.publication.pk]), {self.publication.pk})
+
+    def test_rolled_back_payment_keeps_the_cached_set(self):
+        paid_publication_ids(self.user)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.pay()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.assertEqual(paid_publication_ids(self.user), set())
+
+    def test_per_process_cache_is_not_used(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            paid_publication_ids(self.user)
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.pay()
+            self.assertEqual(callbacks, [])
+            with self.assertNumQueries(1):
+                self.assertEqual(paid_publication_ids(self.user), {self.publication.pk})
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, PAYSTACK_RETRY_BACKOFF=0, PAYMENT_PENDING_EXPIRY_HOURS=24)
+class ReconcilePaymentsTests(StubPaystackMixin, TestCase):
+    def setUp(self):
+        self.start_stub_server()
+        self.user = User.objects.create_user(
+            email="reconcile@example.org",
+            password="Secret#123",
+            agreement=True,
+            full_name="Pending Payer",
+        )
+        for reference in ["paid", "declined", "abandoned"]:
+            Payment.objects.create(user=self.user, reference=reference, payment_type="review_fee", amount=3000)
+        Payment.objects.create(
+            user=self.user,
+            reference="stale",
+            payment_type="review_fee",
+            amount=3000,
+            created_at=timezone.now() - timedelta(days=2),
+        )
+
+    def test_settles_fails_and_expires_pending_payments(self):
+        self.server.responses = [
+            (200, {
+                "status": True,
+                "data": [
+                    {"reference": "someone-else", "status": "success", "amount": 100},
+                    {"reference": "paid", "status": "success", "amount": 300000},
+                ],
+                "meta": {"page": 1, "pageCount": 2},
+            }),
+            (200, {
+                "status": True,
+                "data": [
+                    {"reference": "declined", "status": "failed", "amount": 300000},
+                    {"reference": "abandoned", "status": "abandoned", "amount": 300000},
+                ],
+                "meta": {"page": 2, "pageCount": 2},
+            }),
+        ]
+        with self.settings(PAYSTACK_BASE_URL=f"http://127.0.0.1:{self.server.server_port}"):
+            reset_client()
+            self.addCleanup(reset_client)
+            call_command("reconcile_payments", stdout=StringIO())
+
+        statuses = dict(Payment.objects.values_list("reference", "status"))
+        self.assertEqual(statuses, {
+            "paid": "success",
+            "declined": "failed",
+            "abandoned": "pending",
+            "stale": "expired",
+        })
+        self.assertEqual(len(self.server.requests), 2)
@@ -1,16 +1,68 @@
 # payments/utils.py (new file - add this for potential use, though not directly used in payments views; useful if integrating with publications)
-import requests
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from config.caching import is_shared
+
+from .models import Payment
+from .paystack import PaystackError, get_client
 
 def verify_paystack_payment(reference, expected_amount):
-    url = f"https://api.paystack.co/transaction/verify/{reference}"
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        resp_data = response.json()
-        if resp_data['status'] and resp_data['data']['status'] == 'success' and resp_data['data']['amount'] == expected_amount * 100:
-            return True, resp_data['data']
-    return False, None
\ No newline at end of file
+    try:
+        resp_data = get_client().verify_transaction(reference)
+    except PaystackError:
+        return False, None
+    if resp_data['status'] and resp_data['data']['status'] == 'success' and resp_data['data']['amount'] == expected_amount * 100:
+        return True, resp_data['data']
+    return False, None
+
+
+def _paid_cache_key(user_id, payment_type):
+    return f"payments:paid-publications:{user_id}:{payment_type}"
+
+
+def _load_paid(user, payment_type):
+    return set(
+        Payment.objects.filter(
+            user=user,
+            payment_type=payment_type,
+            status='success',
+            publication__isnull=False,
+        ).values_list('publication_id', flat=True)
+    )
+
+
+def paid_publication_ids(user, publication_ids=None, payment_type='review_fee'):
+    """
+    Ids of the publications `user` has a successful `payment_type` payment for,
+    optionally restricted to `publication_ids`. With a cache shared by all
+    workers (config/caching.py) the user's full set is cached and dropped by
+    invalidate_paid_publications() whenever one of their payments changes;
+    otherwise every call is one indexed query, as the drop would only reach
+    the worker that handled the payment.
+    """
+    if not user or not user.is_authenticated:
+        return set()
+    if not is_shared():
+        paid = _load_paid(user, payment_type)
+    else:
+        key = _paid_cache_key(user.pk, payment_type)
+        paid = cache.get(key)
+        if paid is None:
+            paid = _load_paid(user, payment_type)
+            cache.set(key, paid, getattr(settings, 'PAID_PUBLICATIONS_CACHE_TTL', 300))
+    if publication_ids is None:
+        return paid
+    return paid.intersection(str(pk) for pk in publication_ids)
+
+
+def invalidate_paid_publications(user_id):
+    """
+    Drop the user's cached sets once the current transaction commits; dropped
+    earlier, a request could cache the set again from before the change.
+    """
+    if not is_shared():
+        return
+    keys = [_paid_cache_key(user_id, fee) for fee, _ in Payment._meta.get_field('payment_type').choices]
+    transaction.on_commit(lambda: cache.delete_many(keys))
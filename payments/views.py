@@ -7,9 +7,13 @@ from rest_framework.response import Response
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.db import transaction
 from .models import Payment, Subscription
+from .paystack import get_client
+from .processing import AMOUNT_MISMATCH, apply_charge_failure, apply_charge_success, enqueue_event, record_event
 from .serializers import PaymentSerializer, InitializePaymentSerializer, SubscriptionSerializer, RequestRefundSerializer
-from publications.models import Publication, Notification
+from publications.models import Publication
+from publications.notifications import notify_editors
 from rest_framework.permissions import AllowAny
 import requests
 import logging
@@ -65,19 +69,8 @@ class InitializePublicationPaymentView(APIView):
             "metadata": {"publication_id": publication_id} if publication_id else {}
         }
 
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            response = requests.post(
-                "https://api.paystack.co/transaction/initialize",
-                json=payload,
-                headers=headers
-            )
-            response.raise_for_status()
-            resp_data = response.json()
+            resp_data = get_client().initialize_transaction(payload)
 
             if resp_data.get('status'):
                 # Create Payment record
@@ -120,58 +113,23 @@ class VerifyPaymentView(APIView):
         if payment.status == 'success':
             return Response({"detail": "Payment already verified."}, status=status.HTTP_400_BAD_REQUEST)
 
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            response = requests.get(
-                f"https://api.paystack.co/transaction/verify/{reference}",
-                headers=headers
-            )
-            response.raise_for_status()
-            resp_data = response.json()
+            resp_data = get_client().verify_transaction(reference)
 
             if resp_data['status'] and resp_data['data']['status'] == 'success':
-                expected_amount = payment.amount * 100  # Convert to kobo
-                if resp_data['data']['amount'] == expected_amount:
-                    payment.status = 'success'
-                    payment.paystack_data = resp_data['data']
-                    payment.used = True  # Mark payment as used
-                    payment.save()
-
-                    # Handle publication status update
-                    if payment.metadata.get('publication_id'):
-                        publication = get_object_or_404(
-                            Publication,
-                            id=payment.metadata['publication_id'],
-                            author=request.user
-                        )
-                        publication.status = 'under_review'
-                        publication.save()
-
-                        # For publication_fee, grant free reviews
-                        if payment.payment_type == 'publication_fee':
-                            subscription, _ = Subscription.objects.get_or_create(user=request.user)
-                            if not subscription.free_reviews_granted:
-                                subscription.free_reviews_granted = True
-                                subscription.save()
-
-                    return Response({
-                        "detail": "Payment verified successfully.",
-                        "payment": PaymentSerializer(payment).data
-                    }, status=status.HTTP_200_OK)
-                else:
-                    payment.status = 'failed'
-                    payment.save()
+                # Shared with the callback and webhook; the row lock makes it apply once
+                payment, outcome = apply_charge_success(reference, resp_data['data'])
+                if outcome == AMOUNT_MISMATCH:
                     return Response(
                         {"detail": "Payment amount mismatch."},
                         status=status.HTTP_400_BAD_REQUEST
                     )
+                return Response({
+                    "detail": "Payment verified successfully.",
+                    "payment": PaymentSerializer(payment).data
+                }, status=status.HTTP_200_OK)
             else:
-                payment.status = 'failed'
-                payment.save()
+                apply_charge_failure(reference)
                 return Response(
                     {"detail": "Payment verification failed."},
                     status=status.HTTP_400_BAD_REQUEST
@@ -206,37 +164,12 @@ class PaystackWebhookView(APIView):
             logger.error("Invalid Paystack signature.")
             return Response({"detail": "Invalid signature."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Process webhook event
-        event = request.data.get('event')
-        data = request.data.get('data')
-
-        if event == 'charge.success':
-            reference = data.get('reference')
-            payment = get_object_or_404(Payment, reference=reference)
-            if payment.status != 'success':
-                expected_amount = payment.amount * 100  # Convert to kobo
-                if data['amount'] == expected_amount:
-                    payment.status = 'success'
-                    payment.paystack_data = data
-                    payment.used = True
-                    payment.save()
-
-                    # Update publication status
-                    if payment.metadata.get('publication_id'):
-                        publication = get_object_or_404(
-                            Publication,
-                            id=payment.metadata['publication_id'],
-                            author=payment.user
-                        )
-                        publication.status = 'under_review'
-                        publication.save()
-
-                        # Grant free reviews for publication_fee
-                        if payment.payment_type == 'publication_fee':
-                            subscription, _ = Subscription.objects.get_or_create(user=payment.user)
-                            if not subscription.free_reviews_granted:
-                                subscription.free_reviews_granted = True
-                                subscription.save()
+        # Store the event and acknowledge right away; it is applied off the request
+        # thread, and redeliveries of an already stored event are not queued twice
+        with transaction.atomic():
+            event, created = record_event(request.data)
+            if created or event.status == 'failed':
+                enqueue_event(event.pk)
 
         return Response({"status": "success"}, status=status.HTTP_200_OK)
 
@@ -246,15 +179,8 @@ class PaystackCallbackView(APIView):
     permission_classes = []  # Public endpoint
 
     def verify_payment(self, reference):
-        url = f"https://api.paystack.co/transaction/verify/{reference}"
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json",
-        }
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+            return get_client().verify_transaction(reference)
         except requests.RequestException as e:
             logger.error(f"Paystack verification failed: {str(e)}")
             return {"status": False, "message": str(e)}
@@ -270,35 +196,20 @@ class PaystackCallbackView(APIView):
             payment_data = self.verify_payment(reference)
             
             if payment_data.get('status') is True and payment_data.get('data', {}).get('status') == 'success':
-                expected_amount = payment.amount * 100  # Convert to kobo
-                if payment_data['data']['amount'] == expected_amount:
-                    payment.status = 'success'
-                    publication = Publication.objects.get(id=payment.metadata['publication_id'])
-                    publication.status = 'under_review'
-                    publication.save()
-                    payment.metadata.update(payment_data.get('data', {}).get('metadata', {}))
-                    payment.save()
-                    Notification.objects.create(
-                        user=payment.user,
-                        message=f"Payment {payment.reference} successful. Publication {publication.title} is now under review.",
-                        related_publication=publication
-                    )
-                    return Response(
-                        {
-                            "detail": "Payment verified successfully.",
-                            "payment": PaymentSerializer(payment).data,
-                            "redirect_url": f"/publications/{publication.id}"
-                        },
-                        status=status.HTTP_200_OK
-                    )
-                else:
-                    payment.status = 'failed'
-                    payment.save()
-                    logger.error(f"Payment amount mismatch for reference {reference}: expected {expected_amount}, got {payment_data['data']['amount']}")
+                payment, outcome = apply_charge_success(reference, payment_data['data'])
+                if outcome == AMOUNT_MISMATCH:
                     return Response({"detail": "Payment amount mismatch."}, status=status.HTTP_400_BAD_REQUEST)
+                publication_id = payment.publication_id
+                return Response(
+                    {
+                        "detail": "Payment verified successfully.",
+                        "payment": PaymentSerializer(payment).data,
+                        "redirect_url": f"/publications/{publication_id}"
+                    },
+                    status=status.HTTP_200_OK
+                )
             else:
-                payment.status = 'failed'
-                payment.save()
+                apply_charge_failure(reference)
                 logger.error(f"Payment verification failed for reference {reference}: {payment_data.get('message')}")
                 return Response({"detail": "Payment verification failed."}, status=status.HTTP_400_BAD_REQUEST)
         except Payment.DoesNotExist:
@@ -327,13 +238,10 @@ class RequestRefundView(APIView):
         payment.save()
 
         # Notify editors
-        editors = User.objects.filter(role='editor')
-        for editor in editors:
-            Notification.objects.create(
-                user=editor,
-                message=f"Refund requested for payment {reference} by {request.user.full_name} at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}.",
-                related_publication_id=payment.metadata.get('publication_id')
-            )
+        notify_editors(
+            f"Refund requested for payment {reference} by {request.user.full_name} at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}.",
+            publication=payment.publication_id,
+        )
 
         return Response(
             {"detail": "Refund request submitted successfully."},
@@ -372,8 +280,8 @@ class PaymentSuccessRedirectView(APIView):
             return Response({"detail": "Reference is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         payment = get_object_or_404(Payment, reference=reference, user=request.user)
-        if payment.status == 'success' and payment.metadata.get('publication_id'):
-            redirect_url = reverse('publication-detail', kwargs={'pk': payment.metadata['publication_id']})
+        if payment.status == 'success' and payment.publication_id:
+            redirect_url = reverse('publication-detail', kwargs={'pk': payment.publication_id})
             return Response({"redirect_url": redirect_url}, status=status.HTTP_200_OK)
         return Response({"detail": "Invalid payment or publication."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -404,19 +312,8 @@ class InitializePublicationPaymentWithOverrideView(APIView):
             "metadata": {"publication_id": publication_id} if publication_id else {}
         }
 
-        headers = {
-            "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            response = requests.post(
-                "https://api.paystack.co/transaction/initialize",
-                json=payload,
-                headers=headers
-            )
-            response.raise_for_status()
-            resp_data = response.json()
+            resp_data = get_client().initialize_transaction(payload)
 
             if resp_data.get('status'):
                 payment = Payment.objects.create(
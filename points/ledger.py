@@ -0,0 +1,84 @@
+# points/ledger.py
+"""
+Points ledger.
+
+PointReward rows can be created, edited and deleted, so "how many points has
+this publication received?" used to be a SUM over all of its rewards. Every
+change to a reward now appends a PointLedgerEntry with the difference and
+moves two running totals in the same transaction:
+
+    PublicationPointBalance - points received on one publication
+    UserPointBalance        - points received on all of an author's publications
+
+Reads such as reward qualification are a primary-key lookup on a balance
+row. `rebuild_point_balances` checks the ledger against the rewards and the
+balances against the ledger, and reports (and repairs) any drift.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from publications import leaderboard
+from publications.models import Publication
+from .models import PointLedgerEntry, PublicationPointBalance, UserPointBalance
+
+logger = logging.getLogger(__name__)
+
+
+def _add(model, pk, delta):
+    rows = model.objects.filter(pk=pk)
+    if rows.update(total=F("total") + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(pk=pk, total=delta)
+    except IntegrityError:
+        # Created concurrently; it exists now
+        rows.update(total=F("total") + delta)
+
+
+def post(publication_id, recipient_id, delta, reason, reward_id=None):
+    """Append a ledger entry and move both balances by `delta`. Call inside a transaction."""
+    if not delta:
+        return None
+    entry = PointLedgerEntry.objects.create(
+        publication_id=publication_id,
+        recipient_id=recipient_id,
+        reward_id=reward_id,
+        delta=delta,
+        reason=reason,
+    )
+    _add(PublicationPointBalance, publication_id, delta)
+    _add(UserPointBalance, recipient_id, delta)
+    leaderboard.mark_stale("points")
+    return entry
+
+
+def record(reward, delta, reason):
+    """Post a change of `delta` points on `reward` to its publication's author."""
+    if not delta:
+        return None
+    recipient_id = Publication.objects.filter(pk=reward.publication_id).values_list("author_id", flat=True).first()
+    if recipient_id is None:
+        logger.warning(f"Not posting {delta} points for reward {reward.pk}: publication {reward.publication_id} is gone")
+        return None
+    return post(reward.publication_id, recipient_id, delta, reason, reward_id=reward.pk)
+
+
+def forget_publication(publication_id):
+    """Take a deleted publication's points off its authors' balances; its own ledger rows cascade away."""
+    totals = PointLedgerEntry.objects.filter(publication_id=publication_id)\
+        .values("recipient_id").annotate(points=Sum("delta")).values_list("recipient_id", "points").order_by()
+    for recipient_id, points in totals:
+        if points:
+            UserPointBalance.objects.filter(pk=recipient_id).update(total=F("total") - points)
+            leaderboard.mark_stale("points")
+
+
+def publication_points(publication_id):
+    return PublicationPointBalance.objects.filter(pk=publication_id).values_list("total", flat=True).first() or 0
+
+
+def user_points(user_id):
+    return UserPointBalance.objects.filter(pk=user_id).values_list("total", flat=True).first() or 0
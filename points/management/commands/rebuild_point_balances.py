@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from points import ledger
+from points.models import PointLedgerEntry, PointReward, PublicationPointBalance, UserPointBalance
+from publications.models import Publication
+
+
+def _sums(queryset, key, field):
+    return dict(queryset.order_by().values_list(key).annotate(total=Sum(field)).values_list(key, "total"))
+
+
+def _drift(model, expected):
+    """[(pk, stored, expected)] for balance rows that differ from `expected` (missing rows count as 0)."""
+    stored = dict(model.objects.values_list("pk", "total"))
+    return [
+        (pk, stored.get(pk, 0), expected.get(pk, 0))
+        for pk in sorted(set(stored) | set(expected), key=str)
+        if stored.get(pk, 0) != expected.get(pk, 0)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Check the points ledger against PointReward rows and the balances against the ledger, and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drift, do not post reconciliation entries or fix balances.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        with transaction.atomic():
+            # 1. Rewards changed without going through PointReward.save()/delete() (e.g. queryset.update())
+            rewarded = _sums(PointReward.objects.all(), "publication_id", "points")
+            posted = _sums(PointLedgerEntry.objects.all(), "publication_id", "delta")
+            missing = {
+                pk: rewarded.get(pk, 0) - posted.get(pk, 0)
+                for pk in set(rewarded) | set(posted)
+                if rewarded.get(pk, 0) != posted.get(pk, 0)
+            }
+            authors = dict(Publication.objects.filter(pk__in=missing).values_list("pk", "author_id"))
+            for pk, delta in missing.items():
+                self.stdout.write(f"ledger {pk}: {posted.get(pk, 0)} -> {rewarded.get(pk, 0)}")
+                if not dry_run:
+                    ledger.post(pk, authors[pk], delta, "reconcile")
+
+            # 2. Balances against the ledger
+            drifted = 0
+            for model, key in ((PublicationPointBalance, "publication_id"), (UserPointBalance, "recipient_id")):
+                expected = _sums(PointLedgerEntry.objects.all(), key, "delta")
+                for pk, stored, actual in _drift(model, expected):
+                    drifted += 1
+                    self.stdout.write(f"{model.__name__} {pk}: {stored} -> {actual}")
+                    if not dry_run:
+                        model.objects.update_or_create(pk=pk, defaults={"total": actual})
+
+            if dry_run:
+                self.stdout.write(
+                    f"{len(missing)} publications missing ledger entries, {drifted} balances drifted "
+                    "(dry run, nothing changed)."
+                )
+                return
+        self.stdout.write(self.style.SUCCESS(
+            f"Posted {len(missing)} reconciliation entries and fixed {drifted} balances."
+        ))
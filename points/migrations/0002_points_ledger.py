@@ -0,0 +1,89 @@
+# Generated by Django 5.2 on 2026-10-17 06:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    PointReward = apps.get_model('points', 'PointReward')
+    PointLedgerEntry = apps.get_model('points', 'PointLedgerEntry')
+    PublicationPointBalance = apps.get_model('points', 'PublicationPointBalance')
+    UserPointBalance = apps.get_model('points', 'UserPointBalance')
+
+    rewards = PointReward.objects.exclude(points=0).values_list(
+        'id', 'publication_id', 'publication__author_id', 'points', 'created_at'
+    ).iterator()
+    PointLedgerEntry.objects.bulk_create(
+        (
+            PointLedgerEntry(
+                publication_id=publication_id, recipient_id=author_id, reward_id=reward_id,
+                delta=points, reason='award', created_at=created_at,
+            )
+            for reward_id, publication_id, author_id, points, created_at in rewards
+        ),
+        batch_size=500,
+    )
+    entries = PointLedgerEntry.objects.order_by()
+    PublicationPointBalance.objects.bulk_create(
+        [
+            PublicationPointBalance(publication_id=row['publication_id'], total=row['total'])
+            for row in entries.values('publication_id').annotate(total=Sum('delta'))
+        ],
+        batch_size=500,
+    )
+    UserPointBalance.objects.bulk_create(
+        [
+            UserPointBalance(user_id=row['recipient_id'], total=row['total'])
+            for row in entries.values('recipient_id').annotate(total=Sum('delta'))
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('points', '0001_initial'),
+        ('publications', '0021_publication_downloads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationPointBalance',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='point_balance', serialize=False, to='publications.publication')),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserPointBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='point_balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total'], name='user_points_rank_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PointLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reward_id', models.UUIDField(blank=True, null=True)),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('award', 'Award'), ('adjust', 'Adjustment'), ('revoke', 'Revoked'), ('reconcile', 'Reconciliation')], max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('publication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_ledger', to='publications.publication')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['publication', 'created_at'], name='points_poin_publica_6072c8_idx'), models.Index(fields=['recipient', 'created_at'], name='points_poin_recipie_83d9b6_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
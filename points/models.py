@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from comments.models import Comment
 from publications.models import Publication
@@ -13,4 +13,71 @@ class PointReward(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
-        return f"{self.points} points awarded to {self.publication.title[:30]}"
\ No newline at end of file
+        return f"{self.points} points awarded to {self.publication.title[:30]}"
+
+    def save(self, *args, **kwargs):
+        """Save and post the change in points to the ledger in the same transaction (points/ledger.py)."""
+        from .ledger import record
+
+        with transaction.atomic():
+            if self._state.adding:
+                previous, reason = 0, "award"
+            else:
+                # Lock the row so concurrent edits each post the difference to what they replaced
+                previous = PointReward.objects.select_for_update().filter(pk=self.pk)\
+                    .values_list("points", flat=True).first()
+                reason = "adjust" if previous is not None else "award"
+            super().save(*args, **kwargs)
+            record(self, self.points - (previous or 0), reason)
+
+
+class PointLedgerEntry(models.Model):
+    """
+    Append-only history of point changes. Every PointReward create, update and
+    delete adds an entry; balances below are the running sums of these.
+    """
+    REASON_CHOICES = [
+        ("award", "Award"),
+        ("adjust", "Adjustment"),
+        ("revoke", "Revoked"),
+        ("reconcile", "Reconciliation"),
+    ]
+
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name="point_ledger")
+    # Author of the publication when the entry was posted
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="point_ledger")
+    reward_id = models.UUIDField(null=True, blank=True)  # the PointReward, which may since be deleted
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["publication", "created_at"]),
+            models.Index(fields=["recipient", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.delta:+} points ({self.reason}) on publication {self.publication_id}"
+
+
+class PublicationPointBalance(models.Model):
+    publication = models.OneToOneField(
+        Publication, on_delete=models.CASCADE, primary_key=True, related_name="point_balance"
+    )
+    total = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.total} points on publication {self.publication_id}"
+
+
+class UserPointBalance(models.Model):
+    """Points received on all of a user's publications."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="point_balance")
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["-total"], name="user_points_rank_idx")]
+
+    def __str__(self):
+        return f"{self.total} points for user {self.user_id}"
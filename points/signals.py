@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from comments.models import Comment
+from publications.models import Publication
 from .models import PointReward
+from . import ledger
 from django.utils import timezone
 
 @receiver(post_save, sender=Comment)
@@ -19,4 +22,18 @@ def award_points_on_comment(sender, instance, created, **kwargs):
                 comment=instance,
                 awarded_by=instance.author,
                 points=5
-            )
\ No newline at end of file
+            )
+
+
+@receiver(post_delete, sender=PointReward)
+def revoke_points(sender, instance, origin=None, **kwargs):
+    # Runs inside the delete's transaction. Rewards removed along with their
+    # publication are not revoked one by one: forget_publication() settles those.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is None or origin_model is PointReward:
+        ledger.record(instance, -instance.points, "revoke")
+
+
+@receiver(pre_delete, sender=Publication)
+def forget_publication_points(sender, instance, **kwargs):
+    ledger.forget_publication(instance.pk)
@@ -1,3 +1,100 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from publications.models import Publication
+from rewardcode.views import RewardCodeListCreateView
+from .ledger import publication_points, user_points
+from .models import PointLedgerEntry, PointReward, UserPointBalance
+
+
+class PointsLedgerTests(TestCase):
+    """PointReward changes are posted to an append-only ledger with running balances."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="author@example.org", password="Secret#123", agreement=True, full_name="Ann Author"
+        )
+        self.reader = User.objects.create_user(
+            email="reader@example.org", password="Secret#123", agreement=True, full_name="Rea Der"
+        )
+        self.publications = [
+            Publication.objects.create(title=f"Paper {i}", abstract="a" * 250, author=self.author, status="approved")
+            for i in range(2)
+        ]
+
+    def reward(self, publication, points):
+        return PointReward.objects.create(publication=publication, awarded_by=self.reader, points=points)
+
+    def test_create_update_delete_move_balances(self):
+        first, second = self.publications
+        reward = self.reward(first, 10)
+        self.reward(second, 5)
+        self.assertEqual(publication_points(first.pk), 10)
+        self.assertEqual(user_points(self.author.pk), 15)
+
+        reward.points = 20
+        reward.save()
+        self.assertEqual(publication_points(first.pk), 20)
+
+        reward.delete()
+        self.assertEqual(publication_points(first.pk), 0)
+        self.assertEqual(user_points(self.author.pk), 5)
+        self.assertEqual(
+            list(PointLedgerEntry.objects.filter(publication=first).order_by("id").values_list("reason", "delta")),
+            [("award", 10), ("adjust", 10), ("revoke", -20)],
+        )
+
+        # Deleting a publication takes its points off the author's balance
+        second.delete()
+        self.assertEqual(user_points(self.author.pk), 0)
+
+    def test_qualification_reads_the_balance(self):
+        publication = self.publications[0]
+        self.reward(publication, 25)
+        view = RewardCodeListCreateView()
+        view.request = type("Request", (), {"query_params": {"publication_id": str(publication.pk)}})()
+        with self.assertNumQueries(2):
+            self.assertTrue(view.is_qualified(self.author))
+
+    def test_rebuild_point_balances_reports_and_fixes_drift(self):
+        publication = self.publications[0]
+        self.reward(publication, 10)
+        # Bypasses the ledger
+        PointReward.objects.filter(publication=publication).update(points=12)
+        UserPointBalance.objects.filter(pk=self.author.pk).update(total=99)
+
+        out = StringIO()
+        call_command("rebuild_point_balances", "--dry-run", stdout=out)
+        self.assertIn(f"ledger {publication.pk}: 10 -> 12", out.getvalue())
+        self.assertEqual(user_points(self.author.pk), 99)
+
+        call_command("rebuild_point_balances", stdout=StringIO())
+        self.assertEqual(publication_points(publication.pk), 12)
+        self.assertEqual(user_points(self.author.pk), 12)
+
+        out = StringIO()
+        call_command("rebuild_point_balances", "--dry-run", stdout=out)
+        self.assertIn("0 publications missing ledger entries, 0 balances drifted", out.getvalue())
+
+    def test_reward_list_is_paginated(self):
+        publication = self.publications[0]
+        for points in range(1, 9):
+            self.reward(publication, points)
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        url = f"/api/publications/{publication.pk}/pointrewards/"
+
+        response = client.get(url)
+        self.assertEqual(response.data["count"], 8)
+        self.assertEqual([r["points"] for r in response.data["results"]], [1, 2, 3, 4, 5, 6])
+        response = client.get(response.data["next"])
+        self.assertEqual([r["points"] for r in response.data["results"]], [7, 8])
 
-# Create your tests here.
+        response = client.get(url, {"pagination": "cursor"})
+        self.assertEqual(len(response.data["results"]), 6)
+        response = client.get(response.data["next"])
+        self.assertEqual([r["points"] for r in response.data["results"]], [7, 8])
@@ -4,15 +4,20 @@ from django.shortcuts import get_object_or_404
 from .models import PointReward
 from .serializers import PointRewardSerializer
 from publications.models import Publication
+from publications.pagination import KeysetPaginationMixin, StandardResultsPagination
 
-class PointRewardListCreateView(generics.ListCreateAPIView):
+class PointRewardListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
+    """Pages of rewards by page number by default; keyset pages with ?pagination=cursor."""
     serializer_class = PointRewardSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination to return all comments
+    pagination_class = StandardResultsPagination
+    keyset_ordering = ("created_at", "id")
 
     def get_queryset(self):
         publication_id = self.kwargs["pk"]
-        return PointReward.objects.filter(publication__id=publication_id).order_by("created_at")
+        return PointReward.objects.filter(
+            publication__id=publication_id
+        ).select_related("awarded_by").order_by("created_at")
 
 
     def perform_create(self, serializer):
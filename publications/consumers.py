@@ -0,0 +1,42 @@
+# publications/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .notifications import unread_count
+from .realtime import group_name
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    ws/notifications/ - streams the authenticated user's new notifications and
+    unread-count changes (payloads are documented in publications/realtime.py).
+    On connect the current unread count is sent once so the badge is correct
+    without an extra HTTP request.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group = group_name(user.pk)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        await self.send_json({'type': 'unread.changed', 'unread_count': await self.get_unread_count(user)})
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Clients only listen; a ping keeps idle proxies from dropping the socket
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def notification_event(self, event):
+        await self.send_json(event['payload'])
+
+    @database_sync_to_async
+    def get_unread_count(self, user):
+        return unread_count(user.pk)
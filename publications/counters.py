@@ -0,0 +1,128 @@
+# publications/counters.py
+"""
+Write-behind counters.
+
+Hot counters such as Publication.views used to be bumped with a full
+instance.save() on every request. A BufferedCounter keeps the increments in
+process memory and periodically writes the aggregated deltas back with a
+single UPDATE ... SET field = field + CASE pk WHEN ... END statement.
+
+Buffered deltas are flushed:
+    * every `interval` seconds by a daemon thread,
+    * as soon as `max_pending` distinct rows are waiting,
+    * at interpreter exit (clean gunicorn/uvicorn worker shutdown).
+
+An interval of 0 (the `interval` argument, else settings.COUNTER_FLUSH_INTERVAL)
+disables buffering and writes every increment straight away; tests that read
+the counters back from the database override the setting to 0.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, When, Value, F, IntegerField
+
+from .models import Publication
+from . import leaderboard
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCounter:
+    def __init__(self, model, field, interval=None, max_pending=1000, on_flush=None):
+        self.model = model
+        self.field = field
+        self._interval = interval
+        self.max_pending = max_pending
+        # Optional callback(deltas) run after each successful flush
+        self.on_flush = on_flush
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        atexit.register(self.flush)
+
+    @property
+    def interval(self):
+        if self._interval is not None:
+            return self._interval
+        return getattr(settings, "COUNTER_FLUSH_INTERVAL", 10)
+
+    def increment(self, pk, amount=1):
+        if self.interval <= 0:
+            self._write({pk: amount})
+            return
+
+        with self._lock:
+            self._pending[pk] += amount
+            should_flush = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if should_flush:
+            self.flush()
+
+    def pending(self, pk):
+        """Increments for `pk` that have not been written yet."""
+        with self._lock:
+            return self._pending.get(pk, 0)
+
+    def flush(self):
+        with self._lock:
+            deltas, self._pending = dict(self._pending), defaultdict(int)
+        if not deltas:
+            return 0
+
+        try:
+            return self._write(deltas)
+        except Exception as e:
+            logger.error(f"Failed to flush {self.model.__name__}.{self.field} counters: {str(e)}")
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for pk, amount in deltas.items():
+                    self._pending[pk] += amount
+            return 0
+
+    def _write(self, deltas):
+        updated = self.model.objects.filter(pk__in=list(deltas)).update(**{
+            self.field: F(self.field) + Case(
+                *[When(pk=pk, then=Value(amount)) for pk, amount in deltas.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        })
+        if self.on_flush:
+            self.on_flush(deltas)
+        return updated
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(), so each worker process starts its own flusher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"{self.model.__name__}.{self.field}-counter",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+            close_old_connections()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+publication_views = BufferedCounter(Publication, "views", on_flush=lambda deltas: leaderboard.mark_stale("views"))
+publication_downloads = BufferedCounter(Publication, "downloads")
@@ -0,0 +1,281 @@
+# publications/direct_uploads.py
+"""
+Direct-to-storage uploads.
+
+Instead of streaming files through the web workers, a client asks for an
+upload ticket, sends the file straight to storage with the signed fields it
+gets back, and then confirms the ticket:
+
+    POST /api/uploads/tickets/                  {target: "publication.file", object_id, filename, size}
+      -> {id, key, expires_at, upload: {url, method, file_field, fields}}
+    POST <upload.url>                           multipart: upload.fields + the file under upload.file_field
+    POST /api/uploads/tickets/<id>/confirm/     verify the stored object and attach it
+
+Targets ("publication.file", "comment.audio", ...) are registered with
+`register_target()` together with the check deciding who may attach to an
+object; size and type limits come from publications.uploads.UPLOAD_RULES.
+The upload and the confirmation must both happen before the ticket expires
+(DIRECT_UPLOAD_TICKET_TTL seconds).
+
+settings.DIRECT_UPLOAD_BACKEND picks how upload targets are signed:
+    * CloudinaryDirectUploadBackend - signed Cloudinary upload API parameters,
+      verified through the Admin API on confirm,
+    * LocalDirectUploadBackend      - an HMAC-signed endpoint of this app that
+      writes to the field's storage, for development and offline tests.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import posixpath
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import UploadTicket
+from .uploads import UPLOAD_RULES
+
+logger = logging.getLogger(__name__)
+
+
+class TicketError(Exception):
+    """A ticket that cannot be used or confirmed."""
+
+
+# ── Targets ─────────────────────────────────────────────────────
+class UploadTarget:
+    def __init__(self, label, model, field_name, can_attach):
+        self.label = label
+        self.model = model
+        self.field_name = field_name
+        self.can_attach = can_attach  # (user, obj) -> bool
+
+    @property
+    def field(self):
+        return self.model._meta.get_field(self.field_name)
+
+    @property
+    def rules(self):
+        return UPLOAD_RULES[self.field_name]
+
+    def get_object(self, object_id):
+        try:
+            return self.model._default_manager.filter(pk=object_id).first()
+        except (ValueError, TypeError):  # e.g. a malformed UUID
+            return None
+
+
+_targets = {}
+
+
+def register_target(label, model, field_name, can_attach):
+    _targets[label] = UploadTarget(label, model, field_name, can_attach)
+
+
+def get_target(label):
+    return _targets.get(label)
+
+
+def target_labels():
+    return sorted(_targets)
+
+
+def build_key(target, obj, filename):
+    """A unique storage name under the field's upload_to, keeping the original file name readable."""
+    name = target.field.generate_filename(obj, filename)
+    directory, base = posixpath.split(name)
+    stem, ext = os.path.splitext(base)
+    return posixpath.join(directory, f"{stem}_{uuid.uuid4().hex[:12]}{ext.lower()}")
+
+
+# ── Backends ────────────────────────────────────────────────────
+class BaseDirectUploadBackend:
+    def storage_key(self, storage, name):
+        """The name `storage` will know the uploaded object by."""
+        return name
+
+    def upload_target(self, ticket, storage, request):
+        """{url, method, file_field, fields} the client uses to upload the file."""
+        raise NotImplementedError
+
+    def stored_size(self, storage, key):
+        """Size in bytes of the uploaded object, or None if nothing was uploaded."""
+        raise NotImplementedError
+
+    def discard(self, storage, key):
+        try:
+            storage.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete rejected upload {key}: {str(e)}")
+
+
+class CloudinaryDirectUploadBackend(BaseDirectUploadBackend):
+    def _resource_type(self, storage):
+        return getattr(storage, 'RESOURCE_TYPE', 'raw')
+
+    def storage_key(self, storage, name):
+        # Match the names MediaCloudinaryStorage._save() produces: the storage
+        # prefix is part of the public id, and only raw resources keep their extension
+        from cloudinary_storage import app_settings
+
+        prefix = app_settings.PREFIX.strip('/')
+        if prefix and not name.startswith(f"{prefix}/"):
+            name = f"{prefix}/{name}"
+        if self._resource_type(storage) != 'raw':
+            name = os.path.splitext(name)[0]
+        return name
+
+    def upload_target(self, ticket, storage, request):
+        import cloudinary
+        from cloudinary.utils import api_sign_request, cloudinary_api_url
+
+        config = cloudinary.config()
+        params = {
+            'public_id': ticket.key,
+            'tags': getattr(storage, 'TAG', 'media'),
+            'timestamp': int(time.time()),
+        }
+        return {
+            'url': cloudinary_api_url('upload', resource_type=self._resource_type(storage)),
+            'method': 'POST',
+            'file_field': 'file',
+            'fields': {
+                **params,
+                'api_key': config.api_key,
+                'signature': api_sign_request(params, config.api_secret),
+            },
+        }
+
+    def stored_size(self, storage, key):
+        import cloudinary.api
+        from cloudinary.exceptions import NotFound
+
+        try:
+            resource = cloudinary.api.resource(key, resource_type=self._resource_type(storage))
+        except NotFound:
+            return None
+        return resource.get('bytes')
+
+
+class LocalDirectUploadBackend(BaseDirectUploadBackend):
+    """
+    Offline stand-in for a storage service: tickets point at
+    DirectUploadLocalReceiveView, which checks an HMAC signature and expiry
+    like Cloudinary would and saves into the field's own storage.
+    """
+
+    @staticmethod
+    def signature(ticket_id, key, expires):
+        message = f"{ticket_id}:{key}:{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def upload_target(self, ticket, storage, request):
+        expires = int(ticket.expires_at.timestamp())
+        return {
+            'url': request.build_absolute_uri(reverse('upload-ticket-local', args=[ticket.pk])),
+            'method': 'POST',
+            'file_field': 'file',
+            'fields': {
+                'key': ticket.key,
+                'expires': expires,
+                'signature': self.signature(ticket.pk, ticket.key, expires),
+            },
+        }
+
+    def receive(self, ticket, storage, fields, content):
+        """Store an upload sent to the local endpoint after checking its signature."""
+        expires = str(fields.get('expires', ''))
+        expected = self.signature(ticket.pk, ticket.key, expires)
+        if fields.get('key') != ticket.key or not hmac.compare_digest(expected, str(fields.get('signature', ''))):
+            raise TicketError("Invalid upload signature.")
+        if not expires.isdigit() or int(expires) < time.time():
+            raise TicketError("Upload ticket has expired.")
+        if storage.exists(ticket.key):
+            storage.delete(ticket.key)
+        stored = storage.save(ticket.key, content)
+        if stored != ticket.key:
+            storage.delete(stored)
+            raise TicketError("Upload could not be stored under its ticket key.")
+        return stored
+
+    def stored_size(self, storage, key):
+        if not storage.exists(key):
+            return None
+        return storage.size(key)
+
+
+def get_backend():
+    path = getattr(settings, 'DIRECT_UPLOAD_BACKEND', None) or \
+        'publications.direct_uploads.CloudinaryDirectUploadBackend'
+    return import_string(path)()
+
+
+# ── Tickets ─────────────────────────────────────────────────────
+def issue_ticket(user, target, obj, filename, size, request):
+    """Create a ticket for uploading `filename` to `target` on `obj`; returns (ticket, upload target)."""
+    backend = get_backend()
+    storage = target.field.storage
+    ttl = getattr(settings, 'DIRECT_UPLOAD_TICKET_TTL', 900)
+    ticket = UploadTicket.objects.create(
+        user=user,
+        target=target.label,
+        object_id=str(obj.pk),
+        filename=filename,
+        size=size,
+        key=backend.storage_key(storage, build_key(target, obj, filename)),
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+    return ticket, backend.upload_target(ticket, storage, request)
+
+
+def _attach(obj, field_name, key):
+    setattr(obj, field_name, key)
+    update_fields = [field_name] + [
+        field.name for field in obj._meta.concrete_fields if getattr(field, 'auto_now', False)
+    ]
+    # A regular save(), so post_save work such as manuscript ingestion still runs
+    obj.save(update_fields=update_fields)
+
+
+def confirm_ticket(ticket):
+    """
+    Verify the uploaded object for a locked, issued ticket and attach it.
+    Raises TicketError when the upload is missing, too large or no longer allowed.
+    """
+    target = get_target(ticket.target)
+    if ticket.status == 'attached':
+        return target.get_object(ticket.object_id)
+    if ticket.status != 'issued':
+        raise TicketError(ticket.error or "This upload was rejected.")
+    if ticket.expires_at < timezone.now():
+        raise TicketError("Upload ticket has expired.")
+
+    backend = get_backend()
+    storage = target.field.storage
+    size = backend.stored_size(storage, ticket.key)
+    if size is None:
+        raise TicketError("No file has been uploaded for this ticket yet.")
+
+    obj = target.get_object(ticket.object_id)
+    error = None
+    if size > target.rules['max_size']:
+        error = target.rules['size_error']
+    elif obj is None or not target.can_attach(ticket.user, obj):
+        error = "You can no longer attach files to this object."
+    if error:
+        backend.discard(storage, ticket.key)
+        ticket.status = 'rejected'
+        ticket.error = error
+        ticket.save(update_fields=['status', 'error'])
+        raise TicketError(error)
+
+    _attach(obj, target.field_name, ticket.key)
+    ticket.status = 'attached'
+    ticket.save(update_fields=['status'])
+    logger.info(f"Attached direct upload {ticket.key} to {ticket.target} {ticket.object_id}")
+    return obj
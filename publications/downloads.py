@@ -0,0 +1,73 @@
+# publications/downloads.py
+"""
+Signed, time-limited download URLs for publication assets.
+
+PublicationDownloadView checks access, then redirects to the URL returned by
+`signed_url()`:
+
+    * Cloudinary storages - a private download URL of the Cloudinary API,
+      signed with the API secret and expiring after DOWNLOAD_URL_TTL seconds,
+    * any other storage   - storage.url(), which storages such as S3 sign
+      themselves (local development storages are served unsigned).
+
+Signing can mean an API round trip, so URLs are cached per stored file and
+reused until shortly before they expire; the redirect carries a private
+Cache-Control max-age for the remaining lifetime and an ETag of the signed
+URL, so a client revalidating a cached redirect gets a 304 only while the
+URL it holds is still the one being handed out.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# URL segment -> Publication field
+ASSETS = {
+    'file': 'file',
+    'video': 'video_file',
+    'annotated': 'annotated_file',
+    'cover': 'cover_image',
+}
+
+# Stop handing out a cached URL this many seconds before it expires
+EXPIRY_MARGIN = 30
+
+
+def url_ttl():
+    return getattr(settings, 'DOWNLOAD_URL_TTL', 300)
+
+
+def etag(url):
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def _sign(storage, name, expires_at):
+    from cloudinary_storage.storage import MediaCloudinaryStorage
+
+    if isinstance(storage, MediaCloudinaryStorage):
+        from cloudinary.utils import private_download_url
+
+        return private_download_url(
+            name,
+            '',  # stored names already carry the extension where Cloudinary keeps one
+            resource_type=storage.RESOURCE_TYPE,
+            type='upload',
+            expires_at=expires_at,
+        )
+    return storage.url(name)
+
+
+def signed_url(field_file):
+    """(url, expires_at) for a stored FieldFile, reusing a cached URL while it is still valid."""
+    name = field_file.name
+    key = f"download_url:{hashlib.sha1(name.encode()).hexdigest()}"
+    cached = cache.get(key)
+    now = int(time.time())
+    if cached is not None and cached[1] - EXPIRY_MARGIN > now:
+        return cached
+
+    expires_at = now + url_ttl()
+    result = (_sign(field_file.storage, name, expires_at), expires_at)
+    cache.set(key, result, timeout=url_ttl() - EXPIRY_MARGIN)
+    return result
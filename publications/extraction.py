@@ -0,0 +1,193 @@
+# publications/extraction.py
+"""
+Manuscript text extraction and first-page previews.
+
+Pure functions over a file on disk: no Django imports, so `run()` can execute
+them in a short-lived child process. MuPDF and python-docx are native/CPU
+heavy and a malformed upload can make them spin, so every document gets its
+own process and is killed when it exceeds its timeout. The Django side
+(reading Publication.file, storing the result) lives in publications/ingestion.py.
+
+    result = run('/tmp/upload.pdf', 'pdf', timeout=60)
+    result == {'text': '...', 'page_count': 12, 'truncated': False,
+               'previews': {'thumb': b'\\x89PNG...', 'page': b'\\x89PNG...'}}
+"""
+import multiprocessing
+import re
+import zipfile
+
+PDF = 'pdf'
+DOCX = 'docx'
+
+# name -> preview width in pixels (first page only)
+PREVIEW_WIDTHS = {
+    'thumb': 320,
+    'page': 1024,
+}
+
+_DOCX_PAGES_RE = re.compile(rb'<Pages>(\d+)</Pages>')
+
+
+class ExtractionError(Exception):
+    """The document could not be read."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """The document took longer than the allowed time and its process was killed."""
+
+
+def detect_kind(path, name=''):
+    """PDF, DOCX or None, from the file name and, failing that, the first bytes."""
+    name = (name or path).lower()
+    if name.endswith('.pdf'):
+        return PDF
+    if name.endswith('.docx'):
+        return DOCX
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head == b'%PDF':
+        return PDF
+    if head == b'PK\x03\x04' and zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            if 'word/document.xml' in archive.namelist():
+                return DOCX
+    return None
+
+
+class _TextBuffer:
+    """Collects text up to `max_chars` so huge manuscripts are never held in memory whole."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.truncated = False
+
+    @property
+    def full(self):
+        return self.length >= self.max_chars
+
+    def add(self, text):
+        if not text or self.truncated:
+            return
+        remaining = self.max_chars - self.length
+        if len(text) > remaining:
+            text = text[:remaining]
+            self.truncated = True
+        self.parts.append(text)
+        self.length += len(text)
+
+    def value(self):
+        return '\n'.join(part.strip() for part in self.parts if part.strip())
+
+
+def extract_pdf(path, max_chars, preview_widths=PREVIEW_WIDTHS):
+    import fitz  # PyMuPDF
+
+    buffer = _TextBuffer(max_chars)
+    previews = {}
+    with fitz.open(path) as document:
+        if document.needs_pass:
+            raise ExtractionError("PDF is password protected")
+        page_count = document.page_count
+        for page in document:
+            if page.number == 0:
+                for name, width in preview_widths.items():
+                    zoom = width / page.rect.width
+                    pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                    previews[name] = pixmap.tobytes('png')
+            buffer.add(page.get_text('text'))
+            if buffer.full:
+                buffer.truncated = buffer.truncated or page.number + 1 < page_count
+                break
+    return {
+        'text': buffer.value(),
+        'page_count': page_count,
+        'truncated': buffer.truncated,
+        'previews': previews,
+    }
+
+
+def _docx_page_count(path):
+    # Word records the page count of the last save in docProps/app.xml; it is absent
+    # from files written by other tools, and python-docx has no layout engine
+    with zipfile.ZipFile(path) as archive:
+        try:
+            app = archive.read('docProps/app.xml')
+        except KeyError:
+            return None
+    match = _DOCX_PAGES_RE.search(app)
+    return int(match.group(1)) if match else None
+
+
+def extract_docx(path, max_chars, preview_widths=PREVIEW_WIDTHS):
+    import docx  # python-docx
+
+    buffer = _TextBuffer(max_chars)
+    document = docx.Document(path)
+    for paragraph in document.paragraphs:
+        buffer.add(paragraph.text)
+        if buffer.full:
+            break
+    for table in document.tables:
+        if buffer.full:
+            break
+        for row in table.rows:
+            buffer.add(' '.join(cell.text for cell in row.cells))
+    return {
+        'text': buffer.value(),
+        'page_count': _docx_page_count(path),
+        'truncated': buffer.truncated,
+        'previews': {},  # rendering Word layout needs LibreOffice/pandoc+LaTeX, not installed
+    }
+
+
+EXTRACTORS = {
+    PDF: extract_pdf,
+    DOCX: extract_docx,
+}
+
+
+def extract(path, kind, max_chars=1_000_000, preview_widths=PREVIEW_WIDTHS):
+    try:
+        return EXTRACTORS[kind](path, max_chars, preview_widths)
+    except ExtractionError:
+        raise
+    except Exception as e:
+        raise ExtractionError(f"{type(e).__name__}: {str(e)}") from e
+
+
+def _child(conn, path, kind, options):
+    try:
+        conn.send(('ok', extract(path, kind, **options)))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+
+def run(path, kind, timeout, start_method='spawn', **options):
+    """
+    extract() in a child process; raises ExtractionTimeout (after killing the
+    child) when no result arrives within `timeout` seconds.
+    """
+    context = multiprocessing.get_context(start_method)
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(sender, path, kind, options), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise ExtractionTimeout(f"Extraction took longer than {timeout}s")
+        try:
+            outcome, value = receiver.recv()
+        except EOFError:
+            raise ExtractionError(f"Extraction process exited with code {process.exitcode}")
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+    if outcome == 'error':
+        raise ExtractionError(value)
+    return value
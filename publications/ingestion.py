@@ -0,0 +1,130 @@
+# publications/ingestion.py
+"""
+Post-upload ingestion of Publication.file.
+
+When a publication's manuscript changes, `schedule()` queues `ingest()` on
+the extraction pool after commit. `ingest()` streams the upload from storage
+to a temporary file, runs publications.extraction in a child process with a
+per-document timeout (MANUSCRIPT_EXTRACTION_TIMEOUT) and stores:
+
+    * the plain text in PublicationManuscript (fed to the search index as the body),
+    * Publication.page_count,
+    * Publication.manuscript_preview - first-page PNG URLs, e.g. {"thumb": "...", "page": "..."}.
+
+At most MANUSCRIPT_EXTRACTION_WORKERS documents are processed at once per
+process. `ingest_manuscripts` re-runs ingestion for existing uploads.
+"""
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from config.renditions import get_storage, source_name
+from config.workers import BackgroundQueue
+
+from . import extraction
+from .models import Publication, PublicationManuscript
+from .search import index_publication
+
+logger = logging.getLogger(__name__)
+
+extraction_queue = BackgroundQueue(
+    "extraction",
+    workers=getattr(settings, "MANUSCRIPT_EXTRACTION_WORKERS", 1),
+)
+
+
+def schedule(publication_pk):
+    transaction.on_commit(lambda: extraction_queue.submit(ingest, publication_pk))
+
+
+def _download(value, suffix):
+    """Copy a stored file to a named temporary file chunk by chunk; returns its path."""
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(handle, 'wb') as target, value.open('rb') as source:
+            for chunk in source.chunks():
+                target.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+def _save_previews(publication_pk, previews):
+    storage = get_storage()
+    urls = {}
+    for name, content in previews.items():
+        path = f"previews/publications.publication/{publication_pk}/page-1-{name}.png"
+        if storage.exists(path):
+            storage.delete(path)
+        urls[name] = storage.url(storage.save(path, ContentFile(content)))
+    return urls
+
+
+def _store(publication, source, status, result=None, error=''):
+    """Save the outcome unless the manuscript was replaced while we were extracting."""
+    result = result or {'text': '', 'page_count': None, 'truncated': False, 'previews': {}}
+    previews = _save_previews(publication.pk, result['previews'])
+    with transaction.atomic():
+        updated = Publication.objects.filter(pk=publication.pk, file=publication.file).update(
+            page_count=result['page_count'],
+            manuscript_preview=previews,
+        )
+        if not updated:
+            return False
+        PublicationManuscript.objects.update_or_create(
+            publication_id=publication.pk,
+            defaults={
+                'source': source,
+                'status': status,
+                'text': result['text'],
+                'truncated': result['truncated'],
+                'error': error,
+                'extracted_at': timezone.now(),
+            },
+        )
+    index_publication(Publication.objects.select_related('author', 'manuscript').get(pk=publication.pk))
+    return True
+
+
+def ingest(publication_pk):
+    """Extract text, page count and previews for one publication; returns the manuscript status."""
+    publication = Publication.objects.filter(pk=publication_pk).first()
+    if publication is None:
+        return None
+    source = source_name(publication.file)
+    if not source:
+        PublicationManuscript.objects.filter(publication_id=publication_pk).delete()
+        Publication.objects.filter(pk=publication_pk).update(page_count=None, manuscript_preview={})
+        index_publication(publication)
+        return None
+
+    path = None
+    status, result, error = 'done', None, ''
+    try:
+        path = _download(publication.file, os.path.splitext(source)[1])
+        kind = extraction.detect_kind(path, source)
+        if kind is None:
+            status = 'unsupported'
+        else:
+            result = extraction.run(
+                path,
+                kind,
+                timeout=getattr(settings, "MANUSCRIPT_EXTRACTION_TIMEOUT", 60),
+                max_chars=getattr(settings, "MANUSCRIPT_MAX_TEXT_CHARS", 1_000_000),
+            )
+    except Exception as e:
+        logger.error(f"Could not extract manuscript for publication {publication_pk}: {str(e)}")
+        status, error = 'failed', str(e)
+    finally:
+        if path is not None:
+            os.unlink(path)
+
+    if not _store(publication, source, status, result, error):
+        return None
+    return status
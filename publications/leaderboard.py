@@ -0,0 +1,138 @@
+# publications/leaderboard.py
+"""
+Ranked author leaderboards.
+
+Ranking every author on each request meant aggregating over all users and
+publications. Instead each board is a snapshot of LeaderboardEntry rows
+(user, position, rank, score) computed from the source tables:
+
+    publications - approved publications per author
+    points       - points received (points.models.UserPointBalance)
+    views        - views across an author's publications
+
+A page is a range of `position` on the (board, position) index and "my rank"
+is one lookup on (board, user), so reads cost O(page) whatever the number of
+authors. Writes that affect a board only flag its LeaderboardSnapshot as
+stale (one UPDATE); the next read at least LEADERBOARD_REFRESH_INTERVAL
+seconds after the last computation queues a refresh and keeps serving the
+current snapshot meanwhile. A refresh rewrites only the entries whose rank or
+score changed. `refresh_leaderboards` recomputes them from cron as well.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from config.workers import default_queue
+from .models import LEADERBOARD_CHOICES, LeaderboardEntry, LeaderboardSnapshot, Publication
+
+logger = logging.getLogger(__name__)
+
+BOARDS = [choice[0] for choice in LEADERBOARD_CHOICES]
+
+
+def refresh_interval():
+    return getattr(settings, 'LEADERBOARD_REFRESH_INTERVAL', 300)
+
+
+def _scores(board):
+    """[(user_id, score)] of every author with a positive score on `board`."""
+    if board == 'points':
+        from points.models import UserPointBalance
+
+        return list(UserPointBalance.objects.filter(total__gt=0).values_list('user_id', 'total'))
+
+    publications = Publication.objects.order_by().values('author_id')
+    if board == 'publications':
+        rows = publications.filter(status='approved').annotate(score=Count('id'))
+    else:
+        rows = publications.annotate(score=Sum('views')).filter(score__gt=0)
+    return list(rows.values_list('author_id', 'score'))
+
+
+def refresh(board):
+    """Recompute `board` and write the entries that changed. Returns the number of ranked authors."""
+    ranked, rank, previous_score = {}, 0, None
+    for position, (user_id, score) in enumerate(sorted(_scores(board), key=lambda row: (-row[1], row[0])), 1):
+        if score != previous_score:
+            rank, previous_score = position, score
+        ranked[user_id] = (position, rank, score)
+
+    with transaction.atomic():
+        existing = {
+            entry.user_id: entry
+            for entry in LeaderboardEntry.objects.filter(board=board).only('id', 'user_id', 'position', 'rank', 'score')
+        }
+        created, changed = [], []
+        for user_id, (position, rank, score) in ranked.items():
+            entry = existing.pop(user_id, None)
+            if entry is None:
+                created.append(LeaderboardEntry(board=board, user_id=user_id, position=position, rank=rank, score=score))
+            elif (entry.position, entry.rank, entry.score) != (position, rank, score):
+                entry.position, entry.rank, entry.score = position, rank, score
+                changed.append(entry)
+        if existing:
+            LeaderboardEntry.objects.filter(pk__in=[entry.pk for entry in existing.values()]).delete()
+        LeaderboardEntry.objects.bulk_update(changed, ['position', 'rank', 'score'], batch_size=500)
+        LeaderboardEntry.objects.bulk_create(created, batch_size=500)
+        # `stale` is left alone: changes made while computing need another refresh
+        LeaderboardSnapshot.objects.update_or_create(
+            board=board,
+            defaults={'computed_at': timezone.now(), 'size': len(ranked)},
+            create_defaults={'computed_at': timezone.now(), 'size': len(ranked), 'stale': False},
+        )
+    logger.info(
+        f"Refreshed {board} leaderboard: {len(ranked)} authors, "
+        f"{len(created)} new, {len(changed)} moved, {len(existing)} dropped"
+    )
+    return len(ranked)
+
+
+def _refresh_in_background(board):
+    try:
+        refresh(board)
+    except Exception as e:
+        logger.error(f"Failed to refresh {board} leaderboard: {str(e)}")
+        mark_stale(board)
+
+
+def mark_stale(board):
+    LeaderboardSnapshot.objects.filter(board=board, stale=False).update(stale=True)
+
+
+def claim_refresh(board):
+    """Clear the board's stale flag; True for the one caller that found it set and should refresh."""
+    return bool(LeaderboardSnapshot.objects.filter(board=board, stale=True).update(stale=False))
+
+
+def snapshot(board):
+    """The board's LeaderboardSnapshot, computing it on first use and queueing a refresh when it is due."""
+    current = LeaderboardSnapshot.objects.filter(board=board).first()
+    if current is None or current.computed_at is None:
+        refresh(board)
+        return LeaderboardSnapshot.objects.get(board=board)
+
+    due = current.computed_at <= timezone.now() - timedelta(seconds=refresh_interval())
+    # Concurrent readers queue the refresh only once
+    if current.stale and due and claim_refresh(board):
+        transaction.on_commit(lambda: default_queue.submit(_refresh_in_background, board))
+    return current
+
+
+def entries(board):
+    return LeaderboardEntry.objects.filter(board=board).select_related('user').order_by('position')
+
+
+def page(board, number, size):
+    """Entries at positions ((number - 1) * size, number * size]."""
+    return list(entries(board).filter(position__gt=(number - 1) * size, position__lte=number * size))
+
+
+def rank_of(board, user):
+    """The user's LeaderboardEntry on `board`, or None when unranked."""
+    if not user.is_authenticated:
+        return None
+    return LeaderboardEntry.objects.filter(board=board, user=user).first()
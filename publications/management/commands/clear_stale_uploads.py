@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from publications.uploads import clear_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned, stuck or failed chunked uploads and their temporary files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=None,
+            help="Age in hours after which an unfinished upload is removed (default: CHUNKED_UPLOAD_EXPIRY_HOURS).",
+        )
+
+    def handle(self, *args, **options):
+        removed = clear_stale_uploads(options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} stale uploads."))
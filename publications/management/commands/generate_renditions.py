@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from config import renditions
+
+
+class Command(BaseCommand):
+    help = "Generate missing or outdated image renditions (covers, banners, profile images)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate renditions even when they are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        for (model, image_field), (renditions_field, _) in renditions.registered():
+            queryset = model.objects.exclude(**{f"{image_field}__isnull": True})\
+                .exclude(**{image_field: ""}).only("pk", image_field, renditions_field)
+            for instance in queryset.iterator(chunk_size=200):
+                source = renditions.source_name(getattr(instance, image_field))
+                current = getattr(instance, renditions_field) or {}
+                if not options["force"] and current.get("source") == source:
+                    continue
+                if renditions.generate(model, instance.pk, image_field) is not None:
+                    generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated renditions for {generated} images."))
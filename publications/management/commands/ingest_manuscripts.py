@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from publications import ingestion
+from publications.models import Publication
+
+
+class Command(BaseCommand):
+    help = "Extract text, page counts and previews for uploaded manuscripts that have not been processed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-extract manuscripts even when they are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Publication.objects.exclude(file="").exclude(file__isnull=True)\
+            .select_related("manuscript").only("pk", "file", "manuscript__source", "manuscript__status")
+
+        results = {}
+        for publication in queryset.iterator(chunk_size=200):
+            manuscript = getattr(publication, "manuscript", None)
+            if not options["force"] and manuscript is not None and manuscript.source == publication.file.name:
+                continue
+            status = ingestion.ingest(publication.pk)
+            results[status] = results.get(status, 0) + 1
+
+        summary = ", ".join(f"{count} {status}" for status, count in results.items() if status) or "nothing to do"
+        self.stdout.write(self.style.SUCCESS(f"Ingested manuscripts: {summary}."))
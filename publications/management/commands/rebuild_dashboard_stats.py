@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from publications import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized dashboard counters used by PublicationStatsView."
+
+    def handle(self, *args, **options):
+        rows = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} dashboard stat rows."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from publications.models import Publication, Views
+
+
+def _count_of(**filters):
+    counts = Views.objects.filter(publication=OuterRef("pk"), **filters)\
+        .values("publication").annotate(n=Count("id")).values("n")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Recompute Publication.likes_count/dislikes_count from Views and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report publications whose counters drifted, do not fix them.",
+        )
+
+    def handle(self, *args, **options):
+        annotated = Publication.objects.annotate(
+            actual_likes=_count_of(user_liked=True),
+            actual_dislikes=_count_of(user_disliked=True),
+        )
+        drifted = annotated.filter(
+            ~Q(likes_count=F("actual_likes")) | ~Q(dislikes_count=F("actual_dislikes"))
+        ).values_list("id", "likes_count", "actual_likes", "dislikes_count", "actual_dislikes")
+
+        drifted = list(drifted)
+        for pk, likes, actual_likes, dislikes, actual_dislikes in drifted:
+            self.stdout.write(
+                f"{pk}: likes {likes} -> {actual_likes}, dislikes {dislikes} -> {actual_dislikes}"
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(drifted)} publications drifted (dry run, nothing changed).")
+            return
+
+        with transaction.atomic():
+            Publication.objects.filter(pk__in=[row[0] for row in drifted]).update(
+                likes_count=_count_of(user_liked=True),
+                dislikes_count=_count_of(user_disliked=True),
+            )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {len(drifted)} publications."))
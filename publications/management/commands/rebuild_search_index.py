@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from publications.models import Publication
+from publications.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents for every publication."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of publications loaded per database round trip.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only index publications that have no search document yet (cheap enough for every deploy).",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        queryset = Publication.objects.select_related("author", "manuscript").order_by("pk")
+        if options["missing"]:
+            queryset = queryset.filter(search_document__isnull=True)
+
+        indexed = 0
+        for publication in queryset.iterator(chunk_size=options["chunk_size"]):
+            backend.index(publication)
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} publications with {type(backend).__name__}."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from publications import leaderboard
+from publications.models import LeaderboardSnapshot
+
+
+class Command(BaseCommand):
+    help = "Recompute the author leaderboards (publications/leaderboard.py). Run it from cron to keep them fresh."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--board",
+            choices=leaderboard.BOARDS,
+            action="append",
+            help="Only refresh this board (repeatable). Defaults to all of them.",
+        )
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Skip boards with no changes since they were last computed.",
+        )
+
+    def handle(self, *args, **options):
+        for board in options["board"] or leaderboard.BOARDS:
+            computed = LeaderboardSnapshot.objects.filter(board=board, computed_at__isnull=False).exists()
+            if options["stale_only"] and computed and not leaderboard.claim_refresh(board):
+                continue
+            size = leaderboard.refresh(board)
+            self.stdout.write(f"{board}: {size} authors ranked")
+        self.stdout.write(self.style.SUCCESS("Leaderboards refreshed."))
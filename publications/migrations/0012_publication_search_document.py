@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-17 06:07
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS publications_search_vector_gin "
+            "ON publications_publicationsearchdocument USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS publications_search_fts USING fts5("
+            "publication_id UNINDEXED, title, keywords, authors, doi, abstract, body, "
+            "tokenize='porter unicode61')"
+        )
+
+
+def drop_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS publications_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS publications_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0011_publication_volume'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationSearchDocument',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='publications.publication')),
+                ('title', models.TextField(blank=True)),
+                ('keywords', models.TextField(blank=True)),
+                ('authors', models.TextField(blank=True)),
+                ('doi', models.TextField(blank=True)),
+                ('abstract', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='publication',
+            name='search_idx',
+        ),
+        migrations.RunPython(create_search_structures, drop_search_structures),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 06:08
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    Publication = apps.get_model('publications', 'Publication')
+    Views = apps.get_model('publications', 'Views')
+
+    def count_of(**filters):
+        counts = Views.objects.filter(publication=OuterRef('pk'), **filters)\
+            .values('publication').annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    Publication.objects.update(
+        likes_count=count_of(user_liked=True),
+        dislikes_count=count_of(user_disliked=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0012_publication_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0013_publication_reaction_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('status', 'Publications per status'), ('month', 'Publications per month and status'), ('fee', 'Successful payments per fee type'), ('reaction', 'Likes and dislikes')], max_length=20)),
+                ('key', models.CharField(max_length=50)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-17 06:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0014_dashboard_stat'),
+        ('tasks', '0002_alter_task_options_alter_task_assigned_by_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notification_user_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(fields=['-publication_date', '-id'], name='publication_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewhistory',
+            index=models.Index(fields=['editor', '-timestamp', '-id'], name='reviewhistory_editor_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewhistory',
+            index=models.Index(fields=['-timestamp', '-id'], name='reviewhistory_feed_idx'),
+        ),
+    ]
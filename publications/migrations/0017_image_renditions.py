@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0016_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='cover_image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-17 06:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0017_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationManuscript',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='manuscript', serialize=False, to='publications.publication')),
+                ('source', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('unsupported', 'Unsupported'), ('failed', 'Failed')], max_length=20)),
+                ('text', models.TextField(blank=True)),
+                ('truncated', models.BooleanField(default=False)),
+                ('error', models.TextField(blank=True)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='manuscript_preview',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='publication',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 06:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0019_upload_session'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadTicket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(max_length=50)),
+                ('object_id', models.CharField(max_length=64)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('status', models.CharField(choices=[('issued', 'Issued'), ('attached', 'Attached'), ('rejected', 'Rejected')], default='issued', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_tickets', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
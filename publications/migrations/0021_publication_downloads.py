@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0020_upload_ticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publication',
+            name='downloads',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
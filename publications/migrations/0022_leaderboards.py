@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 06:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0021_publication_downloads'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('board', models.CharField(choices=[('publications', 'Approved publications'), ('points', 'Points received'), ('views', 'Publication views')], max_length=20, primary_key=True, serialize=False)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('stale', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('publications', 'Approved publications'), ('points', 'Points received'), ('views', 'Publication views')], max_length=20)),
+                ('position', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.BigIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'position'], name='leaderboard_position_idx')],
+                'unique_together': {('board', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 07:04
+
+from django.db import migrations, models
+
+
+def drop_reaction_stats(apps, schema_editor):
+    # Likes/dislikes are now summed from Publication.likes_count/dislikes_count
+    DashboardStat = apps.get_model('publications', 'DashboardStat')
+    DashboardStat.objects.filter(scope='reaction').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0022_leaderboards'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dashboardstat',
+            name='scope',
+            field=models.CharField(choices=[('status', 'Publications per status'), ('month', 'Publications per month and status'), ('fee', 'Successful payments per fee type')], max_length=20),
+        ),
+        migrations.RunPython(drop_reaction_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0023_dashboard_stat_without_reactions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Uploading'), ('processing', 'Processing'), ('storing', 'Storing'), ('complete', 'Complete'), ('failed', 'Failed')], default='uploading', max_length=20),
+        ),
+    ]
@@ -2,9 +2,12 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from cloudinary_storage.storage import MediaCloudinaryStorage, VideoMediaCloudinaryStorage, RawMediaCloudinaryStorage
 import uuid
 
+from .tracking import FieldTrackerMixin
+
 
 
 User = get_user_model()
@@ -46,7 +49,7 @@ def generate_doi():
 def generate_short_id():
     return uuid.uuid4().hex[:12]
 
-class Publication(models.Model):
+class Publication(FieldTrackerMixin, models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('pending', 'Pending'),
@@ -76,6 +79,9 @@ class Publication(models.Model):
     content = models.TextField(blank=True)
     is_free_review = models.BooleanField(default=False)  # Added field
     file = models.FileField(upload_to='publications/', blank=True, storage=RawMediaCloudinaryStorage())
+    # Filled in from `file` by publications/ingestion.py; the text lives in PublicationManuscript
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    manuscript_preview = models.JSONField(default=dict, blank=True)
     video_file = models.FileField(upload_to='videos/', blank=True, storage=VideoMediaCloudinaryStorage())
     author = models.ForeignKey(
         User,
@@ -85,6 +91,10 @@ class Publication(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True,  blank=True)
     keywords = models.TextField(blank=True, help_text="Comma-separated list of keywords (e.g., machine learning, AI)")
     views = models.PositiveIntegerField(default=0)
+    downloads = models.PositiveIntegerField(default=0)  # buffered, see counters.publication_downloads
+    # Denormalized from Views; kept in step by Views.set_reaction (see rebuild_reaction_counts)
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -113,6 +123,8 @@ class Publication(models.Model):
         null=True,
         help_text="Featured image (16:9 recommended)"
     )
+    # WebP/AVIF thumbnails of cover_image (config/renditions.py)
+    cover_image_renditions = models.JSONField(default=dict, blank=True)
     co_author_names = models.JSONField(default=list, blank=True)  # Stores list of strings, e.g., ["John Doe", "Jane Smith"]
     # license = models.CharField(
     #     max_length=50,
@@ -133,8 +145,9 @@ class Publication(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['author', 'publication_date']),
-            models.Index(fields=['title', 'abstract', 'keywords'], name='search_idx'),
             models.Index(fields=['status']),
+            # Keyset pagination: (publication_date, id) cursors walk this index
+            models.Index(fields=['-publication_date', '-id'], name='publication_feed_idx'),
         ]
         ordering = ['-publication_date']
 
@@ -142,13 +155,8 @@ class Publication(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        is_new = self._state.adding  # True only when creating
-        old_status = None
-
-        # If updating, get the old instance to check for status changes
-        if not is_new:
-            old_instance = Publication.objects.get(pk=self.pk)
-            old_status = old_instance.status
+        # Status as loaded from the database (None when creating); no extra query
+        old_status = self.previous('status')
 
         # Force under_review when author resubmits a rejected paper
         if old_status == 'rejected' and self.status in ['draft', 'pending']:
@@ -176,10 +184,187 @@ class Publication(models.Model):
 
                     
     def total_likes(self):
-        return self.view_stats.filter(user_liked=True).count()
+        return self.likes_count
 
     def total_dislikes(self):
-        return self.view_stats.filter(user_disliked=True).count()
+        return self.dislikes_count
+
+class PublicationManuscript(models.Model):
+    """
+    Plain text extracted from Publication.file (see publications/ingestion.py).
+    Kept out of Publication so list queries never load whole manuscripts.
+    """
+    STATUS_CHOICES = [
+        ('done', 'Done'),
+        ('unsupported', 'Unsupported'),
+        ('failed', 'Failed'),
+    ]
+
+    publication = models.OneToOneField(
+        Publication,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='manuscript'
+    )
+    source = models.CharField(max_length=255, blank=True)  # Publication.file name the text came from
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    text = models.TextField(blank=True)
+    truncated = models.BooleanField(default=False)  # text stops at MANUSCRIPT_MAX_TEXT_CHARS
+    error = models.TextField(blank=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Manuscript of {self.publication_id} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of a publication's manuscript or video
+    (see publications/uploads.py). Chunks are appended to a temporary file;
+    once complete the file is pushed to storage in the background and linked
+    to `publication`.
+    """
+    FIELD_CHOICES = [
+        ('file', 'Manuscript'),
+        ('video_file', 'Video'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('processing', 'Processing'),
+        ('storing', 'Storing'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='upload_sessions')
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # declared total size in bytes
+    offset = models.PositiveBigIntegerField(default=0)  # bytes received so far
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    stored_name = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='uploadsession_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} for {self.publication_id} ({self.status})"
+
+
+class UploadTicket(models.Model):
+    """
+    Permission to upload one file straight to storage (see
+    publications/direct_uploads.py). Confirming the ticket verifies the stored
+    object and attaches `key` to `target` (e.g. 'publication.file') on `object_id`.
+    """
+    STATUS_CHOICES = [
+        ('issued', 'Issued'),
+        ('attached', 'Attached'),
+        ('rejected', 'Rejected'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_tickets')
+    target = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=64)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # declared by the client, checked again on confirm
+    key = models.CharField(max_length=255, unique=True)  # storage name the client must upload to
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='issued')
+    error = models.TextField(blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.target} {self.object_id} ({self.status})"
+
+
+class PublicationSearchDocument(models.Model):
+    """
+    Denormalized, weighted search text for a publication (see publications/search.py).
+    `search_vector` is only populated on PostgreSQL; SQLite mirrors these rows into an FTS5 table.
+    """
+    publication = models.OneToOneField(
+        Publication,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    title = models.TextField(blank=True)
+    keywords = models.TextField(blank=True)
+    authors = models.TextField(blank=True)
+    doi = models.TextField(blank=True)
+    abstract = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Search document for {self.publication_id}"
+
+
+class DashboardStat(models.Model):
+    """
+    Materialized counters behind PublicationStatsView, maintained by publications/stats.py
+    and rebuilt with `python manage.py rebuild_dashboard_stats`.
+    """
+    SCOPE_CHOICES = [
+        ('status', 'Publications per status'),
+        ('month', 'Publications per month and status'),
+        ('fee', 'Successful payments per fee type'),
+    ]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=50)  # e.g. 'approved', '2025-11:approved', 'review_fee'
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('scope', 'key')
+
+    def __str__(self):
+        return f"{self.scope}:{self.key} = {self.count}"
+
+
+LEADERBOARD_CHOICES = [
+    ('publications', 'Approved publications'),
+    ('points', 'Points received'),
+    ('views', 'Publication views'),
+]
+
+
+class LeaderboardSnapshot(models.Model):
+    """State of one ranked author leaderboard, maintained by publications/leaderboard.py."""
+    board = models.CharField(max_length=20, choices=LEADERBOARD_CHOICES, primary_key=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    size = models.PositiveIntegerField(default=0)  # ranked authors
+    stale = models.BooleanField(default=True)  # source rows changed since computed_at
+
+    def __str__(self):
+        return f"{self.board} leaderboard ({self.size} authors)"
+
+
+class LeaderboardEntry(models.Model):
+    board = models.CharField(max_length=20, choices=LEADERBOARD_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    position = models.PositiveIntegerField()  # 1..size, unique per board; pages are position ranges
+    rank = models.PositiveIntegerField()  # competition rank: ties share a rank (1, 2, 2, 4)
+    score = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ('board', 'user')
+        indexes = [models.Index(fields=['board', 'position'], name='leaderboard_position_idx')]
+
+    def __str__(self):
+        return f"#{self.rank} {self.user_id} on {self.board} ({self.score})"
+
 
 class ReviewHistory(models.Model):
     publication = models.ForeignKey(Publication, on_delete=models.CASCADE, related_name='review_history')
@@ -190,6 +375,10 @@ class ReviewHistory(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['editor', '-timestamp', '-id'], name='reviewhistory_editor_feed_idx'),
+            models.Index(fields=['-timestamp', '-id'], name='reviewhistory_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.editor} {self.action} {self.publication.title} at {self.timestamp}"
@@ -225,6 +414,11 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_feed_idx'),
+            # Cold-cache path of the unread counter only ever scans unread rows
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.full_name}: {self.message}"
@@ -241,7 +435,27 @@ class Views(models.Model):
         unique_together = ('publication', 'user')
 
     def __str__(self):
-        return f"{self.user} - {self.publication.title}"   
+        return f"{self.user} - {self.publication.title}"
+
+    def set_reaction(self, liked, disliked):
+        """
+        Set this user's like/dislike and move the publication counters by the
+        difference. Call inside transaction.atomic() with this row locked
+        (select_for_update) so concurrent toggles cannot double count.
+        """
+        likes_delta = int(liked) - int(self.user_liked)
+        dislikes_delta = int(disliked) - int(self.user_disliked)
+
+        self.user_liked = liked
+        self.user_disliked = disliked
+        Views.objects.filter(pk=self.pk).update(user_liked=liked, user_disliked=disliked)
+
+        if likes_delta or dislikes_delta:
+            # The dashboard sums these columns (publications/stats.py), so no global row is locked here
+            Publication.objects.filter(pk=self.publication_id).update(
+                likes_count=models.F('likes_count') + likes_delta,
+                dislikes_count=models.F('dislikes_count') + dislikes_delta,
+            )
     
     
     
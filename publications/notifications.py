@@ -0,0 +1,187 @@
+# publications/notifications.py
+"""
+Notification dispatch.
+
+Callers describe *who* should hear about *what* with `notify()` or
+`notify_editors()`; nothing is written straight away. Every call hands its
+rows to transaction.on_commit(), so a savepoint or transaction that rolls back
+discards exactly the rows queued inside it. When the transaction commits each
+call's rows are written with bulk_create in chunks of
+settings.NOTIFICATION_BATCH_SIZE, and `notifications_created` is sent with the
+saved rows. The calls of one transaction share a batch keyed by
+(user, message, kind, publication, task), so the same event raised twice -
+for example by a signal and a serializer - produces one row per recipient.
+
+Outside a transaction the rows are written immediately, exactly like
+transaction.on_commit() behaves.
+
+settings.NOTIFICATIONS_ASYNC moves the write onto the background queue
+(config/workers.py) so large editor fan-outs never block the request.
+
+Unread counts are cached per user (`unread_count()`); creating, reading and
+deleting notifications invalidate the cached value once they commit, and a
+cold cache falls back to a COUNT on the partial (user) WHERE is_read = false
+index.
+"""
+import logging
+import threading
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.dispatch import Signal
+
+from accounts.models import User
+from config.caching import is_shared
+from config.workers import default_queue
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Sent with `notifications=[Notification, ...]` after every flush
+notifications_created = Signal()
+
+_local = threading.local()
+
+
+def recipient_ids(users):
+    """Normalise a User, a user id, a queryset or an iterable of either into a set of ids."""
+    if users is None:
+        return set()
+    if isinstance(users, QuerySet):
+        return set(users.values_list('id', flat=True))
+    if isinstance(users, User):
+        return {users.pk}
+    if isinstance(users, (int, str)):
+        return {users}
+    return {user.pk if isinstance(user, User) else user for user in users if user is not None}
+
+
+def notify(users, message, kind='', publication=None, task=None, exclude=None):
+    """Queue one notification per recipient; written when the current transaction commits."""
+    ids = recipient_ids(users) - recipient_ids(exclude)
+    if not ids:
+        return 0
+
+    publication_id = getattr(publication, 'pk', publication)
+    task_id = getattr(task, 'pk', task)
+    rows = {
+        (user_id, message, kind, publication_id, task_id): Notification(
+            user_id=user_id,
+            message=message,
+            type=kind,
+            related_publication_id=publication_id,
+            related_task_id=task_id,
+        )
+        for user_id in ids
+    }
+    transaction.on_commit(partial(_flush, _get_batch(), rows))
+    return len(ids)
+
+
+def notify_editors(message, kind='', publication=None, task=None, exclude=None):
+    return notify(User.objects.filter(role='editor'), message, kind=kind,
+                  publication=publication, task=task, exclude=exclude)
+
+
+def _get_batch():
+    """
+    The keys written so far by the current transaction's notify() calls. The
+    first flush of a commit detaches it, so the next transaction starts a new
+    one; a batch left behind by a rollback never had anything written to it.
+    """
+    if getattr(_local, 'batch', None) is None:
+        _local.batch = set()
+    return _local.batch
+
+
+def _flush(batch, rows):
+    if getattr(_local, 'batch', None) is batch:
+        _local.batch = None
+    rows = [row for key, row in rows.items() if key not in batch]
+    batch.update((n.user_id, n.message, n.type, n.related_publication_id, n.related_task_id) for n in rows)
+    if not rows:
+        return
+    if getattr(settings, 'NOTIFICATIONS_ASYNC', False):
+        default_queue.submit(create_notifications, rows)
+    else:
+        create_notifications(rows)
+
+
+def create_notifications(rows):
+    """Write `rows` in chunks and announce them; returns the saved notifications."""
+    size = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+    created = []
+    try:
+        for start in range(0, len(rows), size):
+            created.extend(Notification.objects.bulk_create(rows[start:start + size]))
+    except Exception as e:
+        logger.error(f"Failed to create {len(rows)} notifications: {str(e)}")
+        return created
+
+    invalidate_unread(n.user_id for n in created if not n.is_read)
+    notifications_created.send(sender=Notification, notifications=created)
+    return created
+
+
+# ── Unread counters ───────────────────────────────────────────
+#
+# A cached count is stored together with the "generation" of the user's
+# counter it was computed under. Writers never store counts: once their
+# transaction commits they move the generation to a new random token, which
+# invalidates whatever is cached, including a count a concurrent reader is
+# about to store from before the write. Without a cache shared by all workers
+# (config/caching.py) a change could not reach the other workers' copies, so
+# every read counts on the partial (user) WHERE is_read = false index instead.
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def _generation_key(user_id):
+    return f"notifications:unread-generation:{user_id}"
+
+
+def _unread_ttl():
+    return getattr(settings, 'UNREAD_COUNT_CACHE_TTL', 3600)
+
+
+def _count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def unread_count(user_id):
+    if not is_shared():
+        return _count_unread(user_id)
+
+    key, generation_key = _unread_key(user_id), _generation_key(user_id)
+    cached = cache.get_many([key, generation_key])
+    generation = cached.get(generation_key)
+    if generation is None:
+        cache.add(generation_key, uuid.uuid4().hex, _unread_ttl())
+        generation = cache.get(generation_key)
+    elif key in cached and cached[key][1] == generation:
+        return cached[key][0]
+
+    count = _count_unread(user_id)
+    cache.set(key, (count, generation), _unread_ttl())
+    return count
+
+
+def invalidate_unread(user_ids):
+    """Discard the cached counts of `user_ids` once the current transaction commits."""
+    user_ids = set(user_ids)
+    if not user_ids or not is_shared():
+        return
+
+    def bump():
+        cache.set_many(
+            {_generation_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+            _unread_ttl(),
+        )
+
+    transaction.on_commit(bump)
@@ -1,5 +1,14 @@
 # pagination.py
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class StandardResultsPagination(PageNumberPagination):
     page_size = 6  # Default items per page
@@ -11,3 +20,130 @@ class DashboardResultsPagination(PageNumberPagination):
     page_size = 3  # Default items per page
     page_size_query_param = 'page_size'  # Allow frontend to control per-page size (optional)
     max_page_size = 1000  # Limit maximum
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination: no COUNT(*) and no OFFSET, so deep pages cost the
+    same as the first one. `ordering` must end with a unique field (usually the
+    primary key) so rows sharing a timestamp are never skipped or repeated.
+
+    Response: {"next": <url or null>, "results": [...]}
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering, page_size=6, max_page_size=None):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        if max_page_size is not None:
+            self.max_page_size = max_page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self._after(self.decode_cursor(encoded, queryset.model)))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        values = [self._value(last, field) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    # ── cursor helpers ────────────────────────────────────────────
+    @staticmethod
+    def _field_name(field):
+        return field.lstrip('-')
+
+    def _value(self, obj, field):
+        name = self._field_name(field)
+        value = obj.pk if name == 'pk' else getattr(obj, name)
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def _after(self, values):
+        """Rows strictly after `values` in `self.ordering` (works for mixed directions)."""
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.ordering, values):
+            name = self._field_name(field)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, values):
+        raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, encoded, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            decoded = []
+            for field, value in zip(self.ordering, values):
+                name = self._field_name(field)
+                model_field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+                decoded.append(model_field.to_python(value))
+            return decoded
+        except (TypeError, ValueError, UnicodeError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class KeysetPaginationMixin:
+    """
+    Lets a list view switch to KeysetPagination per request with
+    ?pagination=cursor (or by following a `next` link that carries ?cursor=).
+    Views set `keyset_ordering`; the default pagination_class is kept otherwise.
+    """
+    keyset_ordering = None
+
+    def use_keyset_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_ordering and self.use_keyset_pagination():
+                default = self.pagination_class
+                self._paginator = KeysetPagination(
+                    self.keyset_ordering,
+                    page_size=getattr(default, 'page_size', None) or 10,
+                    max_page_size=getattr(default, 'max_page_size', None),
+                )
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -0,0 +1,81 @@
+# publications/realtime.py
+"""
+Push notification events to connected WebSocket clients (see consumers.py).
+
+Every user's sockets join the group `notifications_user_<id>`. Events are
+plain JSON:
+    {"type": "notification.created", "notification": {...}, "unread_delta": 1}
+    {"type": "unread.changed", "unread_delta": -1}
+    {"type": "unread.changed", "unread_count": 0}
+
+Pushing is best effort: without a channel layer, or if the layer is down,
+clients simply fall back to polling NotificationUnreadView.
+"""
+import logging
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def group_name(user_id):
+    return f"notifications_user_{user_id}"
+
+
+def serialize_notification(notification):
+    # Built from the row itself so pushing a batch needs no extra queries
+    return {
+        'id': notification.pk,
+        'message': notification.message,
+        'type': notification.type,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        'related_publication': notification.related_publication_id,
+        'related_task': notification.related_task_id,
+    }
+
+
+def send_to_user(user_id, payload):
+    send_to_users({user_id: [payload]})
+
+
+def send_to_users(payloads_by_user):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    send = async_to_sync(_send_all)
+    try:
+        send(channel_layer, payloads_by_user)
+    except Exception as e:
+        logger.warning(f"Failed to push notification events: {str(e)}")
+
+
+async def _send_all(channel_layer, payloads_by_user):
+    for user_id, payloads in payloads_by_user.items():
+        for payload in payloads:
+            await channel_layer.group_send(group_name(user_id), {
+                'type': 'notification.event',
+                'payload': payload,
+            })
+
+
+def push_notifications(notifications):
+    payloads = defaultdict(list)
+    for notification in notifications:
+        payloads[notification.user_id].append({
+            'type': 'notification.created',
+            'notification': serialize_notification(notification),
+            'unread_delta': 0 if notification.is_read else 1,
+        })
+    send_to_users(payloads)
+
+
+def push_unread_delta(user_id, delta):
+    if delta:
+        send_to_user(user_id, {'type': 'unread.changed', 'unread_delta': delta})
+
+
+def push_unread_count(user_id, count):
+    send_to_user(user_id, {'type': 'unread.changed', 'unread_count': count})
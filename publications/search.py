@@ -0,0 +1,267 @@
+# publications/search.py
+"""
+Full-text search for publications.
+
+Every Publication has a PublicationSearchDocument holding the weighted text we
+search on (title > keywords/authors/doi > abstract > manuscript body). The
+document is refreshed from the post_save signal in publications/signals.py and
+can be rebuilt with `python manage.py rebuild_search_index`.
+
+Two backends share the same interface:
+    * PostgresSearchBackend – tsvector column + GIN index, ts_rank + ts_headline
+    * SQLiteSearchBackend   – FTS5 virtual table, bm25() + snippet()
+
+The backend is picked from the database vendor unless
+settings.PUBLICATION_SEARCH_BACKEND points at a backend class.
+
+`search_snippet` is raw document text with the matches between two private-use
+markers; highlight() turns it into HTML for the API: the text is escaped and
+only the markers become <mark>…</mark>.
+"""
+import html
+import re
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Case, When, Value, F, FloatField, TextField
+from django.utils.module_loading import import_string
+
+from .models import PublicationSearchDocument
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# Placed around matches by the database, swapped for the tags above once the text is escaped
+_MATCH_START = "\ue000"
+_MATCH_STOP = "\ue001"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query):
+    """Split a raw search string into safe search terms (max 10)."""
+    return _TERM_RE.findall(query or "")[:10]
+
+
+def highlight(snippet):
+    """HTML for a backend snippet: escaped text with the matches wrapped in <mark>."""
+    if not snippet:
+        return snippet
+    return html.escape(snippet).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def build_document_fields(publication):
+    """Collect the text that should be searchable for a publication."""
+    authors = []
+    if publication.author_id and publication.author.full_name:
+        authors.append(publication.author.full_name)
+    authors.extend(name for name in (publication.co_author_names or []) if name)
+
+    return {
+        "title": publication.title or "",
+        "keywords": (publication.keywords or "").replace(",", " "),
+        "authors": " ".join(authors),
+        # DOIs look like 10.1234/abcd – index the parts so they can be matched term by term
+        "doi": " ".join(tokenize(publication.doi or "")),
+        "abstract": publication.abstract or "",
+        "body": manuscript_text(publication),
+    }
+
+
+def manuscript_text(publication):
+    """Text extracted from the uploaded manuscript (publications/ingestion.py), if any."""
+    try:
+        return publication.manuscript.text or ""
+    except ObjectDoesNotExist:
+        return ""
+
+
+class BaseSearchBackend:
+    """Interface shared by the search backends."""
+
+    def index(self, publication):
+        fields = build_document_fields(publication)
+        document, _ = PublicationSearchDocument.objects.update_or_create(
+            publication_id=publication.pk,
+            defaults=fields,
+        )
+        self.index_document(document)
+        return document
+
+    def index_document(self, document):
+        raise NotImplementedError
+
+    def remove(self, publication_id):
+        PublicationSearchDocument.objects.filter(publication_id=publication_id).delete()
+
+    def search(self, queryset, query):
+        """
+        Restrict `queryset` to publications matching `query`, ordered by relevance.
+        Each result is annotated with `search_rank` and `search_snippet` (see highlight()).
+        """
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    def __init__(self):
+        self.config = getattr(settings, "PUBLICATION_SEARCH_CONFIG", "english")
+
+    def index_document(self, document):
+        from django.contrib.postgres.search import SearchVector
+
+        vector = (
+            SearchVector("title", weight="A", config=self.config)
+            + SearchVector("keywords", weight="B", config=self.config)
+            + SearchVector("authors", weight="B", config=self.config)
+            + SearchVector("doi", weight="B", config="simple")
+            + SearchVector("abstract", weight="C", config=self.config)
+            + SearchVector("body", weight="D", config=self.config)
+        )
+        PublicationSearchDocument.objects.filter(pk=document.pk).update(search_vector=vector)
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchHeadline
+
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+
+        # Prefix match on every term so results update while the user is typing
+        ts_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=self.config,
+        )
+        return queryset.filter(
+            search_document__search_vector=ts_query
+        ).annotate(
+            search_rank=SearchRank(F("search_document__search_vector"), ts_query),
+            search_snippet=SearchHeadline(
+                "search_document__abstract",
+                ts_query,
+                config=self.config,
+                start_sel=_MATCH_START,
+                stop_sel=_MATCH_STOP,
+                max_words=35,
+                min_words=15,
+            ),
+        ).order_by("-search_rank", "-publication_date")
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    FTS5 fallback used in development and tests. The virtual table is created by
+    migration 0012 and holds one row per publication.
+    """
+    table = "publications_search_fts"
+    # bm25 weights, one per column: publication_id, title, keywords, authors, doi, abstract, body
+    weights = (0.0, 10.0, 5.0, 4.0, 4.0, 2.0, 1.0)
+
+    def index_document(self, document):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE publication_id = %s", [document.publication_id])
+            cursor.execute(
+                f"INSERT INTO {self.table} (publication_id, title, keywords, authors, doi, abstract, body) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                [
+                    document.publication_id,
+                    document.title,
+                    document.keywords,
+                    document.authors,
+                    document.doi,
+                    document.abstract,
+                    document.body,
+                ],
+            )
+
+    def remove(self, publication_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE publication_id = %s", [publication_id])
+        super().remove(publication_id)
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(w) for w in self.weights)
+        limit = getattr(settings, "PUBLICATION_SEARCH_MAX_RESULTS", 500)
+
+        # Page through the matches in rank order, keeping only those `queryset`
+        # lets through, so hidden publications never use up the result limit
+        rows = []
+        offset = 0
+        with connection.cursor() as cursor:
+            while len(rows) < limit:
+                cursor.execute(
+                    f"SELECT publication_id, bm25({self.table}, {weights}), "
+                    f"snippet({self.table}, -1, %s, %s, '…', 24) "
+                    f"FROM {self.table} WHERE {self.table} MATCH %s ORDER BY 2 LIMIT %s OFFSET %s",
+                    [_MATCH_START, _MATCH_STOP, match, limit, offset],
+                )
+                page = cursor.fetchall()
+                visible = set(queryset.filter(pk__in=[row[0] for row in page]).values_list("pk", flat=True))
+                rows.extend(row for row in page if row[0] in visible)
+                if len(page) < limit:
+                    break
+                offset += limit
+        rows = rows[:limit]
+
+        if not rows:
+            return queryset.none()
+
+        # bm25() is "lower is better"; flip it so search_rank means the same on both backends
+        return queryset.filter(
+            pk__in=[row[0] for row in rows]
+        ).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(-score)) for pk, score, _ in rows],
+                output_field=FloatField(),
+            ),
+            search_snippet=Case(
+                *[When(pk=pk, then=Value(snippet)) for pk, _, snippet in rows],
+                default=Value(""),
+                output_field=TextField(),
+            ),
+        ).order_by("-search_rank", "-publication_date")
+
+
+_VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, "PUBLICATION_SEARCH_BACKEND", None)
+        if backend_path:
+            backend_class = import_string(backend_path)
+        else:
+            backend_class = _VENDOR_BACKENDS.get(connection.vendor)
+            if backend_class is None:
+                raise NotImplementedError(f"No publication search backend for database '{connection.vendor}'.")
+        _backend = backend_class()
+    return _backend
+
+
+def index_publication(publication):
+    try:
+        get_search_backend().index(publication)
+    except Exception as e:
+        # Search must never break saving a publication; rebuild_search_index repairs gaps
+        logger.error(f"Failed to index publication {publication.pk}: {str(e)}")
+
+
+def remove_publication(publication_id):
+    try:
+        get_search_backend().remove(publication_id)
+    except Exception as e:
+        logger.error(f"Failed to remove publication {publication_id} from search index: {str(e)}")
@@ -1,13 +1,39 @@
 from rest_framework import serializers
-from .models import Publication, ReviewHistory, Category, Views, Notification
+from .models import Publication, ReviewHistory, Category, Views, Notification, UploadSession, UploadTicket
+from .uploads import upload_error, rules_error, max_chunk_size
+from . import direct_uploads
+from .search import highlight
+from rest_framework.exceptions import PermissionDenied
 from payments.models import Subscription, Payment
+from payments.utils import paid_publication_ids
 import logging
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 from accounts.models import User
 from django.db import models
+from django.urls import reverse
 
 logger = logging.getLogger(__name__)
 
+
+class DownloadURLField(serializers.FileField):
+    """
+    Accepts uploads like a FileField but is read back as the asset's
+    PublicationDownloadView URL, never the storage URL, so every download goes
+    through the access check and is counted.
+    """
+
+    def __init__(self, asset, **kwargs):
+        self.asset = asset
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = reverse('publication-download', kwargs={'pk': value.instance.pk, 'asset': self.asset})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -22,6 +48,23 @@ class ViewsSerializer(serializers.ModelSerializer):
     def get_user(self, obj):
         return obj.user.full_name if obj.user else None
 
+class PublicationListSerializer(serializers.ListSerializer):
+    """
+    Batches the per-row lookups of PublicationSerializer for a whole page.
+    Pair with a queryset using select_related('author', 'editor', 'category').
+    """
+
+    def to_representation(self, data):
+        publications = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        request = self.context.get('request')
+        if request is not None and 'paid_publication_ids' not in self.context:
+            # One Payment query for the page instead of one EXISTS per row in get_has_paid
+            self.context['paid_publication_ids'] = paid_publication_ids(
+                request.user, [publication.pk for publication in publications]
+            )
+        return super().to_representation(publications)
+
+
 class PublicationSerializer(serializers.ModelSerializer):
     category_name = serializers.ChoiceField(choices=Category.CATEGORY_CHOICES, write_only=True)
     category_labels = serializers.SerializerMethodField(read_only=True)
@@ -31,18 +74,23 @@ class PublicationSerializer(serializers.ModelSerializer):
     editor = serializers.SerializerMethodField(read_only=True)
     keywords = serializers.CharField(required=False, allow_blank=True)
     rejection_note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-    video_file = serializers.FileField(required=False, allow_null=True)
+    file = DownloadURLField('file', required=False, max_length=100)
+    video_file = DownloadURLField('video', required=False, allow_null=True)
     is_free_review = serializers.BooleanField(default=False)  # Editable for resubmissions
     rejection_count = serializers.IntegerField(read_only=True)
     has_paid = serializers.SerializerMethodField()
-    annotated_file = serializers.FileField(required=False, allow_null=True)
+    annotated_file = DownloadURLField('annotated', required=False, allow_null=True)
     cover_image = serializers.ImageField(required=False, allow_null=True)
     co_authors_input = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
     co_authors = serializers.SerializerMethodField(read_only=True)
     volume = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    search_snippet = serializers.SerializerMethodField(read_only=True)
+    total_likes = serializers.IntegerField(source='likes_count', read_only=True)
+    total_dislikes = serializers.IntegerField(source='dislikes_count', read_only=True)
 
     class Meta:
         model = Publication
+        list_serializer_class = PublicationListSerializer
         fields = [
             "id",
             "doi", 
@@ -50,7 +98,10 @@ class PublicationSerializer(serializers.ModelSerializer):
             "abstract",
             "content",
             "file",
+            "page_count",
+            "manuscript_preview",
             "cover_image",
+            "cover_image_renditions",
             "co_authors",
             "co_authors_input",
             "has_paid",
@@ -60,6 +111,7 @@ class PublicationSerializer(serializers.ModelSerializer):
             "category_labels",  # Output field
             "keywords",
             "views",
+            "downloads",
             "view_stats",
             "is_free_review",
             "status",
@@ -74,11 +126,16 @@ class PublicationSerializer(serializers.ModelSerializer):
             'annotated_file', 
             'editor_comments',
             "volume",
+            "search_snippet",
         ]
         read_only_fields = [
             "author",
             "doi", 
+            "cover_image_renditions",
+            "page_count",
+            "manuscript_preview",
             "views",
+            "downloads",
             "created_at",
             "updated_at",
             "view_stats",
@@ -122,12 +179,6 @@ class PublicationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(f"Cannot transition from {instance.status} to {value}.")
         return value
 
-    def get_total_likes(self, obj):
-        return obj.total_likes()
-
-    def get_total_dislikes(self, obj):
-        return obj.total_dislikes()
-
     def create(self, validated_data):
         logger.info(f"Creating publication with validated_data: {validated_data}")
 
@@ -259,26 +310,10 @@ class PublicationSerializer(serializers.ModelSerializer):
 
         instance.save()
         
-         # >>> ADDED FOR NOTIFICATIONS + HISTORY
+         # >>> ADDED FOR HISTORY (status notifications come from the post_save signal)
         new_status = instance.status
 
         if old_status != new_status:
-            msg_map = {
-                "approved": f"Your publication '{instance.title}' has been approved.",
-                "rejected": f"Your publication '{instance.title}' has been rejected.",
-                "under_review": f"Your publication '{instance.title}' is now under review.",
-                "pending": f"Your publication '{instance.title}' has been resubmitted.",
-            }
-
-            # Save notification
-            if new_status in msg_map:
-                Notification.objects.create(
-                    user=instance.author,
-                    message=msg_map[new_status],
-                    type="publication",
-                    related_publication=instance
-                )
-
             # Save editor action history
             if request.user.role == "editor":
                 ReviewHistory.objects.create(
@@ -292,13 +327,15 @@ class PublicationSerializer(serializers.ModelSerializer):
     
 
     def get_has_paid(self, obj):
-        user = self.context['request'].user
-        return Payment.objects.filter(
-            user=user,
-            payment_type='review_fee',
-            metadata__publication_id=str(obj.id),
-            status='success'
-        ).exists()
+        paid_ids = self.context.get('paid_publication_ids')
+        if paid_ids is not None:
+            return str(obj.id) in paid_ids
+
+        return obj.pk in paid_publication_ids(self.context['request'].user, [obj.pk])
+
+    def get_search_snippet(self, obj):
+        # Only present when the queryset came from the search backend
+        return highlight(getattr(obj, 'search_snippet', None))
 
     def get_category_labels(self, obj):
         return obj.category.get_name_display() if obj.category else None
@@ -350,18 +387,16 @@ class PublicationSerializer(serializers.ModelSerializer):
 
     def validate_file(self, value):
         if value:
-            if value.size > 10 * 1024 * 1024:  # 10MB limit
-                raise serializers.ValidationError("File size cannot exceed 10MB.")
-            if not value.name.lower().endswith(('.pdf', '.doc', '.docx')):
-                raise serializers.ValidationError("Only PDF and Word documents are allowed.")
+            error = upload_error('file', value.name, value.size)  # 10MB, PDF/Word
+            if error:
+                raise serializers.ValidationError(error)
         return value
 
     def validate_video_file(self, value):
         if value:
-            if value.size > 50 * 1024 * 1024:  # 50MB limit
-                raise serializers.ValidationError("Video file size cannot exceed 50MB.")
-            if not value.name.lower().endswith(('.mp4', '.avi', '.mov')):
-                raise serializers.ValidationError("Only MP4, AVI, or MOV video files are allowed.")
+            error = upload_error('video_file', value.name, value.size)  # 50MB, MP4/AVI/MOV
+            if error:
+                raise serializers.ValidationError(error)
         return value
 
     def validate_keywords(self, value):
@@ -439,4 +474,69 @@ class ReviewHistorySerializer(serializers.ModelSerializer):
         fields = ['id', 'publication', 'publication_title', 'author_name', 'editor_name', 'action', 'note', 'timestamp', 'rejection_count']
         read_only_fields = fields
         
-    
\ No newline at end of file
+    
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id',
+            'publication',
+            'field',
+            'filename',
+            'size',
+            'offset',
+            'chunk_size',
+            'status',
+            'stored_name',
+            'error',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = ['id', 'offset', 'status', 'stored_name', 'error', 'created_at', 'updated_at']
+
+    def get_chunk_size(self, obj):
+        return max_chunk_size()
+
+    def validate_publication(self, value):
+        if value.author_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("You can only upload files to your own publications.")
+        return value
+
+    def validate(self, data):
+        error = upload_error(data['field'], data['filename'], data['size'])
+        if error:
+            raise serializers.ValidationError(error)
+        return data
+
+
+class UploadTicketRequestSerializer(serializers.Serializer):
+    target = serializers.CharField()
+    object_id = serializers.CharField(max_length=64)
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate(self, data):
+        target = direct_uploads.get_target(data['target'])
+        if target is None:
+            raise serializers.ValidationError({'target': f"Unknown target. Choose one of: {', '.join(direct_uploads.target_labels())}."})
+        obj = target.get_object(data['object_id'])
+        if obj is None:
+            raise serializers.ValidationError({'object_id': "Object not found."})
+        if not target.can_attach(self.context['request'].user, obj):
+            raise PermissionDenied("You cannot upload files to this object.")
+        error = rules_error(target.rules, data['filename'], data['size'])
+        if error:
+            raise serializers.ValidationError(error)
+        data['target'] = target
+        data['object'] = obj
+        return data
+
+
+class UploadTicketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadTicket
+        fields = ['id', 'target', 'object_id', 'filename', 'size', 'key', 'status', 'error', 'expires_at', 'created_at']
+        read_only_fields = fields
@@ -1,63 +1,82 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Publication, Notification, User
+from payments.models import Payment
+from payments.utils import invalidate_paid_publications
+from config import renditions
+from .models import Publication, Notification
+from .notifications import notify, notify_editors, notifications_created, invalidate_unread
+from .realtime import push_notifications
+from .search import index_publication, remove_publication
+from . import stats, ingestion, direct_uploads, leaderboard
+
+# Author-facing wording per status; anything else falls back to the generic message
+STATUS_MESSAGES = {
+    "approved": "Your publication '{title}' has been approved.",
+    "rejected": "Your publication '{title}' has been rejected.",
+    "under_review": "Your publication '{title}' is now under review.",
+    "pending": "Your publication '{title}' has been resubmitted.",
+}
+
 
 @receiver(post_save, sender=Publication)
 def handle_publication_notifications(sender, instance, created, **kwargs):
     """
-    Signal handler to create notifications for new publications and status changes.
-    This replaces the notification logic previously in Publication.save().
+    Notify editors about new submissions and the author plus editors about
+    status changes. Rows are queued through publications.notifications, so
+    they are bulk-written once the transaction commits and duplicates raised
+    elsewhere in the same transaction collapse into one.
     """
     publication = instance
-    old_status = None
-
-    if not created:
-        # For updates, we need to compare with previous status.
-        # Signals don't provide old instance directly, so we can use a pre_save signal if needed,
-        # but for simplicity, assume we fetch it (though this might not be atomic).
-        # Better approach: Use a pre_save to store old_status in a thread-local or instance attr.
-        # But for now, we'll mimic the original logic by checking if status changed.
-        # Note: This assumes status is only changed via save, and we compare post-save.
-        pass  # We'll handle created separately, and for updates, rely on kwargs or custom logic.
+    now = timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')
 
     if created:
-        # Notify editors for new submission
-        editors = User.objects.filter(role='editor')
-        if editors.exists():
-            for editor in editors:
-                Notification.objects.create(
-                    user=editor,
-                    message=f"New publication '{publication.title}' submitted for review by {publication.author.full_name} at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}.",
-                    related_publication=publication
-                )
-        else:
-            Notification.objects.create(
-                user=publication.author,
-                message=f"No editors available to review your publication '{publication.title}' submitted at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}. Please contact an administrator.",
-                related_publication=publication
+        # Notify editors for new submission (an author who is an editor is notified too, as one of them)
+        queued = notify_editors(
+            f"New publication '{publication.title}' submitted for review by {publication.author.full_name} at {now}.",
+            kind="publication",
+            publication=publication,
+        )
+        if not queued:
+            notify(
+                publication.author_id,
+                f"No editors available to review your publication '{publication.title}' submitted at {now}. Please contact an administrator.",
+                kind="publication",
+                publication=publication,
             )
-    else:
-        # For updates: We need to check if status changed.
-        # Since post_save doesn't have old_instance, we can add a custom instance attr in pre_save.
-        # For this example, assume we have a way to detect status change (or move full logic here).
-        # To make it work properly, we'll add a pre_save signal below to store old_status.
-        if hasattr(publication, '_old_status') and publication._old_status != publication.status:
-            old_status = publication._old_status
-            # Notify author
-            Notification.objects.create(
-                user=publication.author,
-                message=f"Your publication '{publication.title}' status changed to '{publication.get_status_display()}' at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}.",
-                related_publication=publication
-            )
-            # Notify editors
-            editors = User.objects.filter(role='editor')
-            for editor in editors:
-                Notification.objects.create(
-                    user=editor,
-                    message=f"Publication '{publication.title}' status updated to '{publication.get_status_display()}' at {timezone.now().strftime('%I:%M %p WAT, %B %d, %Y')}.",
-                    related_publication=publication
-                )
+        return
+
+    # _old_status is stored by the pre_save receiver below
+    if hasattr(publication, '_old_status') and publication._old_status != publication.status:
+        template = STATUS_MESSAGES.get(
+            publication.status,
+            "Your publication '{title}' status changed to '{status}' at {now}.",
+        )
+        notify(
+            publication.author_id,
+            template.format(title=publication.title, status=publication.get_status_display(), now=now),
+            kind="publication",
+            publication=publication,
+        )
+        # Editors get one row each; an author who is also an editor only gets the message above
+        notify_editors(
+            f"Publication '{publication.title}' status updated to '{publication.get_status_display()}' at {now}.",
+            kind="publication",
+            publication=publication,
+            exclude=publication.author_id,
+        )
+
+
+@receiver(notifications_created)
+def push_created_notifications(sender, notifications, **kwargs):
+    push_notifications(notifications)
+
+
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    if not instance.is_read:
+        invalidate_unread([instance.user_id])
 
 
 from django.db.models.signals import pre_save
@@ -66,15 +85,94 @@ from django.db.models.signals import pre_save
 def store_old_status(sender, instance, **kwargs):
     """
     Pre-save signal to store the old status for comparison in post_save.
+    Read from the instance's field snapshot (publications/tracking.py), not the database.
+    """
+    instance._old_status = instance.previous('status')
+
+@receiver(post_save, sender=Publication)
+def update_search_document(sender, instance, **kwargs):
+    """
+    Keep the publication's search document in sync. Runs after commit so a
+    rolled-back save never leaks into the index.
     """
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            instance._old_status = old_instance.status
-        except sender.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+    transaction.on_commit(lambda: index_publication(instance))
+
+
+@receiver(post_delete, sender=Publication)
+def remove_search_document(sender, instance, **kwargs):
+    publication_id = instance.pk
+    transaction.on_commit(lambda: remove_publication(publication_id))
+
+@receiver(post_save, sender=Publication)
+def update_publication_stats(sender, instance, created, **kwargs):
+    if created:
+        stats.record_publication_status(instance, None, instance.status)
+    elif hasattr(instance, '_old_status'):
+        stats.record_publication_status(instance, instance._old_status, instance.status)
+
+
+@receiver(post_delete, sender=Publication)
+def remove_publication_stats(sender, instance, **kwargs):
+    stats.record_publication_status(instance, instance.status, None)
+
+
+@receiver(post_save, sender=Publication)
+def flag_publication_leaderboard(sender, instance, created, **kwargs):
+    old_status = None if created else getattr(instance, '_old_status', instance.status)
+    if old_status != instance.status and 'approved' in (old_status, instance.status):
+        leaderboard.mark_stale('publications')
+
+
+@receiver(post_delete, sender=Publication)
+def flag_leaderboards_on_delete(sender, instance, **kwargs):
+    if instance.status == 'approved':
+        leaderboard.mark_stale('publications')
+    if instance.views:
+        leaderboard.mark_stale('views')
+
+
+@receiver(pre_save, sender=Payment)
+def store_old_payment_status(sender, instance, **kwargs):
+    instance._old_status = instance.previous('status')
+
+
+@receiver(post_save, sender=Payment)
+def update_payment_stats(sender, instance, **kwargs):
+    stats.record_payment_status(instance, getattr(instance, '_old_status', None), instance.status)
+
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_stats(sender, instance, **kwargs):
+    stats.record_payment_status(instance, instance.status, None)
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_paid_publications_cache(sender, instance, **kwargs):
+    invalidate_paid_publications(instance.user_id)
+
+
+@receiver(post_save, sender=Publication)
+def ingest_manuscript(sender, instance, created, **kwargs):
+    """Extract text, page count and previews after a new or replaced manuscript upload."""
+    changed = bool(instance.file) if created else instance.has_changed('file')
+    if changed:
+        ingestion.schedule(instance.pk)
+
+
+# Regenerate cover thumbnails whenever cover_image changes
+renditions.register(Publication, 'cover_image', 'cover_image_renditions', renditions.COVER_SIZES)
+
+# Direct-to-storage upload targets: authors upload their own files, editors annotate
+for field_name in ('file', 'video_file', 'cover_image'):
+    direct_uploads.register_target(
+        f'publication.{field_name}', Publication, field_name,
+        lambda user, publication: publication.author_id == user.pk,
+    )
+direct_uploads.register_target(
+    'publication.annotated_file', Publication, 'annotated_file',
+    lambda user, publication: user.role in ('editor', 'admin'),
+)
+
 
 # If you have Conference in a separate app, you can add similar signals for it.
 # For example, in conferences/signals.py:
@@ -0,0 +1,155 @@
+# publications/stats.py
+"""
+Materialized dashboard counters for PublicationStatsView.
+
+Instead of running a dozen COUNT/SUM queries on every dashboard poll, the
+totals live in DashboardStat rows that are bumped with F() updates whenever a
+publication is created/deleted or changes status, or a payment enters or
+leaves the 'success' state. Likes and dislikes are not materialized here: a
+single global row would be locked by every reaction toggle, so the totals are
+summed from the per-publication likes_count/dislikes_count columns (see
+Views.set_reaction) when the summary is built. Reads go through a short TTL
+cache (settings.STATS_CACHE_TTL).
+
+`rebuild()` recomputes everything from the source tables; it backs the
+`rebuild_dashboard_stats` management command and repairs any drift (for
+example after bulk UPDATEs that bypass model signals). It replaces every row,
+so bumps made while it runs are lost: run it by hand when drift is suspected,
+not on every deploy.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import DashboardStat, Publication
+
+SUMMARY_CACHE_KEY = "publications:dashboard-summary"
+
+STATUSES = [choice[0] for choice in Publication.STATUS_CHOICES]
+FEE_TYPES = ['publication_fee', 'review_fee']
+
+
+def month_key(value):
+    # Same bucketing as TruncMonth('created_at') in the current time zone
+    return timezone.localtime(value).strftime('%Y-%m') if value else 'N/A'
+
+
+def bump(scope, key, count=0, amount=0):
+    """Atomically add `count`/`amount` to a DashboardStat row, creating it if needed."""
+    updated = DashboardStat.objects.filter(scope=scope, key=key).update(
+        count=F('count') + count,
+        amount=F('amount') + amount,
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                DashboardStat.objects.create(scope=scope, key=key, count=count, amount=amount)
+        except IntegrityError:
+            # Someone else created the row in the meantime
+            DashboardStat.objects.filter(scope=scope, key=key).update(
+                count=F('count') + count,
+                amount=F('amount') + amount,
+            )
+    cache.delete(SUMMARY_CACHE_KEY)
+
+
+def record_publication_status(publication, old_status, new_status):
+    """Move a publication between status buckets (None means created/deleted)."""
+    if old_status == new_status:
+        return
+    month = month_key(publication.created_at)
+    if old_status:
+        bump('status', old_status, count=-1)
+        bump('month', f"{month}:{old_status}", count=-1)
+    if new_status:
+        bump('status', new_status, count=1)
+        bump('month', f"{month}:{new_status}", count=1)
+
+
+def record_payment_status(payment, old_status, new_status):
+    """Count a payment's amount only while it is successful."""
+    was_success = old_status == 'success'
+    is_success = new_status == 'success'
+    if was_success == is_success:
+        return
+    sign = 1 if is_success else -1
+    bump('fee', payment.payment_type, count=sign, amount=sign * Decimal(payment.amount or 0))
+
+
+def get_summary():
+    """
+    Dashboard totals as plain data:
+        {'status': {...}, 'total': n, 'likes': n, 'dislikes': n,
+         'months': [{'month': 'YYYY-MM', 'total': n, <status>: n, ...}],
+         'fees': {'publication_fee': {'count': n, 'amount': Decimal}, ...}}
+    """
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is not None:
+        return summary
+
+    rows = DashboardStat.objects.values_list('scope', 'key', 'count', 'amount')
+
+    status_counts = {status: 0 for status in STATUSES}
+    months = defaultdict(lambda: {status: 0 for status in STATUSES})
+    fees = {fee: {'count': 0, 'amount': Decimal('0')} for fee in FEE_TYPES}
+
+    for scope, key, count, amount in rows:
+        if scope == 'status':
+            status_counts[key] = count
+        elif scope == 'month':
+            month, _, status = key.partition(':')
+            months[month][status] = count
+        elif scope == 'fee':
+            fees[key] = {'count': count, 'amount': amount}
+
+    reactions = Publication.objects.aggregate(likes=Sum('likes_count'), dislikes=Sum('dislikes_count'))
+
+    month_list = []
+    for month in sorted(months):
+        counts = months[month]
+        total = sum(counts.values())
+        if total:
+            month_list.append({'month': month, 'total': total, **counts})
+
+    summary = {
+        'status': status_counts,
+        'total': sum(status_counts.values()),
+        'likes': reactions['likes'] or 0,
+        'dislikes': reactions['dislikes'] or 0,
+        'months': month_list,
+        'fees': fees,
+    }
+    cache.set(SUMMARY_CACHE_KEY, summary, getattr(settings, 'STATS_CACHE_TTL', 30))
+    return summary
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every DashboardStat row from Publication and Payment."""
+    from payments.models import Payment
+
+    stats = []
+    for row in Publication.objects.values('status').annotate(n=Count('id')):
+        stats.append(DashboardStat(scope='status', key=row['status'], count=row['n']))
+
+    monthly = Publication.objects.annotate(month=TruncMonth('created_at'))\
+        .values('month', 'status').annotate(n=Count('id'))
+    for row in monthly:
+        month = row['month'].strftime('%Y-%m') if row['month'] else 'N/A'
+        stats.append(DashboardStat(scope='month', key=f"{month}:{row['status']}", count=row['n']))
+
+    fees = Payment.objects.filter(status='success').values('payment_type')\
+        .annotate(n=Count('id'), total=Sum('amount'))
+    for row in fees:
+        stats.append(DashboardStat(scope='fee', key=row['payment_type'], count=row['n'], amount=row['total'] or 0))
+
+    DashboardStat.objects.all().delete()
+    DashboardStat.objects.bulk_create(stats)
+    cache.delete(SUMMARY_CACHE_KEY)
+    return len(stats)
@@ -1,3 +1,1144 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Case, Value, When
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from PIL import Image
+import docx
+import fitz
+
+from accounts.models import User
+from payments.models import Payment
+from config import renditions
+
+from . import extraction, notifications, stats, uploads
+from .models import (
+    DashboardStat, Notification, Publication, PublicationManuscript, Category, UploadSession, Views,
+)
+from .counters import BufferedCounter
+from .pagination import KeysetPagination
+from .search import PostgresSearchBackend, get_search_backend, highlight
+from .notifications import notify
+
+
+def make_user(email, full_name, **fields):
+    """A user who has accepted the agreement; every test user has the password "Secret#123"."""
+    return User.objects.create_user(email=email, password="Secret#123", agreement=True, full_name=full_name, **fields)
+
+
+def make_publication(author, title, **fields):
+    fields.setdefault("abstract", "a" * 250)  # long enough for PublicationSerializer.validate_abstract
+    return Publication.objects.create(title=title, author=author, **fields)
+
+
+class PublicationListQueryCountTests(TestCase):
+    """Serializing a page of publications must not run queries per row."""
+
+    def setUp(self):
+        self.user = make_user("author@example.org", "Page Author")
+        self.editor = make_user("editor@example.org", "Page Editor", role="editor")
+        self.category = Category.objects.create(name="journal")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_publications(self, count):
+        for i in range(count):
+            publication = make_publication(
+                self.user,
+                f"Publication number {i}",
+                editor=self.editor,
+                category=self.category,
+                status="approved",
+            )
+            Payment.objects.create(
+                user=self.user,
+                reference=f"ref-{publication.pk}",
+                payment_type="review_fee",
+                amount=3000,
+                status="success",
+                metadata={"publication_id": publication.pk},
+            )
+
+    def list_publications(self, page_size):
+        return self.client.get(
+            reverse("publication-list-create"),
+            {"page_size": page_size},
+            HTTP_HOST="localhost",
+        )
+
+    def test_list_query_count_is_constant(self):
+        self.create_publications(2)
+        # COUNT for the paginator, the page itself, one batched Payment lookup
+        with self.assertNumQueries(3):
+            response = self.list_publications(page_size=2)
+        self.assertEqual(response.status_code, 200)
+
+        self.create_publications(8)
+        with self.assertNumQueries(3):
+            response = self.list_publications(page_size=10)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(row["has_paid"] for row in results))
+        self.assertTrue(all(row["editor"] == "Page Editor" for row in results))
+        self.assertTrue(all(row["category_labels"] == "Journal Article" for row in results))
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    NOTIFICATIONS_ASYNC=False,
+)
+class NotificationSocketTests(TransactionTestCase):
+    """New notifications reach the user's socket through the in-memory channel layer."""
+
+    def setUp(self):
+        self.user = make_user("reader@example.org", "Socket Reader")
+
+    def connect(self, token=None):
+        from config.asgi import application
+
+        headers = [(b"origin", b"http://localhost")]
+        if token:
+            headers.append((b"cookie", f"access_token={token}".encode()))
+        return WebsocketCommunicator(application, "/ws/notifications/", headers=headers)
+
+    async def test_rejects_anonymous_socket(self):
+        communicator = self.connect()
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_pushes_created_notifications(self):
+        communicator = self.connect(str(AccessToken.for_user(self.user)))
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {"type": "unread.changed", "unread_count": 0},
+        )
+
+        await sync_to_async(notify)(self.user, "Hello over the socket", kind="message")
+
+        event = await communicator.receive_json_from()
+        self.assertEqual(event["type"], "notification.created")
+        self.assertEqual(event["unread_delta"], 1)
+        self.assertEqual(event["notification"]["message"], "Hello over the socket")
+        await communicator.disconnect()
+
+
+class NotificationUnreadCountTests(TestCase):
+    """Cached unread counts are only ever invalidated, so they cannot drift."""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        shared = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+        self.user = make_user("counted@example.org", "Counted Reader")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def send(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, message, kind="message")
+
+    def test_cached_count_follows_writes(self):
+        self.send("first")
+        self.assertEqual(notifications.unread_count(self.user.pk), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.user.pk), 1)
+        self.send("second")
+        self.assertEqual(notifications.unread_count(self.user.pk), 2)
+
+    def test_write_while_counting_a_cold_key(self):
+        count = notifications._count_unread
+
+        def count_then_write(user_id):
+            counted = count(user_id)
+            # A notification commits after the COUNT but before the count is cached
+            self.send("raced")
+            return counted
+
+        with mock.patch.object(notifications, "_count_unread", count_then_write):
+            self.assertEqual(notifications.unread_count(self.user.pk), 0)
+        self.assertEqual(notifications.unread_count(self.user.pk), 1)
+
+    def test_mark_all_read_keeps_later_notifications(self):
+        self.send("old")
+        self.assertEqual(notifications.unread_count(self.user.pk), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/notifications/mark-all-read/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/api/notifications/unread/").data["unread_count"], 0)
+
+        self.send("new")
+        self.assertEqual(self.client.get("/api/notifications/unread/").data["unread_count"], 1)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_not_trusted(self):
+        self.send("first")
+        notifications.unread_count(self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.unread_count(self.user.pk), 1)
+
+
+class NotificationBatchTests(TestCase):
+    """notify() writes on commit, once per recipient and event, and never for rolled-back work."""
+
+    def setUp(self):
+        self.user = make_user("batched@example.org", "Batched Reader")
+
+    def messages(self):
+        return sorted(Notification.objects.filter(user=self.user).values_list("message", flat=True))
+
+    def test_written_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, "Approved", kind="publication")
+            # The same event raised again, e.g. by a signal and a serializer
+            notify([self.user, self.user.pk], "Approved", kind="publication")
+            notify(self.user, "Approved", kind="comment")
+            self.assertEqual(self.messages(), [])
+        self.assertEqual(self.messages(), ["Approved", "Approved"])
+
+        # A later transaction is not deduplicated against this one
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, "Approved", kind="publication")
+        self.assertEqual(len(self.messages()), 3)
+
+    def test_rolled_back_savepoint_is_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, "Kept", kind="message")
+            try:
+                with transaction.atomic():
+                    notify(self.user, "Rolled back", kind="message")
+                    notify(self.user, "Kept", kind="message")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            notify(self.user, "Also kept", kind="message")
+        self.assertEqual(self.messages(), ["Also kept", "Kept"])
+
+    def test_rolled_back_transaction_leaves_nothing_behind(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    notify(self.user, "Approved", kind="publication")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        with self.captureOnCommitCallbacks(execute=True):
+            notify(self.user, "Approved", kind="publication")
+        self.assertEqual(self.messages(), ["Approved"])
+
+
+    def test_submission_by_the_only_editor(self):
+        self.user.role = "editor"
+        self.user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_publication(self.user, "Self-edited")
+        messages = self.messages()
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].startswith("New publication 'Self-edited' submitted for review"))
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk any ordering without skipping or repeating rows."""
+
+    url = "/api/notifications/"
+
+    def setUp(self):
+        self.user = make_user("paged@example.org", "Paged Reader")
+        self.notifications = Notification.objects.bulk_create(
+            Notification(user=self.user, message=f"note {i}", type="message", is_read=i % 2 == 0)
+            for i in range(7)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, paginator, page_size):
+        """Every page of Notification under `paginator`, following the cursors it hands out."""
+        request = Request(APIRequestFactory().get(self.url, {"page_size": page_size}))
+        pages = []
+        while True:
+            pages.append([n.pk for n in paginator.paginate_queryset(Notification.objects.all(), request)])
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                return pages
+            request = Request(APIRequestFactory().get(next_link))
+
+    def test_cursor_round_trip(self):
+        paginator = KeysetPagination(("-created_at", "-id"))
+        notification = self.notifications[3]
+        notification.refresh_from_db()
+        cursor = paginator.encode_cursor([paginator._value(notification, f) for f in paginator.ordering])
+        self.assertEqual(
+            paginator.decode_cursor(cursor, Notification), [notification.created_at, notification.pk]
+        )
+
+    def test_mixed_directions(self):
+        paginator = KeysetPagination(("is_read", "-id"))
+        expected = list(Notification.objects.order_by("is_read", "-id").values_list("pk", flat=True))
+        pages = self.walk(paginator, 2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_timestamp_ties_across_pages(self):
+        Notification.objects.update(created_at=timezone.now())
+        expected = list(Notification.objects.order_by("-id").values_list("pk", flat=True))
+
+        seen = []
+        response = self.client.get(self.url, {"pagination": "cursor", "page_size": 3})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(n["id"] for n in response.data["results"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        paginator = KeysetPagination(("-created_at", "-id"))
+        for cursor in (
+            "not base64 json",
+            paginator.encode_cursor(["2026-01-01T00:00:00+00:00"]),
+            paginator.encode_cursor(["yesterday", 1]),
+            paginator.encode_cursor({"created_at": "2026-01-01T00:00:00+00:00"}),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(self.url, {"cursor": cursor}).status_code, 404)
+
+
+class FieldTrackerTests(TestCase):
+    """Publications remember their loaded values, so change checks need no query."""
+
+    def setUp(self):
+        self.author = make_user("tracked@example.org", "Tracked Author")
+        created = make_publication(self.author, "Tracked")
+        self.publication = Publication.objects.get(pk=created.pk)
+
+    def test_previous_values_after_loading(self):
+        publication = self.publication
+        with self.assertNumQueries(0):
+            self.assertFalse(publication.has_changed("status"))
+            publication.status = "under_review"
+            self.assertTrue(publication.has_changed("status"))
+            self.assertEqual(publication.previous("status"), "draft")
+            self.assertEqual(publication.dirty_fields(), {"status": "draft"})
+        self.assertTrue(Publication(title="New").has_changed("status"))
+        self.assertIsNone(Publication(title="New").previous("status"))
+
+    def test_snapshot_follows_saves(self):
+        publication = self.publication
+        publication.status = "under_review"
+        publication.save()
+        self.assertFalse(publication.has_changed("status"))
+        self.assertEqual(publication.previous("status"), "under_review")
+
+        # update_fields only re-snapshots the saved columns
+        publication.status = "approved"
+        publication.title = "Renamed"
+        publication.save(update_fields=["title"])
+        self.assertEqual(publication.dirty_fields(), {"status": "under_review"})
+
+    def test_snapshot_follows_refresh_from_db(self):
+        publication = self.publication
+        Publication.objects.filter(pk=publication.pk).update(status="approved", title="Changed elsewhere")
+        publication.refresh_from_db(fields=["status"])
+        self.assertEqual(publication.previous("status"), "approved")
+        self.assertEqual(publication.dirty_fields(), {})
+
+        publication.refresh_from_db()
+        self.assertEqual(publication.title, "Changed elsewhere")
+        self.assertFalse(publication.has_changed("title"))
+
+    def test_instance_built_with_a_pk_reads_previous_once(self):
+        publication = Publication(pk=self.publication.pk, status="approved")
+        publication._state.adding = False
+        with self.assertNumQueries(1):
+            self.assertEqual(publication.previous("status"), "draft")
+            self.assertTrue(publication.has_changed("status"))
+
+    def test_save_dirty_writes_only_changed_columns(self):
+        publication = self.publication
+        with self.assertNumQueries(0):
+            self.assertIsNone(publication.save_dirty())
+
+        Publication.objects.filter(pk=publication.pk).update(abstract="b" * 250)
+        publication.title = "Only the title"
+        with CaptureQueriesContext(connection) as queries:
+            publication.save_dirty()
+        update = next(q["sql"] for q in queries if q["sql"].startswith("UPDATE"))
+        self.assertIn('"title"', update)
+        self.assertIn('"updated_at"', update)
+        self.assertNotIn('"abstract"', update)
+        publication.refresh_from_db()
+        self.assertEqual((publication.title, publication.abstract), ("Only the title", "b" * 250))
+
+
+class LocalMediaMixin:
+    """Keep uploads and generated files on the local filesystem instead of Cloudinary."""
+
+    local_media_fields = ()
+
+    def use_local_media(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage = FileSystemStorage(location=self.media_root, base_url="/media/")
+
+        for name in self.local_media_fields:
+            patcher = mock.patch.object(Publication._meta.get_field(name), "storage", storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        settings_override = override_settings(
+            BACKGROUND_TASKS_EAGER=True,
+            RENDITION_STORAGE={
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": self.media_root, "base_url": "/media/"},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        renditions.reset_storage()
+        self.addCleanup(renditions.reset_storage)
+
+
+class CoverRenditionTests(LocalMediaMixin, TestCase):
+    """Saving a cover image produces fixed-size WebP renditions."""
+
+    local_media_fields = ("cover_image",)
+
+    def setUp(self):
+        self.use_local_media()
+        self.author = make_user("cover@example.org", "Cover Author")
+        self.category = Category.objects.create(name="journal")
+
+    def jpeg(self, size=(1600, 1200)):
+        buffer = BytesIO()
+        Image.new("RGB", size, (200, 40, 40)).save(buffer, format="JPEG")
+        return SimpleUploadedFile("cover.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_generates_renditions_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publication = make_publication(
+                self.author,
+                "A publication with a cover",
+                category=self.category,
+                cover_image=self.jpeg(),
+            )
+
+        publication.refresh_from_db()
+        result = publication.cover_image_renditions
+        self.assertEqual(result["source"], publication.cover_image.name)
+        self.assertEqual(set(result) - {"source"}, set(renditions.COVER_SIZES))
+        for name, size in renditions.COVER_SIZES.items():
+            path = result[name]["webp"].removeprefix("/media/")
+            with Image.open(f"{self.media_root}/{path}") as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.size, size)
+
+    def test_removing_cover_clears_renditions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publication = make_publication(
+                self.author,
+                "A publication with a cover",
+                category=self.category,
+                cover_image=self.jpeg(),
+            )
+        publication.refresh_from_db()
+        self.assertTrue(publication.cover_image_renditions)
+
+        publication.cover_image = None
+        publication.save()
+        publication.refresh_from_db()
+        self.assertEqual(publication.cover_image_renditions, {})
+
+
+class ManuscriptIngestionTests(LocalMediaMixin, TestCase):
+    """Uploaded manuscripts are turned into searchable text, a page count and previews."""
+
+    local_media_fields = ("file",)
+
+    def setUp(self):
+        self.use_local_media()
+        self.author = make_user("manuscript@example.org", "Manuscript Author")
+        self.category = Category.objects.create(name="journal")
+
+    def pdf(self, pages):
+        document = fitz.open()
+        for text in pages:
+            document.new_page().insert_text((72, 72), text)
+        content = document.tobytes()
+        document.close()
+        return SimpleUploadedFile("manuscript.pdf", content, content_type="application/pdf")
+
+    def create_publication(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_publication(
+                self.author,
+                "A manuscript upload",
+                category=self.category,
+                status="approved",
+                file=file,
+            )
+
+    def test_pdf_text_pages_and_preview(self):
+        publication = self.create_publication(self.pdf(["Photosynthetic quokkas", "Second page"]))
+
+        publication.refresh_from_db()
+        self.assertEqual(publication.page_count, 2)
+        self.assertEqual(publication.manuscript.status, "done")
+        self.assertIn("Photosynthetic quokkas", publication.manuscript.text)
+        self.assertIn("Second page", publication.manuscript.text)
+        path = publication.manuscript_preview["thumb"].removeprefix("/media/")
+        with Image.open(f"{self.media_root}/{path}") as image:
+            self.assertEqual(image.format, "PNG")
+            self.assertEqual(image.width, extraction.PREVIEW_WIDTHS["thumb"])
+
+        # The manuscript body is searchable
+        results = get_search_backend().search(Publication.objects.all(), "quokkas")
+        self.assertEqual([p.pk for p in results], [publication.pk])
+
+    def test_docx_text(self):
+        document = docx.Document()
+        document.add_paragraph("Heliotropic wombats in the wild")
+        buffer = BytesIO()
+        document.save(buffer)
+        upload = SimpleUploadedFile("manuscript.docx", buffer.getvalue())
+
+        publication = self.create_publication(upload)
+
+        manuscript = PublicationManuscript.objects.get(publication=publication)
+        self.assertEqual(manuscript.status, "done")
+        self.assertIn("Heliotropic wombats", manuscript.text)
+
+    def test_unreadable_file_is_recorded_as_failed(self):
+        upload = SimpleUploadedFile("manuscript.pdf", b"%PDF-1.7 this is not really a PDF")
+
+        publication = self.create_publication(upload)
+
+        manuscript = PublicationManuscript.objects.get(publication=publication)
+        self.assertEqual(manuscript.status, "failed")
+        self.assertTrue(manuscript.error)
+        self.assertIsNone(Publication.objects.get(pk=publication.pk).page_count)
+
+
+class ChunkedUploadTests(LocalMediaMixin, TestCase):
+    """Manuscripts can be uploaded in resumable chunks and are linked once stored."""
+
+    local_media_fields = ("file",)
+
+    def setUp(self):
+        self.use_local_media()
+        upload_dir = override_settings(CHUNKED_UPLOAD_DIR=f"{self.media_root}/chunks")
+        upload_dir.enable()
+        self.addCleanup(upload_dir.disable)
+
+        self.author = make_user("uploader@example.org", "Upload Author")
+        self.publication = make_publication(self.author, "Awaiting its manuscript")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+        document = fitz.open()
+        document.new_page().insert_text((72, 72), "Chunked capybaras")
+        self.content = document.tobytes()
+        document.close()
+
+    def start(self):
+        response = self.client.post("/api/uploads/", {
+            "publication": self.publication.pk,
+            "field": "file",
+            "filename": "manuscript.pdf",
+            "size": len(self.content),
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/uploads/{response.data['id']}/"
+
+    def put_chunk(self, url, start, end):
+        return self.client.generic(
+            "PUT",
+            url,
+            self.content[start:end],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(self.content)}",
+        )
+
+    def test_resumable_upload_is_stored_and_linked(self):
+        url = self.start()
+        middle = len(self.content) // 2
+
+        self.assertEqual(self.put_chunk(url, 0, middle).data["offset"], middle)
+        # A chunk that skips ahead is refused with the offset to resume from
+        response = self.put_chunk(url, middle + 10, len(self.content))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], middle)
+        self.assertEqual(self.client.get(url).data["offset"], middle)
+        self.assertEqual(self.put_chunk(url, middle, len(self.content)).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"{url}complete/")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.client.get(url).data["status"], "complete")
+
+        self.publication.refresh_from_db()
+        with self.publication.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.content)
+        # Linking the file runs the usual post-upload ingestion
+        self.assertIn("Chunked capybaras", self.publication.manuscript.text)
+
+    def test_chunk_is_rechecked_after_it_was_read(self):
+        url = self.start()
+        session_id = url.split("/")[-2]
+
+        class SlowStream(BytesIO):
+            # Another request applies the same chunk while this one is still reading
+            def read(inner, size=-1):
+                if inner.tell() == 0:
+                    UploadSession.objects.filter(pk=session_id).update(offset=10)
+                return super().read(size)
+
+        with self.assertRaises(uploads.ChunkError) as raised:
+            uploads.write_chunk(session_id, SlowStream(self.content[:10]), f"bytes 0-9/{len(self.content)}", 10)
+        self.assertEqual(raised.exception.offset, 10)
+        # Only the staging file was written, and it is gone
+        self.assertEqual(os.listdir(uploads.upload_dir()), [])
+
+    def test_upload_is_stored_once(self):
+        url = self.start()
+        self.put_chunk(url, 0, len(self.content))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"{url}complete/")
+        session_id = url.split("/")[-2]
+
+        # A duplicate or retried store job finds the session already claimed
+        with mock.patch("publications.uploads.File") as file:
+            self.assertIsNone(uploads.store_upload(session_id))
+        file.assert_not_called()
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, "complete")
+
+    def test_complete_requires_every_byte(self):
+        url = self.start()
+        self.put_chunk(url, 0, 10)
+
+        response = self.client.post(f"{url}complete/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["offset"], 10)
+
+    def test_clear_stale_uploads(self):
+        sessions = {}
+        for status in ("uploading", "processing", "failed", "complete"):
+            url = self.start()
+            self.put_chunk(url, 0, 10)
+            sessions[status] = UploadSession.objects.get(pk=url.split("/")[-2])
+        UploadSession.objects.filter(pk__in=[s.pk for s in sessions.values()]).update(
+            status=Case(*[When(pk=s.pk, then=Value(status)) for status, s in sessions.items()]),
+            updated_at=timezone.now() - timedelta(hours=25),
+        )
+        recent = UploadSession.objects.get(pk=self.start().split("/")[-2])
+        self.assertTrue(os.path.exists(uploads.chunk_path(sessions["processing"].pk)))
+
+        out = StringIO()
+        call_command("clear_stale_uploads", stdout=out)
+        self.assertIn("Removed 3 stale uploads", out.getvalue())
+        self.assertEqual(
+            set(UploadSession.objects.values_list("pk", flat=True)), {sessions["complete"].pk, recent.pk}
+        )
+        self.assertFalse(os.path.exists(uploads.chunk_path(sessions["processing"].pk)))
+
+
+@override_settings(DIRECT_UPLOAD_BACKEND="publications.direct_uploads.LocalDirectUploadBackend")
+class DirectUploadTests(LocalMediaMixin, TestCase):
+    """Upload tickets let clients send files straight to storage and then attach them."""
+
+    local_media_fields = ("file",)
+
+    def setUp(self):
+        self.use_local_media()
+        self.author = make_user("direct@example.org", "Direct Author")
+        self.publication = make_publication(self.author, "Uploaded straight to storage")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def request_ticket(self, **overrides):
+        return self.client.post("/api/uploads/tickets/", {
+            "target": "publication.file",
+            "object_id": self.publication.pk,
+            "filename": "manuscript.pdf",
+            "size": 19,
+            **overrides,
+        }, format="json")
+
+    def test_upload_and_confirm_attaches_file(self):
+        ticket = self.request_ticket().data
+        confirm_url = f"/api/uploads/tickets/{ticket['id']}/confirm/"
+
+        # Nothing uploaded yet
+        self.assertEqual(self.client.post(confirm_url).status_code, 400)
+
+        upload = ticket["upload"]
+        response = APIClient().post(upload["url"], {
+            **upload["fields"],
+            upload["file_field"]: SimpleUploadedFile("manuscript.pdf", b"%PDF-1.4 direct pdf"),
+        }, format="multipart")
+        self.assertEqual(response.status_code, 201, response.data)
+
+        response = self.client.post(confirm_url)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["status"], "attached")
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.file.name, ticket["key"])
+        self.assertTrue(ticket["key"].startswith("publications/manuscript_"))
+
+    def test_upload_signature_is_checked(self):
+        upload = self.request_ticket().data["upload"]
+        response = APIClient().post(upload["url"], {
+            **upload["fields"],
+            "signature": "forged",
+            "file": SimpleUploadedFile("manuscript.pdf", b"%PDF-1.4 direct pdf"),
+        }, format="multipart")
+        self.assertEqual(response.status_code, 403)
+
+    def test_ticket_rules_and_ownership(self):
+        self.assertEqual(self.request_ticket(filename="manuscript.exe").status_code, 400)
+        self.assertEqual(self.request_ticket(size=11 * 1024 * 1024).status_code, 400)
+
+        stranger = make_user("stranger@example.org", "Someone Else")
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.request_ticket().status_code, 403)
+
+
+class ReactionCounterTests(TestCase):
+    """Likes and dislikes move Publication.likes_count/dislikes_count by the difference."""
+
+    def setUp(self):
+        self.readers = [make_user(f"liker{i}@example.org", f"Liker {i}") for i in range(2)]
+        self.publication = make_publication(self.readers[0], "Liked or not", status="approved")
+        self.client = APIClient()
+
+    def post(self, reader, action):
+        self.client.force_authenticate(reader)
+        return self.client.post(f"/api/publications/{self.publication.pk}/{action}/")
+
+    def counts(self):
+        return Publication.objects.filter(pk=self.publication.pk).values_list("likes_count", "dislikes_count").get()
+
+    def test_set_reaction_moves_counters_by_the_difference(self):
+        view = Views.objects.create(publication=self.publication, user=self.readers[0])
+        view.set_reaction(liked=True, disliked=False)
+        self.assertEqual(self.counts(), (1, 0))
+        # Like -> dislike
+        view.set_reaction(liked=False, disliked=True)
+        self.assertEqual(self.counts(), (0, 1))
+        # Setting the same reaction again changes nothing
+        with self.assertNumQueries(1):
+            view.set_reaction(liked=False, disliked=True)
+        self.assertEqual(self.counts(), (0, 1))
+        view.set_reaction(liked=False, disliked=False)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_like_endpoint_toggles(self):
+        first, second = self.readers
+        self.assertEqual(self.post(first, "like").data["total_likes"], 1)
+        self.post(second, "dislike")
+        self.assertEqual(self.counts(), (1, 1))
+
+        # Liking over a dislike moves the reader across
+        response = self.post(second, "like")
+        self.assertEqual((response.data["total_likes"], response.data["total_dislikes"]), (2, 0))
+        # Liking again takes the like back
+        response = self.post(first, "like")
+        self.assertEqual((response.data["total_likes"], response.data["user_liked"]), (1, False))
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_rebuild_reaction_counts_repairs_drift(self):
+        Views.objects.create(publication=self.publication, user=self.readers[0]).set_reaction(True, False)
+        Views.objects.create(publication=self.publication, user=self.readers[1]).set_reaction(False, True)
+        untouched = make_publication(self.readers[0], "Unread")
+        Publication.objects.filter(pk=self.publication.pk).update(likes_count=5, dislikes_count=0)
+
+        out = StringIO()
+        call_command("rebuild_reaction_counts", "--dry-run", stdout=out)
+        self.assertIn(f"{self.publication.pk}: likes 5 -> 1, dislikes 0 -> 1", out.getvalue())
+        self.assertIn("1 publications drifted", out.getvalue())
+        self.assertEqual(self.counts(), (5, 0))
+
+        out = StringIO()
+        call_command("rebuild_reaction_counts", stdout=out)
+        self.assertIn("Reconciled 1 publications", out.getvalue())
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(Publication.objects.filter(pk=untouched.pk).values_list("likes_count", flat=True).get(), 0)
+
+
+class BufferedCounterTests(TestCase):
+    """Counter increments are kept in memory and written back in one UPDATE."""
+
+    def setUp(self):
+        author = make_user("counted-views@example.org", "Viewed Author")
+        self.first, self.second = [make_publication(author, f"Viewed {i}") for i in range(2)]
+        self.flushed = []
+
+    def counter(self, **kwargs):
+        # A long interval keeps the flusher thread out of the way; the tests flush by hand
+        counter = BufferedCounter(Publication, "views", interval=3600, on_flush=self.flushed.append, **kwargs)
+        self.addCleanup(counter.stop)
+        return counter
+
+    def views(self):
+        return dict(Publication.objects.values_list("pk", "views"))
+
+    def test_increments_are_written_in_one_update(self):
+        counter = self.counter()
+        for pk in (self.first.pk, self.first.pk, self.second.pk, self.first.pk):
+            counter.increment(pk)
+        self.assertEqual(self.views(), {self.first.pk: 0, self.second.pk: 0})
+        self.assertEqual((counter.pending(self.first.pk), counter.pending(self.second.pk)), (3, 1))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(counter.flush(), 2)
+        self.assertEqual(self.views(), {self.first.pk: 3, self.second.pk: 1})
+        self.assertEqual(counter.pending(self.first.pk), 0)
+        self.assertEqual(self.flushed, [{self.first.pk: 3, self.second.pk: 1}])
+        # Nothing pending, nothing written
+        with self.assertNumQueries(0):
+            self.assertEqual(counter.flush(), 0)
+
+    def test_failed_write_is_retried_by_the_next_flush(self):
+        counter = self.counter()
+        counter.increment(self.first.pk, 2)
+        with mock.patch.object(counter, "_write", side_effect=DatabaseError("locked")), \
+                self.assertLogs("publications.counters", "ERROR"):
+            self.assertEqual(counter.flush(), 0)
+        counter.increment(self.first.pk)
+        self.assertEqual(counter.pending(self.first.pk), 3)
+
+        counter.flush()
+        self.assertEqual(self.views()[self.first.pk], 3)
+
+    def test_max_pending_rows_flush_early(self):
+        counter = self.counter(max_pending=2)
+        counter.increment(self.first.pk)
+        counter.increment(self.first.pk)
+        self.assertEqual(self.views()[self.first.pk], 0)
+
+        counter.increment(self.second.pk)
+        self.assertEqual(self.views(), {self.first.pk: 2, self.second.pk: 1})
+        self.assertEqual(counter.pending(self.first.pk), 0)
+
+    def test_zero_interval_writes_through(self):
+        counter = BufferedCounter(Publication, "views", interval=0)
+        counter.increment(self.first.pk)
+        self.assertEqual(self.views()[self.first.pk], 1)
+        self.assertEqual(counter.pending(self.first.pk), 0)
+
+
+@override_settings(COUNTER_FLUSH_INTERVAL=0)
+class PublicationDownloadTests(LocalMediaMixin, TestCase):
+    """Downloads redirect to a cacheable URL after the detail view's access check."""
+
+    local_media_fields = ("file",)
+
+    def setUp(self):
+        self.use_local_media()
+        self.author = make_user("download-author@example.org", "Download Author")
+        self.reader = make_user("reader@example.org", "Reader")
+        self.publication = make_publication(
+            self.author,
+            "Worth downloading",
+            status="approved",
+            file=SimpleUploadedFile("paper.docx", b"not parsed here"),
+        )
+        self.url = f"/api/publications/{self.publication.pk}/download/file/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def test_redirect_headers_and_counter(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], self.publication.file.url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+
+        # Revalidating the cached redirect is answered without counting a new download
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.downloads, 1)
+
+    def test_serialized_files_point_at_the_download_view(self):
+        response = self.client.get(f"/api/publications/{self.publication.pk}/")
+        self.assertEqual(response.data["file"], f"http://testserver{self.url}")
+        self.assertIsNone(response.data["video_file"])
+
+        self.assertEqual(self.client.get(response.data["file"]).status_code, 302)
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.downloads, 1)
+
+    def test_follows_detail_access_rules(self):
+        Publication.objects.filter(pk=self.publication.pk).update(status="draft")
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        self.assertEqual(self.client.get(f"/api/publications/{self.publication.pk}/download/video/").status_code, 404)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, LEADERBOARD_REFRESH_INTERVAL=0)
+class LeaderboardTests(TestCase):
+    """Author rankings are served from precomputed snapshots."""
+
+    url = "/api/stats/authors-ranking/"
+
+    def setUp(self):
+        self.authors = [make_user(f"ranked{i}@example.org", f"Ranked {i}") for i in range(4)]
+        # Approved publications: 3, 1, 1, 0
+        for author, count in zip(self.authors, (3, 1, 1, 0)):
+            for i in range(count):
+                make_publication(author, f"Paper {i}", status="approved")
+        self.client = APIClient()
+        self.client.force_authenticate(self.authors[1])
+
+    def test_pages_ties_and_my_rank(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(
+            [(row["rank"], row["author_id"], row["total_publications"]) for row in response.data["results"]],
+            [(1, self.authors[0].pk, 3), (2, self.authors[1].pk, 1)],
+        )
+        self.assertEqual(response.data["me"], {"rank": 2, "score": 1})
+
+        # Later pages read a range of positions from the snapshot
+        with self.assertNumQueries(3):
+            second = self.client.get(response.data["next"])
+        self.assertEqual([(row["rank"], row["author_id"]) for row in second.data["results"]], [(2, self.authors[2].pk)])
+        self.assertIsNone(second.data["next"])
+
+        filtered = self.client.get(self.url, {"status": "approved", "search": "Ranked 0"})
+        self.assertEqual(filtered.status_code, 200)
+        self.assertEqual([row["author_id"] for row in filtered.data["results"]], [self.authors[0].pk])
+
+    def test_changes_refresh_the_snapshot(self):
+        self.client.get(self.url)
+        make_publication(self.authors[3], "Catching up", status="approved")
+        make_publication(self.authors[3], "Catching up 2", status="approved")
+
+        # The stale snapshot is served while a refresh is queued
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 3)
+
+        response = self.client.get(self.url, {"page_size": 10})
+        self.assertEqual(
+            [(row["rank"], row["author_id"]) for row in response.data["results"]],
+            [(1, self.authors[0].pk), (2, self.authors[3].pk), (3, self.authors[1].pk), (3, self.authors[2].pk)],
+        )
+
+    def test_points_board(self):
+        from points.models import PointReward
+
+        publication = self.authors[2].publications.first()
+        PointReward.objects.create(publication=publication, awarded_by=self.authors[0], points=30)
+
+        response = self.client.get(self.url, {"by": "points"})
+        self.assertEqual([(row["author_id"], row["score"]) for row in response.data["results"]], [(self.authors[2].pk, 30)])
+        self.assertIsNone(response.data["me"])
+        self.assertEqual(self.client.get(self.url, {"by": "nope"}).status_code, 400)
+
+
+class DashboardStatsTests(TestCase):
+    """Dashboard totals are kept in DashboardStat rows by signals and can be rebuilt."""
+
+    def setUp(self):
+        self.author = make_user("counted-author@example.org", "Counted Author")
+        self.publication = make_publication(self.author, "Counted", status="draft")
+
+    def pay(self, status, amount="20.00"):
+        return Payment.objects.create(
+            user=self.author, reference=f"ref-{Payment.objects.count()}", payment_type="review_fee",
+            amount=amount, status=status,
+        )
+
+    def test_bump_creates_and_accumulates(self):
+        stats.bump("fee", "publication_fee", count=1, amount=Decimal("5.50"))
+        stats.bump("fee", "publication_fee", count=2, amount=Decimal("4.50"))
+        stats.bump("fee", "publication_fee", count=-1)
+        row = DashboardStat.objects.get(scope="fee", key="publication_fee")
+        self.assertEqual((row.count, row.amount), (2, Decimal("10.00")))
+        self.assertEqual(stats.get_summary()["fees"]["publication_fee"], {"count": 2, "amount": Decimal("10.00")})
+
+    def test_signals_follow_publications_and_payments(self):
+        month = stats.month_key(self.publication.created_at)
+        self.assertEqual(stats.get_summary()["status"]["draft"], 1)
+
+        self.publication.status = "approved"
+        self.publication.save()
+        summary = stats.get_summary()
+        self.assertEqual((summary["status"]["draft"], summary["status"]["approved"], summary["total"]), (0, 1, 1))
+        self.assertEqual(summary["months"], [{"month": month, "total": 1, **dict.fromkeys(stats.STATUSES, 0), "approved": 1}])
+
+        payment = self.pay("pending")
+        self.assertEqual(stats.get_summary()["fees"]["review_fee"]["count"], 0)
+        payment.status = "success"
+        payment.save()
+        self.pay("success", amount="30.00")
+        self.assertEqual(stats.get_summary()["fees"]["review_fee"], {"count": 2, "amount": Decimal("50.00")})
+        payment.delete()
+        self.assertEqual(stats.get_summary()["fees"]["review_fee"], {"count": 1, "amount": Decimal("30.00")})
+
+        self.publication.delete()
+        self.assertEqual(stats.get_summary()["total"], 0)
+
+    def test_payment_status_is_tracked_without_a_query(self):
+        payment = Payment.objects.get(pk=self.pay("pending").pk)
+        payment.reference = "ref-renamed"
+        # Only the UPDATE: the previous status comes from the loaded values
+        with self.assertNumQueries(1):
+            payment.save()
+        payment.status = "success"
+        payment.save()
+        self.assertEqual(stats.get_summary()["fees"]["review_fee"]["count"], 1)
+
+    def test_reactions_are_summed_from_publications(self):
+        view = Views.objects.create(publication=self.publication, user=self.author)
+        # The reaction row and the publication counters, no dashboard row
+        with self.assertNumQueries(2):
+            view.set_reaction(liked=True, disliked=False)
+        self.assertFalse(DashboardStat.objects.exclude(scope__in=["status", "month"]).exists())
+
+        cache.delete(stats.SUMMARY_CACHE_KEY)
+        summary = stats.get_summary()
+        self.assertEqual((summary["likes"], summary["dislikes"]), (1, 0))
+
+    def test_rebuild_dashboard_stats(self):
+        self.pay("success")
+        expected = stats.get_summary()
+        DashboardStat.objects.filter(scope="status").update(count=9)
+        DashboardStat.objects.filter(scope="fee").delete()
+        DashboardStat.objects.create(scope="month", key="1999-01:draft", count=4)
+
+        out = StringIO()
+        call_command("rebuild_dashboard_stats", stdout=out)
+        self.assertIn("Rebuilt 3 dashboard stat rows", out.getvalue())
+        self.assertEqual(stats.get_summary(), expected)
+
+
+class PublicationSearchTests(TestCase):
+    """Publications are indexed on save and searched by relevance, within what the caller may see."""
+
+    def setUp(self):
+        self.author = make_user("searcher@example.org", "Search Author")
+        self.other = make_user("hidden@example.org", "Hidden Author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def publish(self, title, abstract="", author=None, status="approved"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_publication(author or self.author, title, abstract=abstract.ljust(250, "."), status=status)
+
+    def search(self, query, queryset=None):
+        return list(get_search_backend().search(queryset or Publication.objects.all(), query))
+
+    def test_title_matches_rank_above_abstract_matches(self):
+        in_abstract = self.publish("Field notes", "Observations of a nocturnal pangolin colony")
+        in_title = self.publish("Pangolin foraging", "Observations of a colony")
+        self.publish("Unrelated", "Nothing to see")
+
+        results = self.search("pangolin")
+        self.assertEqual([p.pk for p in results], [in_title.pk, in_abstract.pk])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+        # Prefix matching, and edits are reindexed
+        self.assertEqual([p.pk for p in self.search("forag")], [in_title.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            in_title.title = "Armadillo foraging"
+            in_title.save()
+        self.assertEqual([p.pk for p in self.search("armadillo")], [in_title.pk])
+
+    def test_snippets_escape_document_text(self):
+        self.publish("Markup", "Tagged <b>pangolin</b> & <script>alert(1)</script> notes")
+
+        response = self.client.get(reverse("publication-list-create"), {"search": "pangolin"}, HTTP_HOST="localhost")
+        snippet = response.data["results"][0]["search_snippet"]
+        self.assertIn("&lt;b&gt;<mark>pangolin</mark>&lt;/b&gt; &amp; &lt;script&gt;", snippet)
+        self.assertNotIn("<script>", snippet)
+
+    def test_hidden_matches_do_not_use_up_the_limit(self):
+        for i in range(3):
+            self.publish(f"Pangolin pangolin draft {i}", author=self.other, status="draft")
+        visible = self.publish("Notes", "A single pangolin")
+
+        with self.settings(PUBLICATION_SEARCH_MAX_RESULTS=2):
+            results = self.search("pangolin", Publication.objects.filter(status="approved"))
+            self.assertEqual([p.pk for p in results], [visible.pk])
+            self.assertEqual(len(self.search("pangolin")), 2)
+
+    def test_deleted_publications_leave_the_index(self):
+        publication = self.publish("Pangolin census")
+        with self.captureOnCommitCallbacks(execute=True):
+            publication.delete()
+        self.assertEqual(self.search("pangolin"), [])
+
+    def test_rebuild_search_index(self):
+        publication = self.publish("Pangolin census")
+        get_search_backend().remove(publication.pk)
+        self.assertEqual(self.search("pangolin"), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 1 publications", out.getvalue())
+        self.assertEqual([p.pk for p in self.search("pangolin")], [publication.pk])
+
+    def test_rebuild_search_index_missing_only(self):
+        indexed = self.publish("Pangolin census")
+        # Saved before the index existed: no search document at all
+        unindexed = make_publication(self.author, "Pangolin survey")
+
+        out = StringIO()
+        call_command("rebuild_search_index", "--missing", stdout=out)
+        self.assertIn("Indexed 1 publications", out.getvalue())
+        self.assertEqual({p.pk for p in self.search("pangolin")}, {indexed.pk, unindexed.pk})
+
+
+@skipUnless(connection.vendor == "postgresql", "needs PostgreSQL full-text search")
+class PostgresSearchBackendTests(TestCase):
+    """The tsvector backend ranks by weight, matches prefixes and highlights the abstract."""
+
+    def setUp(self):
+        self.backend = PostgresSearchBackend()
+        self.author = make_user("pg-searcher@example.org", "Postgres Author")
+
+    def publish(self, title, abstract):
+        publication = make_publication(self.author, title, abstract=abstract.ljust(250, "."), status="approved")
+        self.backend.index(publication)
+        return publication
+
+    def test_ranking_prefixes_and_snippets(self):
+        in_abstract = self.publish("Field notes", "Observations of a nocturnal <b>pangolin</b> colony")
+        in_title = self.publish("Pangolin foraging", "Observations of a colony")
+
+        results = list(self.backend.search(Publication.objects.all(), "pangol"))
+        self.assertEqual([p.pk for p in results], [in_title.pk, in_abstract.pk])
+        self.assertIn("&lt;b&gt;<mark>pangolin</mark>&lt;/b&gt;", highlight(results[1].search_snippet))
+
+        self.backend.remove(in_title.pk)
+        self.assertEqual([p.pk for p in self.backend.search(Publication.objects.all(), "pangolin")], [in_abstract.pk])
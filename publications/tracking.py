@@ -0,0 +1,111 @@
+# publications/tracking.py
+"""
+Field change tracking without extra queries.
+
+Models mixing in FieldTrackerMixin remember the values they were loaded
+with (Model.from_db) and re-snapshot after every save and refresh_from_db(), so "what was the
+status before this save?" is answered from memory instead of a
+`Model.objects.get(pk=self.pk)` round trip:
+
+    publication.previous('status')   # value as loaded / last saved
+    publication.has_changed('status')
+    publication.dirty_fields()       # {'status': 'draft', ...} -> previous values
+    publication.save_dirty()         # UPDATE only the changed columns
+
+Receivers of pre_save/post_save still see the previous values: the snapshot
+is refreshed only after Model.save() (and its signals) have finished.
+Instances that were not loaded from the database (e.g. built with a known
+pk) fall back to one SELECT the first time a previous value is needed.
+"""
+import copy
+
+from django.db import models
+
+
+def _snapshot_value(value):
+    # JSONField lists/dicts are mutated in place, so keep our own copy
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class FieldTrackerMixin(models.Model):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def _tracked_attnames(self):
+        deferred = self.get_deferred_fields()
+        return [
+            field.attname for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        ]
+
+    def _take_snapshot(self, attnames=None):
+        snapshot = getattr(self, '_loaded_values', None)
+        if snapshot is None or attnames is None:
+            snapshot = self._loaded_values = {}
+            attnames = self._tracked_attnames()
+        for attname in attnames:
+            snapshot[attname] = _snapshot_value(self.__dict__.get(attname))
+
+    def previous(self, field_name):
+        """The value `field_name` had when loaded or last saved (None for unsaved instances)."""
+        if self._state.adding:
+            return None
+        attname = self._meta.get_field(field_name).attname
+        snapshot = getattr(self, '_loaded_values', None)
+        if snapshot is None or attname not in snapshot:
+            # Not loaded through from_db(); read it once and remember it
+            value = type(self)._base_manager.using(self._state.db or 'default')\
+                .filter(pk=self.pk).values_list(attname, flat=True).first()
+            if snapshot is None:
+                snapshot = self._loaded_values = {}
+            snapshot[attname] = value
+        return snapshot[attname]
+
+    def has_changed(self, field_name):
+        if self._state.adding:
+            return True
+        attname = self._meta.get_field(field_name).attname
+        return self.previous(field_name) != self.__dict__.get(attname)
+
+    def dirty_fields(self):
+        """{field name: previous value} for loaded fields whose value differs from the snapshot."""
+        snapshot = getattr(self, '_loaded_values', None) or {}
+        return {
+            field.name: snapshot[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in snapshot and snapshot[field.attname] != self.__dict__.get(field.attname)
+        }
+
+    def save_dirty(self, **kwargs):
+        """save(update_fields=<changed fields>), plus auto_now fields; no-op when nothing changed."""
+        if self._state.adding:
+            return self.save(**kwargs)
+        update_fields = set(self.dirty_fields())
+        if not update_fields:
+            return None
+        update_fields.update(
+            field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+        )
+        return self.save(update_fields=update_fields, **kwargs)
+
+    def _snapshot_fields(self, names):
+        if names is None:
+            self._take_snapshot()
+            return
+        fields = [self._meta.get_field(name) for name in names]
+        self._take_snapshot([field.attname for field in fields if field.concrete])
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_fields(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Also how deferred fields are loaded on first access
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_fields(fields)
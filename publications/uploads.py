@@ -0,0 +1,259 @@
+# publications/uploads.py
+"""
+Resumable chunked uploads for Publication.file and Publication.video_file.
+
+Multipart uploads through PublicationSerializer buffer the whole file on the
+web worker and push it to Cloudinary inside the request. Large files can
+instead go through an UploadSession:
+
+    POST   /api/uploads/                    {publication, field, filename, size}
+    PUT    /api/uploads/<id>/               raw bytes, Content-Range: bytes 0-5242879/10485760
+    GET    /api/uploads/<id>/               current offset, to resume after a dropped connection
+    POST   /api/uploads/<id>/complete/      push to storage in the background
+    DELETE /api/uploads/<id>/               cancel
+
+Each chunk is streamed from the request into a temporary file at its offset
+(CHUNKED_UPLOAD_DIR), so neither a chunk nor the assembled file is ever held
+in memory. `complete()` hands the file to `store_upload()` on the background
+queue, which saves it through the field's storage and links it to the
+publication with a regular save(), so the usual post_save work (manuscript
+ingestion, search indexing) follows.
+
+The temporary directory must be shared by every web worker that can receive
+a chunk; `clear_stale_uploads` removes abandoned sessions.
+"""
+import logging
+import os
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from config.workers import default_queue
+
+from .models import Publication, UploadSession
+
+logger = logging.getLogger(__name__)
+
+# Same limits as the multipart path (PublicationSerializer.validate_file / validate_video_file)
+UPLOAD_RULES = {
+    'file': {
+        'max_size': 10 * 1024 * 1024,
+        'extensions': ('.pdf', '.doc', '.docx'),
+        'size_error': "File size cannot exceed 10MB.",
+        'type_error': "Only PDF and Word documents are allowed.",
+    },
+    'video_file': {
+        'max_size': 50 * 1024 * 1024,
+        'extensions': ('.mp4', '.avi', '.mov'),
+        'size_error': "Video file size cannot exceed 50MB.",
+        'type_error': "Only MP4, AVI, or MOV video files are allowed.",
+    },
+    # Only reachable through direct uploads (publications/direct_uploads.py)
+    'annotated_file': {
+        'max_size': 10 * 1024 * 1024,
+        'extensions': ('.pdf', '.doc', '.docx'),
+        'size_error': "File size cannot exceed 10MB.",
+        'type_error': "Only PDF and Word documents are allowed.",
+    },
+    'cover_image': {
+        'max_size': 5 * 1024 * 1024,
+        'extensions': ('.jpg', '.jpeg', '.png', '.webp'),
+        'size_error': "Cover image size cannot exceed 5MB.",
+        'type_error': "Only JPEG, PNG or WebP images are allowed.",
+    },
+    'audio': {
+        'max_size': 20 * 1024 * 1024,
+        'extensions': ('.mp3', '.m4a', '.wav', '.ogg', '.webm'),
+        'size_error': "Audio file size cannot exceed 20MB.",
+        'type_error': "Only MP3, M4A, WAV, OGG or WebM audio files are allowed.",
+    },
+}
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class ChunkError(Exception):
+    """A chunk that cannot be applied; `offset` is where the client should resume."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def upload_error(field, name, size):
+    """The validation message for an upload of `name`/`size` into `field`, or None."""
+    return rules_error(UPLOAD_RULES[field], name, size)
+
+
+def rules_error(rules, name, size):
+    if size > rules['max_size']:
+        return rules['size_error']
+    if not name.lower().endswith(rules['extensions']):
+        return rules['type_error']
+    return None
+
+
+def max_chunk_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_CHUNK_SIZE', 5 * 1024 * 1024)
+
+
+def upload_dir():
+    path = getattr(settings, 'CHUNKED_UPLOAD_DIR', None) or os.path.join(tempfile.gettempdir(), 'panel-uploads')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def chunk_path(session_id):
+    return os.path.join(upload_dir(), f"{session_id}.part")
+
+
+def parse_content_range(header):
+    """(start, end, total) from 'bytes start-end/total'; None when missing or malformed."""
+    match = _CONTENT_RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        return None
+    return start, end, total
+
+
+def write_chunk(session_id, stream, content_range, content_length):
+    """
+    Append one chunk read from `stream` at its Content-Range offset and return
+    the updated session. Raises ChunkError for chunks that do not fit.
+
+    The chunk is read from the client into its own staging file first; the
+    session row is only locked afterwards, to check that the chunk still
+    starts at the offset and to append it, so a slow client never holds the
+    lock or a transaction open.
+    """
+    session = UploadSession.objects.get(pk=session_id)
+    start, end = check_chunk(session, content_range, content_length)
+
+    fd, staged = tempfile.mkstemp(dir=upload_dir(), prefix=f"{session.pk}.", suffix='.chunk')
+    try:
+        with os.fdopen(fd, 'wb') as target:
+            remaining = end - start + 1
+            while remaining:
+                data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    raise ChunkError("Chunk ended before Content-Length bytes were received.", session.offset)
+                target.write(data)
+                remaining -= len(data)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session_id)
+            # Another request may have applied this chunk (or cancelled the upload) meanwhile
+            check_chunk(session, content_range, content_length)
+            append_chunk(session.pk, staged, start)
+            session.offset = end + 1
+            session.save(update_fields=['offset', 'updated_at'])
+        return session
+    finally:
+        os.unlink(staged)
+
+
+def check_chunk(session, content_range, content_length):
+    """(start, end) of the chunk when it can be applied to `session` now; raises ChunkError otherwise."""
+    if session.status != 'uploading':
+        raise ChunkError("Upload is no longer accepting data.", session.offset)
+
+    parsed = parse_content_range(content_range)
+    if parsed is None:
+        raise ChunkError("Content-Range must look like 'bytes <start>-<end>/<total>'.", session.offset)
+    start, end, total = parsed
+    length = end - start + 1
+    if total != session.size or end >= session.size:
+        raise ChunkError("Content-Range does not match the declared upload size.", session.offset)
+    if start != session.offset:
+        raise ChunkError("Chunk does not start at the current offset.", session.offset)
+    if length > max_chunk_size():
+        raise ChunkError(f"Chunks cannot exceed {max_chunk_size()} bytes.", session.offset)
+    if content_length != length:
+        raise ChunkError("Content-Length does not match Content-Range.", session.offset)
+    return start, end
+
+
+def append_chunk(session_id, staged, start):
+    path = chunk_path(session_id)
+    with open(staged, 'rb') as source, open(path, 'r+b' if os.path.exists(path) else 'wb') as target:
+        # Drop anything an interrupted earlier attempt left past the confirmed offset
+        target.seek(start)
+        target.truncate()
+        while data := source.read(COPY_BUFFER_SIZE):
+            target.write(data)
+
+
+def complete(session):
+    """Queue the assembled file for storage; the session must be locked by the caller."""
+    session.status = 'processing'
+    session.save(update_fields=['status', 'updated_at'])
+    session_id = session.pk
+    transaction.on_commit(lambda: default_queue.submit(store_upload, session_id))
+
+
+def store_upload(session_id):
+    """Push an assembled upload to the field's storage and link it to the publication."""
+    # Claim the session, so a job queued twice (or retried) stores the file only once
+    if not UploadSession.objects.filter(pk=session_id, status='processing').update(
+        status='storing', updated_at=timezone.now()
+    ):
+        return None
+    session = UploadSession.objects.select_related('publication').get(pk=session_id)
+
+    publication = session.publication
+    field = Publication._meta.get_field(session.field)
+    path = chunk_path(session.pk)
+    try:
+        with open(path, 'rb') as source:
+            name = field.generate_filename(publication, session.filename)
+            stored_name = field.storage.save(name, File(source, name=session.filename), max_length=field.max_length)
+    except Exception as e:
+        logger.error(f"Could not store upload {session_id}: {str(e)}")
+        UploadSession.objects.filter(pk=session_id).update(status='failed', error=str(e), updated_at=timezone.now())
+        return None
+
+    setattr(publication, session.field, stored_name)
+    publication.save(update_fields=[session.field, 'updated_at'])
+    UploadSession.objects.filter(pk=session_id).update(
+        status='complete',
+        stored_name=stored_name,
+        error='',
+        updated_at=timezone.now(),
+    )
+    discard(session_id)
+    logger.info(f"Upload {session_id} stored as {stored_name} for publication {publication.pk}")
+    return stored_name
+
+
+def discard(session_id):
+    try:
+        os.unlink(chunk_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def clear_stale_uploads(hours=None):
+    """
+    Delete unfinished or failed sessions untouched for `hours` and their temporary files.
+    'processing' and 'storing' sessions that old are included: their store job was lost
+    (e.g. the worker died), and the client can start the upload again.
+    """
+    hours = hours if hours is not None else getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+    stale = UploadSession.objects.filter(
+        status__in=['uploading', 'processing', 'storing', 'failed'],
+        updated_at__lt=timezone.now() - timedelta(hours=hours),
+    )
+    session_ids = list(stale.values_list('pk', flat=True))
+    for session_id in session_ids:
+        discard(session_id)
+    UploadSession.objects.filter(pk__in=session_ids).delete()
+    return len(session_ids)
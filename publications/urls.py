@@ -4,7 +4,10 @@ PublicationDislikeView, FreeReviewStatusView,
 NotificationMarkAllReadView, PublicationUpdateView, 
 PublicationDetailView, NotificationListView, 
 NotificationMarkReadView, NotificationUnreadView, 
-ViewsUpdateView, PublicationStatsView, AuthorPublicationRankingView)
+ViewsUpdateView, PublicationStatsView, AuthorPublicationRankingView,
+UploadSessionCreateView, UploadSessionView, UploadSessionCompleteView,
+UploadTicketCreateView, UploadTicketConfirmView, DirectUploadLocalReceiveView,
+PublicationDownloadView)
 
 
 urlpatterns = [
@@ -15,6 +18,7 @@ urlpatterns = [
     path('publications/<str:id>/update/', PublicationUpdateView.as_view(), name='publication-update'),
     path('publications/<str:id>/review/', EditorReviewView.as_view(), name='publication-review'),
     path('publications/<str:pk>/views/', ViewsUpdateView.as_view(), name='publication-views-update'),
+    path('publications/<str:pk>/download/<str:asset>/', PublicationDownloadView.as_view(), name='publication-download'),
     path('notifications/', NotificationListView.as_view(), name='notification-list'),
     path('notifications/<str:pk>/read/', NotificationMarkReadView.as_view(), name='notification-mark-read'),
     path('notifications/unread/', NotificationUnreadView.as_view(), name='notification-unread'),
@@ -25,5 +29,11 @@ urlpatterns = [
     path('publications/<str:id>/annotate/', PublicationAnnotateView.as_view(), name='publication-annotate'),
     path('editor-activities/', EditorActivitiesView.as_view(), name='editor-activities'),
     path('stats/authors-ranking/', AuthorPublicationRankingView.as_view(), name='authors-ranking'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', UploadSessionView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:pk>/complete/', UploadSessionCompleteView.as_view(), name='upload-complete'),
+    path('uploads/tickets/', UploadTicketCreateView.as_view(), name='upload-ticket-create'),
+    path('uploads/tickets/<uuid:pk>/confirm/', UploadTicketConfirmView.as_view(), name='upload-ticket-confirm'),
+    path('uploads/tickets/<uuid:pk>/local/', DirectUploadLocalReceiveView.as_view(), name='upload-ticket-local'),
 ]
 
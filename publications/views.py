@@ -1,13 +1,22 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponseNotModified, HttpResponseRedirect
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from django.db.models import Q
 from rest_framework import serializers, permissions
-from .models import Publication, Notification, Views, ReviewHistory
-from .serializers import PublicationSerializer, ReviewHistorySerializer, NotificationSerializer, ViewsSerializer, StatsSerializer
+from .models import Publication, Notification, Views, ReviewHistory, UploadSession, UploadTicket
+from .serializers import PublicationSerializer, ReviewHistorySerializer, NotificationSerializer, ViewsSerializer, StatsSerializer, UploadSessionSerializer, UploadTicketRequestSerializer, UploadTicketSerializer
 from payments.models import Payment, Subscription
-from .pagination import StandardResultsPagination, DashboardResultsPagination
+from .pagination import StandardResultsPagination, DashboardResultsPagination, KeysetPaginationMixin
+from .search import get_search_backend
+from .counters import publication_views, publication_downloads
+from .realtime import push_unread_count, push_unread_delta
+from .notifications import unread_count, invalidate_unread
+from . import stats, uploads, direct_uploads, downloads, leaderboard
 from django.utils import timezone
 from django.db import transaction
 import logging
@@ -32,10 +41,17 @@ class IsEditor(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and (request.user.role == 'admin' or request.user.role == 'editor')
     
-class PublicationListCreateView(generics.ListCreateAPIView):
+class PublicationListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
     serializer_class = PublicationSerializer
     pagination_class = StandardResultsPagination
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-publication_date', '-id')
+
+    def use_keyset_pagination(self):
+        # Search results are ordered by relevance, which has no stable keyset
+        if self.request.query_params.get('search'):
+            return False
+        return super().use_keyset_pagination()
     
     @method_decorator(csrf_exempt)  # Add this
     def dispatch(self, *args, **kwargs):
@@ -51,21 +67,25 @@ class PublicationListCreateView(generics.ListCreateAPIView):
                 Q(author=user) | Q(status='approved')
             )  # Authors and others see their own + approved publications
 
-        # Optional search filter
+        # Everything PublicationSerializer reads per row comes along in the page query
+        queryset = queryset.select_related('author', 'editor', 'category')
+
+        # Optional full-text search, ordered by relevance with highlighted snippets
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(abstract__icontains=search) |
-                Q(doi__icontains=search) |
-                Q(author__full_name__icontains=search) |
-                Q(keywords__icontains=search)  
-            )
+            queryset = get_search_backend().search(queryset, search)
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, status='draft')  # Changed to 'draft' initially
         logger.info(f"Publication created by {self.request.user.full_name}: {serializer.instance.id}")
 
+def visible_publications(user):
+    """Publications `user` may open: editors see all, everyone else their own and approved ones."""
+    if user.role == 'editor':
+        return Publication.objects.all()
+    return Publication.objects.filter(Q(author=user) | Q(status='approved'))
+
+
 class PublicationDetailView(generics.RetrieveAPIView):
     serializer_class = PublicationSerializer
     pagination_class = StandardResultsPagination
@@ -75,36 +95,66 @@ class PublicationDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         user = self.request.user
         logger.info(f"User: {user.full_name}, Role: {user.role}, Fetching publication with pk: {self.kwargs.get('pk')}")
-        if user.role == 'editor':
-            return Publication.objects.all()
-        return Publication.objects.filter(
-            Q(author=user) | Q(status='approved')
-        )
+        return visible_publications(user).select_related('author', 'editor', 'category')
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        logger.info(f"Retrieved publication: {instance.id}, views: {getattr(instance, 'views', 'N/A')}")
+        logger.info(f"Retrieved publication: {instance.id}, views: {instance.views}")
         try:
-            view, created = Views.objects.get_or_create(publication=instance, user=request.user)
-            if created or not view.viewed:
-                views_attr = getattr(instance, 'views', None)
-                if views_attr is None:
-                    raise AttributeError("Publication model missing 'views' field")
-                instance.views += 1
-                view.viewed = True
-                view.save()
-                instance.save()
+            view, created = Views.objects.get_or_create(
+                publication=instance, user=request.user, defaults={'viewed': True}
+            )
+            first_view = created
+            if not created and not view.viewed:
+                # Conditional update so concurrent requests only count the first view once
+                first_view = Views.objects.filter(pk=view.pk, viewed=False).update(viewed=True) == 1
+
+            if first_view:
+                # Buffered: flushed to the database in batches by publication_views
+                publication_views.increment(instance.pk)
+
+            # Include increments that are still waiting to be flushed
+            instance.views += publication_views.pending(instance.pk)
+            instance.downloads += publication_downloads.pending(instance.pk)
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
-        except AttributeError as e:
-            logger.error(f"AttributeError in retrieve: {str(e)}")
-            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
             logger.error(f"Unexpected error in retrieve: {str(e)}")
             return Response({"detail": "An unexpected error occurred"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # views.py
 # views.py
+class PublicationDownloadView(APIView):
+    """
+    Redirect to a signed, short-lived URL for one of a publication's files
+    (publications/downloads.py). Downloads are counted through a buffered counter.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, asset):
+        field_name = downloads.ASSETS.get(asset)
+        if field_name is None:
+            raise Http404
+        # Access rules and the stored file name come back in a single query
+        publication = get_object_or_404(visible_publications(request.user).only('pk', field_name), pk=pk)
+        field_file = getattr(publication, field_name)
+        if not field_file:
+            raise Http404
+
+        url, expires_at = downloads.signed_url(field_file)
+        tag = quote_etag(downloads.etag(url))
+        if tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponseRedirect(url)
+            publication_downloads.increment(publication.pk)
+        response['ETag'] = tag
+        max_age = max(0, expires_at - downloads.EXPIRY_MARGIN - int(timezone.now().timestamp()))
+        patch_cache_control(response, private=True, max_age=max_age)
+        patch_vary_headers(response, ('Cookie', 'Authorization'))
+        return response
+
+
 # views.py
 class PublicationUpdateView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PublicationSerializer
@@ -120,7 +170,7 @@ class PublicationUpdateView(generics.RetrieveUpdateDestroyAPIView):
 
     @transaction.atomic
     def perform_update(self, serializer):
-        instance = self.get_object()
+        instance = serializer.instance  # already fetched by update(); no second lookup
         user = self.request.user
         data = serializer.validated_data.copy()
 
@@ -133,7 +183,7 @@ class PublicationUpdateView(generics.RetrieveUpdateDestroyAPIView):
             has_paid = Payment.objects.filter(
                 user=user,
                 payment_type='review_fee',
-                metadata__publication_id=str(instance.id),
+                publication=instance,
                 status='success'
             ).exists()
 
@@ -163,9 +213,8 @@ class PublicationUpdateView(generics.RetrieveUpdateDestroyAPIView):
         
         old_status = instance.status  # previous status before update
 
-        # Save the update normally for editors
+        # Save the update normally for editors; save() updates `instance` in place
         serializer.save()
-        instance.refresh_from_db()
 
         new_status = instance.status
 
@@ -225,7 +274,7 @@ class EditorReviewView(APIView):
             has_pub_fee = Payment.objects.filter(
                 user=pub.author,
                 payment_type='publication_fee',
-                metadata__publication_id=str(pub.id),
+                publication=pub,
                 status='success'
             ).exists()
 
@@ -239,7 +288,7 @@ class EditorReviewView(APIView):
         elif action == 'under_review':
             pub.status = 'under_review'
         pub.editor = request.user
-        pub.save()  # This triggers your save() override too
+        pub.save_dirty()  # Only the changed columns; still runs the save() override
 
         # THIS WILL NOW WORK
         ReviewHistory.objects.create(
@@ -257,10 +306,11 @@ class EditorReviewView(APIView):
         })
         
 # views.py (add this new view)
-class EditorActivitiesView(generics.ListAPIView):
+class EditorActivitiesView(KeysetPaginationMixin, generics.ListAPIView):
     serializer_class = ReviewHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsPagination
+    keyset_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
         queryset = ReviewHistory.objects.select_related('publication', 'publication__author', 'editor').order_by('-timestamp')
@@ -319,27 +369,38 @@ class ViewsUpdateView(generics.UpdateAPIView):
         view, created = Views.objects.get_or_create(publication=publication, user=self.request.user)
         return view
 
+    def perform_update(self, serializer):
+        # Route like/dislike changes through set_reaction so the publication counters stay in step
+        with transaction.atomic():
+            view = Views.objects.select_for_update().get(pk=serializer.instance.pk)
+            data = serializer.validated_data
+            view.set_reaction(
+                liked=data.get('user_liked', view.user_liked),
+                disliked=data.get('user_disliked', view.user_disliked),
+            )
+            serializer.instance = view
+
 class PublicationLikeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
         publication = get_object_or_404(Publication, id=pk)
-        view, created = Views.objects.get_or_create(publication=publication, user=request.user)
 
-        if view.user_liked:
-            # Toggle off like
-            view.user_liked = False
-        else:
-            # Like and remove any existing dislike
-            view.user_liked = True
-            view.user_disliked = False
+        with transaction.atomic():
+            view, created = Views.objects.select_for_update().get_or_create(publication=publication, user=request.user)
+            if view.user_liked:
+                # Toggle off like
+                view.set_reaction(liked=False, disliked=view.user_disliked)
+            else:
+                # Like and remove any existing dislike
+                view.set_reaction(liked=True, disliked=False)
+            likes, dislikes = Publication.objects.filter(pk=publication.pk).values_list('likes_count', 'dislikes_count').get()
 
-        view.save()
         logger.info(f"{request.user.full_name} {'liked' if view.user_liked else 'unliked'} publication {publication.id}")
 
         return Response({
-            "total_likes": publication.total_likes(),
-            "total_dislikes": publication.total_dislikes(),
+            "total_likes": likes,
+            "total_dislikes": dislikes,
             "user_liked": view.user_liked,
             "user_disliked": view.user_disliked
         }, status=status.HTTP_200_OK)
@@ -350,31 +411,32 @@ class PublicationDislikeView(APIView):
 
     def post(self, request, pk):
         publication = get_object_or_404(Publication, id=pk)
-        view, created = Views.objects.get_or_create(publication=publication, user=request.user)
 
-        if view.user_disliked:
-            # Toggle off dislike
-            view.user_disliked = False
-        else:
-            # Dislike and remove any existing like
-            view.user_disliked = True
-            view.user_liked = False
+        with transaction.atomic():
+            view, created = Views.objects.select_for_update().get_or_create(publication=publication, user=request.user)
+            if view.user_disliked:
+                # Toggle off dislike
+                view.set_reaction(liked=view.user_liked, disliked=False)
+            else:
+                # Dislike and remove any existing like
+                view.set_reaction(liked=False, disliked=True)
+            likes, dislikes = Publication.objects.filter(pk=publication.pk).values_list('likes_count', 'dislikes_count').get()
 
-        view.save()
         logger.info(f"{request.user.full_name} {'disliked' if view.user_disliked else 'undisliked'} publication {publication.id}")
 
         return Response({
-            "total_likes": publication.total_likes(),
-            "total_dislikes": publication.total_dislikes(),
+            "total_likes": likes,
+            "total_dislikes": dislikes,
             "user_liked": view.user_liked,
             "user_disliked": view.user_disliked
         }, status=status.HTTP_200_OK)
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(KeysetPaginationMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = DashboardResultsPagination
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
@@ -388,20 +450,27 @@ class NotificationMarkReadView(generics.UpdateAPIView):
         return Notification.objects.filter(user=self.request.user)
 
     def perform_update(self, serializer):
+        # The conditional UPDATE makes concurrent "mark read" calls decrement once
+        marked = Notification.objects.filter(pk=serializer.instance.pk, is_read=False).update(is_read=True)
         serializer.save(is_read=True)
+        if marked:
+            invalidate_unread([self.request.user.pk])
+            push_unread_delta(self.request.user.pk, -marked)
 
 class NotificationUnreadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
-        return Response({'unread_count': count})
+        return Response({'unread_count': unread_count(request.user.pk)})
 
 class NotificationMarkAllReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
         Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        invalidate_unread([request.user.pk])
+        # Not simply 0: notifications created since the UPDATE are still unread
+        push_unread_count(request.user.pk, unread_count(request.user.pk))
         return Response({'detail': 'All notifications marked as read.'}, status=status.HTTP_200_OK)
 
 class FreeReviewStatusView(APIView):
@@ -446,36 +515,27 @@ class PublicationStatsView(APIView):
     pagination_class = DashboardResultsPagination
 
     def get(self, request):
-        # ── 1. Summary Stats ───────────────────────────────────────
-        total_publications = Publication.objects.count()
-        approved = Publication.objects.filter(status='approved').count()
-        rejected = Publication.objects.filter(status='rejected').count()
-        under_review = Publication.objects.filter(status='under_review').count()
-        draft = Publication.objects.filter(status='draft').count()
-        total_likes = Views.objects.filter(user_liked=True).count()
-        total_dislikes = Views.objects.filter(user_disliked=True).count()
+        # ── 1. Summary Stats (materialized, see publications/stats.py) ──
+        summary = stats.get_summary()
+        total_publications = summary['total']
+        approved = summary['status']['approved']
+        rejected = summary['status']['rejected']
+        under_review = summary['status']['under_review']
+        draft = summary['status']['draft']
+        total_likes = summary['likes']
+        total_dislikes = summary['dislikes']
 
 
         # ── 2. Monthly Data (Paginated) ───────────────────────────
-        monthly_qs = Publication.objects.annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            total=Count('id'),
-            approved=Count(Case(When(status='approved', then=1), output_field=IntegerField())),
-            rejected=Count(Case(When(status='rejected', then=1), output_field=IntegerField())),
-            under_review=Count(Case(When(status='under_review', then=1), output_field=IntegerField())),
-            draft=Count(Case(When(status='draft', then=1), output_field=IntegerField())),
-        ).order_by('month')
-
         monthly_paginator = self.pagination_class()
         monthly_paginator.page_query_param = 'monthly_page'
         monthly_paginator.page_size_query_param = 'monthly_size'
-        monthly_page = monthly_paginator.paginate_queryset(monthly_qs, request)
+        monthly_page = monthly_paginator.paginate_queryset(summary['months'], request)
         monthly_paginated = monthly_paginator.get_paginated_response(monthly_page).data
 
         monthly_results = [
             {
-                'month': item['month'].strftime('%Y-%m') if item['month'] else 'N/A',
+                'month': item['month'],
                 'total': item['total'],
                 'approved': item['approved'],
                 'rejected': item['rejected'],
@@ -507,24 +567,9 @@ class PublicationStatsView(APIView):
         editors_results = editors_actions_paginated['results']
 
         # ── 4. Total Payments & Subscriptions ─────────────────────
-        total_pub_raw = Payment.objects.filter(
-            status='success',
-            payment_type='publication_fee'
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField(max_digits=14, decimal_places=2))
-        )['total']
-
-        # Review Fee: ₦3,000 per review
-        total_rev_raw = Payment.objects.filter(
-            status='success',
-            payment_type='review_fee'
-        ).aggregate(
-            total=Coalesce(Sum('amount'), Value(0), output_field=DecimalField(max_digits=14, decimal_places=2))
-        )['total']
-
         # Convert to float for frontend
-        total_payments = float(total_pub_raw)
-        total_subscriptions = float(total_rev_raw)
+        total_payments = float(summary['fees']['publication_fee']['amount'])
+        total_subscriptions = float(summary['fees']['review_fee']['amount'])
 
         # ── 5. ALL PAYMENTS (SUCCESS + PENDING) – PAGINATED ───────
         all_payments_qs = Payment.objects.filter(
@@ -563,13 +608,11 @@ class PublicationStatsView(APIView):
             'results': all_payments_results,
         }
 
-        # DEBUG: Log actual counts
         logger.info(
             f"[STATS] Publication Fee: ₦{total_payments} "
-            f"({Payment.objects.filter(status='success', payment_type='publication_fee').count()} payments) | "
+            f"({summary['fees']['publication_fee']['count']} payments) | "
             f"Review Fee: ₦{total_subscriptions} "
-            f"{all_payments_results}"
-            f"({Payment.objects.filter(status='success', payment_type='review_fee').count()} payments)"
+            f"({summary['fees']['review_fee']['count']} payments)"
         )
 
         # ── 5. Review Fee Payment Details (Paginated) ─────────────
@@ -606,22 +649,18 @@ class PublicationStatsView(APIView):
         subs_results = subscription_details_paginated['results']
 
         # ── 7. NEW: Users Who Paid BOTH Fees (with Amounts) ────────
+        # One join with conditional sums; chaining two payment filters joined the
+        # table twice and multiplied the sums.
+        decimal_zero = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
         users_with_both_qs = User.objects.filter(
-            payment__payment_type='publication_fee',
-            payment__status='success'
+            payment__status='success',
+            payment__payment_type__in=['publication_fee', 'review_fee'],
         ).annotate(
-            pub_fee=Coalesce(
-                Sum('payment__amount', filter=Q(payment__payment_type='publication_fee', payment__status='success')),
-                Value(0.0, output_field=DecimalField(max_digits=12, decimal_places=2))
-            )
+            pub_fee=Coalesce(Sum('payment__amount', filter=Q(payment__payment_type='publication_fee')), decimal_zero),
+            rev_fee=Coalesce(Sum('payment__amount', filter=Q(payment__payment_type='review_fee')), decimal_zero),
         ).filter(
-            payment__payment_type='review_fee',
-            payment__status='success'
-        ).annotate(
-            rev_fee=Coalesce(
-                Sum('payment__amount', filter=Q(payment__payment_type='review_fee', payment__status='success')),
-                Value(0.0, output_field=DecimalField(max_digits=12, decimal_places=2))
-            )
+            pub_fee__gt=0,
+            rev_fee__gt=0,
         ).annotate(
             total=F('pub_fee') + F('rev_fee')
         ).values('id', 'full_name', 'pub_fee', 'rev_fee', 'total')\
@@ -675,57 +714,203 @@ class PublicationStatsView(APIView):
     
     
 class AuthorPublicationRankingView(generics.ListAPIView):
+    """
+    Authors ranked by approved publications (default), ?by=points or ?by=views,
+    served from the snapshots in publications/leaderboard.py. `me` is the
+    requesting user's own rank on the board.
+    """
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = DashboardResultsPagination
 
     def get(self, request, *args, **kwargs):
+        board = request.query_params.get("by", "publications")
+        if board not in leaderboard.BOARDS:
+            return Response(
+                {"detail": f"Unknown ranking '{board}'. Choose one of: {', '.join(leaderboard.BOARDS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        snapshot = leaderboard.snapshot(board)
+
         status_filter = request.query_params.get("status")  # optional
         search = request.query_params.get("search")         # optional
 
-        # Base query: users who have published at least 1 publication
-        authors_qs = User.objects.annotate(
-        total_publications=Count('publications', filter=Q(publications__status='approved'))
-        ).order_by('-total_publications')
-
+        if status_filter or search:
+            entries = leaderboard.entries(board)
+            # Optional filter: authors with at least one publication in this status
+            if status_filter:
+                entries = entries.filter(user__publications__status=status_filter).distinct()
+            # Optional search (name, email)
+            if search:
+                entries = entries.filter(
+                    Q(user__full_name__icontains=search) |
+                    Q(user__email__icontains=search)
+                )
+            response = self.get_paginated_response(self.ranking_rows(self.paginate_queryset(entries), board))
+        else:
+            response = self.position_page(board, snapshot)
 
-        # Optional filter by publication status
-        if status_filter:
-            authors_qs = authors_qs.filter(publication__status=status_filter)
+        mine = leaderboard.rank_of(board, request.user)
+        response.data["me"] = {"rank": mine.rank, "score": mine.score} if mine else None
+        response.data["computed_at"] = snapshot.computed_at
+        return response
 
-        # Optional search (name, email)
-        if search:
-            authors_qs = authors_qs.filter(
-                Q(full_name__icontains=search) |
-                Q(email__icontains=search)
-            )
+    def position_page(self, board, snapshot):
+        """An unfiltered page is a range of positions: no COUNT and no OFFSET."""
+        paginator = self.paginator
+        page_size = paginator.get_page_size(self.request)
+        try:
+            number = max(1, int(self.request.query_params.get(paginator.page_query_param, 1)))
+        except ValueError:
+            number = 1
+        url = self.request.build_absolute_uri()
+        previous = None
+        if number > 1:
+            previous = remove_query_param(url, paginator.page_query_param) if number == 2 \
+                else replace_query_param(url, paginator.page_query_param, number - 1)
+        return Response({
+            "count": snapshot.size,
+            "next": replace_query_param(url, paginator.page_query_param, number + 1)
+            if number * page_size < snapshot.size else None,
+            "previous": previous,
+            "results": self.ranking_rows(leaderboard.page(board, number, page_size), board),
+        })
 
-        # Order by highest publication count
-        authors_qs = authors_qs.order_by('-total_publications', 'full_name')
-
-        # Paginate
-        page = self.paginate_queryset(authors_qs)
-        if page is not None:
-            results = [
-                {
-                    "author_id": author.id,
-                    "full_name": author.full_name,
-                    "email": author.email,
-                    "total_publications": author.total_publications,
-                }
-                for author in page
-            ]
-            return self.get_paginated_response(results)
-
-        # If pagination is off (rare)
-        results = [
-            {
-                "author_id": author.id,
-                "full_name": author.full_name,
-                "email": author.email,
-                "total_publications": author.total_publications,
+    @staticmethod
+    def ranking_rows(entries, board):
+        rows = []
+        for entry in entries:
+            row = {
+                "rank": entry.rank,
+                "author_id": entry.user_id,
+                "full_name": entry.user.full_name,
+                "email": entry.user.email,
+                "score": entry.score,
             }
-            for author in authors_qs
-        ]
-        return Response(results)
+            if board == "publications":
+                row["total_publications"] = entry.score
+            rows.append(row)
+        return rows
     
-   
\ No newline at end of file
+   
+
+
+# ── Chunked uploads (publications/uploads.py) ───────────────────
+class UploadSessionCreateView(generics.CreateAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class UploadSessionView(APIView):
+    """GET the resume offset, PUT the next chunk, DELETE to cancel."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self, pk):
+        return get_object_or_404(UploadSession, pk=pk, user=self.request.user)
+
+    def get(self, request, pk):
+        return Response(UploadSessionSerializer(self.get_object(pk)).data)
+
+    def put(self, request, pk):
+        session = self.get_object(pk)
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = -1
+        try:
+            # The body is streamed to disk; request.data is never parsed
+            session = uploads.write_chunk(
+                session.pk,
+                request.stream,
+                request.META.get('HTTP_CONTENT_RANGE'),
+                content_length,
+            )
+        except uploads.ChunkError as e:
+            return Response({'detail': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+        return Response({'offset': session.offset, 'size': session.size, 'status': session.status})
+
+    def delete(self, request, pk):
+        session = self.get_object(pk)
+        if session.status in ('processing', 'storing'):
+            return Response({'detail': 'Upload is already being stored.'}, status=status.HTTP_409_CONFLICT)
+        session.delete()
+        uploads.discard(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionCompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @transaction.atomic
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, user=request.user)
+        if session.status != 'uploading':
+            return Response(UploadSessionSerializer(session).data)
+        if session.offset != session.size:
+            return Response(
+                {'detail': f"Upload incomplete: received {session.offset} of {session.size} bytes.", 'offset': session.offset},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        uploads.complete(session)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_202_ACCEPTED)
+
+
+# ── Direct-to-storage uploads (publications/direct_uploads.py) ──
+class UploadTicketCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadTicketRequestSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        ticket, upload = direct_uploads.issue_ticket(
+            request.user, data['target'], data['object'], data['filename'], data['size'], request
+        )
+        return Response({
+            **UploadTicketSerializer(ticket).data,
+            'upload': upload,
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadTicketConfirmView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        error = None
+        with transaction.atomic():
+            ticket = get_object_or_404(
+                UploadTicket.objects.select_for_update().select_related('user'), pk=pk, user=request.user
+            )
+            try:
+                direct_uploads.confirm_ticket(ticket)
+            except direct_uploads.TicketError as e:
+                error = str(e)
+        if error:
+            return Response({'detail': error, 'status': ticket.status}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadTicketSerializer(ticket).data)
+
+
+class DirectUploadLocalReceiveView(APIView):
+    """
+    The "storage service" end of LocalDirectUploadBackend. Authenticated by the
+    ticket signature only, like a signed Cloudinary upload.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, pk):
+        backend = direct_uploads.get_backend()
+        if not isinstance(backend, direct_uploads.LocalDirectUploadBackend):
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        ticket = get_object_or_404(UploadTicket, pk=pk, status='issued')
+        content = request.FILES.get('file')
+        if content is None:
+            return Response({'detail': 'No file was sent.'}, status=status.HTTP_400_BAD_REQUEST)
+        target = direct_uploads.get_target(ticket.target)
+        try:
+            key = backend.receive(ticket, target.field.storage, request.data, content)
+        except direct_uploads.TicketError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'public_id': key, 'bytes': content.size}, status=status.HTTP_201_CREATED)
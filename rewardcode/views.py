@@ -3,14 +3,13 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db import models  # ← Required for Sum()
 from django.utils import timezone
 import uuid
 
 from .models import RewardCode
 from .serializers import RewardCodeSerializer
 from publications.models import Publication
-from points.models import PointReward
+from points.ledger import publication_points
 from rest_framework import serializers as rest_serializers
 
 
@@ -43,11 +42,8 @@ class RewardCodeListCreateView(generics.ListCreateAPIView):
         except Publication.DoesNotExist:
             return False
 
-        # Points **received** by the owner (sum of PointReward on this pub)
-        total = PointReward.objects.filter(publication=pub).aggregate(
-            total=models.Sum('points')
-        )['total'] or 0
-        return total >= 25
+        # Points **received** by the owner, kept up to date by the points ledger
+        return publication_points(pub.pk) >= 25
 
     # -------------------------------------------------
     # 2. Create the code for the owner
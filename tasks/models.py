@@ -1,7 +1,7 @@
 # tasks/models.py
 from django.db import models
 from django.utils import timezone
-from publications.models import Notification
+from publications.notifications import notify
 from accounts.models import User  # Adjust import based on your project structure
 
 
@@ -85,16 +85,17 @@ class Task(models.Model):
         self.save(update_fields=['status', 'reply_message', 'replied_at', 'updated_at'])
 
         # Notify the admin who assigned it
-        Notification.objects.create(
-            user=self.assigned_by,
-            message=(
+        notify(
+            self.assigned_by,
+            (
                 f"Task Completed\n\n"
                 f"Editor: {self.assigned_to.get_full_name() or self.assigned_to.email}\n"
                 f"Task: {self.title}\n"
                 f"Due: {self.due_date.strftime('%b %d, %Y') if self.due_date else 'No due date'}\n\n"
                 f"Reply:\n{reply_message.strip()}"
             ),
-            # Optional: add a link to the task in admin
+            kind="task",
+            task=self,
         )
 
     def mark_as_in_progress(self, by_user: User = None) -> None:
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userprofile', '0003_alter_userprofile_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -11,6 +11,8 @@ class UserProfile(models.Model):
     institution = models.CharField(max_length=40, blank=True, null=True)
     affiliation = models.CharField(max_length=255, blank=True)
     profile_image = CloudinaryField('image', blank=True, null=True)
+    # WebP/AVIF avatars of profile_image (config/renditions.py)
+    profile_image_renditions = models.JSONField(default=dict, blank=True)
     date_joined = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
@@ -6,8 +6,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         # include every field in the model
-        fields = ['id', 'name', 'bio', 'institution', 'affiliation', 'profile_image', 'date_joined']
-        read_only_fields = ['id', 'date_joined']   # date_joined set automatically
+        fields = ['id', 'name', 'bio', 'institution', 'affiliation', 'profile_image', 'profile_image_renditions', 'date_joined']
+        read_only_fields = ['id', 'profile_image_renditions', 'date_joined']   # date_joined set automatically
         
     def validate_profile_image(self, value):
         max_size = 10 * 1024 * 1024  # 10 MB
@@ -0,0 +1,6 @@
+# userprofile/signals.py
+from config import renditions
+from .models import UserProfile
+
+# Regenerate avatar sizes whenever the profile image changes
+renditions.register(UserProfile, 'profile_image', 'profile_image_renditions', renditions.AVATAR_SIZES)